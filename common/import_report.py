@@ -0,0 +1,107 @@
+"""
+실행 스크립트 시작(import) 시간 리포트
+
+스크립트를 새 파이썬 프로세스에서 `-X importtime`으로 import만 하여(main은 실행하지 않음)
+스크립트가 직접 불러오는 모듈별 누적 시간을 보여줍니다.
+무거운 모듈(pandas, gspread, scipy, openpyxl, facebook_business 등)이 다시 최상단 import로
+들어오면 여기서 바로 드러납니다.
+
+사용:
+    python common/import_report.py coupang_stock_recommender/run_recommender_slack.py
+    python common/import_report.py daily_ad_reporter/reporter.py --top 5 --max-ms 300
+
+--max-ms를 넘으면 종료 코드 1로 끝나므로 워크플로우에서 시작 시간 회귀를 막는 데 쓸 수 있습니다.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+DEFAULT_TOP = 10
+
+# 스크립트와 같은 방식으로 스크립트 디렉토리와 공용 모듈 디렉토리를 경로에 추가합니다.
+COMMON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_imports(script_path):
+    """
+    스크립트를 import하여 `-X importtime` 기록을 파싱합니다.
+
+    :return: (스크립트 누적 시간(ms), [(모듈명, 누적 시간(ms))] 스크립트가 직접 불러온 모듈)
+    """
+    script_path = os.path.abspath(script_path)
+    module = os.path.splitext(os.path.basename(script_path))[0]
+    code = (
+        "import sys; "
+        f"sys.path.insert(0, {os.path.dirname(script_path)!r}); "
+        f"sys.path.append({COMMON_DIR!r}); "
+        f"import {module}"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # "import time: self [us] | cumulative | 모듈명" (들여쓰기 2칸 = 한 단계 아래)
+    # 하위 모듈이 먼저 출력되므로, 스크립트 줄이 나오기 전까지의 한 단계 아래 모듈을 모읍니다.
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1000))
+
+    total = None
+    children = []
+    pending = []
+    for depth, name, cumulative_ms in entries:
+        if depth == 0 and name == module:
+            total = cumulative_ms
+            children = pending
+            break
+        if depth == 0:
+            pending = []  # 스크립트보다 먼저 불러온 다른 모듈(site 등)
+        elif depth == 1:
+            pending.append((name, cumulative_ms))
+    children.sort(key=lambda x: -x[1])
+    return total, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description="실행 스크립트 import 시간 리포트")
+    parser.add_argument("scripts", nargs="+", help="측정할 스크립트 경로")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="보여줄 모듈 수")
+    parser.add_argument(
+        "--max-ms", type=float, help="스크립트 import 시간이 이 값을 넘으면 실패 처리"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for script in args.scripts:
+        try:
+            total, children = measure_imports(script)
+        except Exception as e:
+            print(f"[import] {script}: 측정 실패 ({e})")
+            failed = True
+            continue
+        if total is None:
+            print(f"[import] {script}: 이미 불러온 모듈이라 측정할 수 없습니다.")
+            continue
+
+        over = args.max_ms is not None and total > args.max_ms
+        print(f"[import] {script}: {total:.0f}ms" + (f" (기준 {args.max_ms:.0f}ms 초과)" if over else ""))
+        for name, cumulative_ms in children[: args.top]:
+            print(f"    {cumulative_ms:8.1f}ms  {name}")
+        failed |= over
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+슬랙 알림 공용 모듈 (광고 리포트 봇 / 쿠팡 재고 추천 봇 공용)
+
+- 연결 풀을 가진 requests.Session 하나를 토큰별로 재사용합니다.
+- 429(rate limit) 응답은 Retry-After 헤더만큼 기다린 뒤 다시 보내고,
+  5xx/연결 오류는 지수 백오프로 재시도합니다.
+- 긴 메시지는 Block Kit section(3000자) / 메시지당 블록 수(50개) 제한에 맞게 나누어 보냅니다.
+
+사용:
+    sys.path.append(<저장소 루트>/common)
+    from slack_notifier import SlackApiError, get_notifier
+
+    notifier = get_notifier(SLACK_BOT_TOKEN)
+    notifier.post_message(channel, text)
+"""
+
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SLACK_API_URL = "https://slack.com/api/"
+
+# 슬랙 Block Kit 제한
+MAX_SECTION_TEXT = 3000  # section 블록 하나의 텍스트 길이
+MAX_BLOCKS_PER_MESSAGE = 50  # 메시지 하나의 블록 수
+MAX_FALLBACK_TEXT = 150  # 알림 미리보기용 text 길이
+
+DEFAULT_TIMEOUT = (5, 30)  # (연결, 응답) 초
+DEFAULT_POOL_SIZE = 8
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class SlackApiError(Exception):
+    """슬랙 API가 ok=false를 반환했거나 재시도 후에도 실패한 경우"""
+
+    def __init__(self, method, response):
+        self.method = method
+        self.response = response  # {'ok': False, 'error': ...}
+        super().__init__(f"{method}: {response.get('error')}")
+
+
+def split_text(text, limit=MAX_SECTION_TEXT):
+    """줄 단위로 limit 이하의 조각으로 나눕니다. (한 줄이 limit보다 길면 강제로 자름)"""
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current.strip():
+        chunks.append(current)
+    return chunks or [""]
+
+
+def build_message_batches(text):
+    """
+    텍스트를 Block Kit section 블록으로 나누고, 메시지당 블록 수 제한에 맞게 묶습니다.
+
+    :return: list of (미리보기 text, blocks)
+    """
+    sections = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": chunk}}
+        for chunk in split_text(text)
+        if chunk.strip()
+    ]
+    if not sections:
+        return [(text, None)]
+
+    batches = []
+    for start in range(0, len(sections), MAX_BLOCKS_PER_MESSAGE):
+        blocks = sections[start : start + MAX_BLOCKS_PER_MESSAGE]
+        fallback = blocks[0]["text"]["text"].strip().split("\n")[0][:MAX_FALLBACK_TEXT]
+        batches.append((fallback, blocks))
+    return batches
+
+
+class SlackNotifier:
+    """연결 풀과 rate limit 재시도를 갖춘 슬랙 Web API 클라이언트"""
+
+    def __init__(
+        self,
+        token,
+        timeout=DEFAULT_TIMEOUT,
+        pool_size=DEFAULT_POOL_SIZE,
+        max_retries=MAX_RETRIES,
+    ):
+        self.token = token
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        # 연결 단계 실패만 어댑터에서 재시도 (요청이 전달된 뒤의 재시도는 api_call에서 처리)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5),
+        )
+        self.session.mount("https://", adapter)
+
+    def _wait(self, attempt, retry_after=None):
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2**attempt)
+            delay += random.uniform(0, delay / 2)
+        time.sleep(delay)
+
+    def api_call(self, method, json=None, data=None, params=None):
+        """
+        슬랙 Web API를 호출합니다.
+
+        :return: 응답 JSON (dict)
+        :raises SlackApiError: ok=false 이거나 재시도 횟수를 넘긴 경우
+        """
+        url = SLACK_API_URL + method
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    url, json=json, data=data, params=params, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise SlackApiError(method, {"ok": False, "error": str(e)})
+                self._wait(attempt)
+                continue
+
+            if response.status_code == 429:
+                retry_after = float(response.headers.get("Retry-After", 1))
+                print(f"[슬랙] {method} 호출 제한, {retry_after:.0f}초 후 재시도합니다.")
+                if attempt == self.max_retries:
+                    break
+                self._wait(attempt, retry_after)
+                continue
+            if response.status_code >= 500:
+                if attempt == self.max_retries:
+                    break
+                self._wait(attempt)
+                continue
+
+            body = response.json()
+            if not body.get("ok"):
+                raise SlackApiError(method, body)
+            return body
+
+        raise SlackApiError(
+            method, {"ok": False, "error": f"retries_exhausted (HTTP {response.status_code})"}
+        )
+
+    def post_message(self, channel, text, thread_ts=None):
+        """
+        메시지를 보냅니다. 길면 여러 메시지로 나누어 같은 위치(채널/스레드)에 순서대로 보냅니다.
+
+        :return: 첫 번째 메시지의 응답 (ts, channel 포함)
+        """
+        first = None
+        for fallback, blocks in build_message_batches(text):
+            payload = {"channel": channel, "text": fallback}
+            if blocks:
+                payload["blocks"] = blocks
+            if thread_ts:
+                payload["thread_ts"] = thread_ts
+            response = self.api_call("chat.postMessage", json=payload)
+            first = first or response
+        return first
+
+    def update_message(self, channel, ts, text):
+        """
+        기존 메시지를 수정합니다. 메시지 하나에 담을 수 있는 분량만 반영하고 나머지는 생략합니다.
+        """
+        batches = build_message_batches(text)
+        fallback, blocks = batches[0]
+        if len(batches) > 1:
+            total = sum(len(b) for _, b in batches)
+            blocks = blocks[: MAX_BLOCKS_PER_MESSAGE - 1]
+            blocks.append({
+                "type": "context",
+                "elements": [
+                    {"type": "mrkdwn", "text": f"(이하 {total - len(blocks)}개 구간 생략)"}
+                ],
+            })
+        payload = {"channel": channel, "ts": ts, "text": fallback}
+        if blocks:
+            payload["blocks"] = blocks
+        return self.api_call("chat.update", json=payload)
+
+    def pin(self, channel, ts):
+        return self.api_call("pins.add", json={"channel": channel, "timestamp": ts})
+
+    def upload_files(self, channel_id, files, thread_ts=None, initial_comment=None):
+        """
+        메모리에 있는 파일을 업로드합니다. (files.getUploadURLExternal -> 업로드 -> files.completeUploadExternal)
+
+        :param files: dict (파일명 -> bytes)
+        """
+        uploaded = []
+        for name, content in files.items():
+            ticket = self.api_call(
+                "files.getUploadURLExternal",
+                data={"filename": name, "length": len(content)},
+            )
+            response = self.session.post(
+                ticket["upload_url"], files={"file": (name, content)}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            uploaded.append({"id": ticket["file_id"], "title": name})
+
+        payload = {"files": uploaded, "channel_id": channel_id}
+        if thread_ts:
+            payload["thread_ts"] = thread_ts
+        if initial_comment:
+            payload["initial_comment"] = initial_comment
+        return self.api_call("files.completeUploadExternal", json=payload)
+
+
+_notifiers = {}
+_notifiers_lock = threading.Lock()
+
+
+def get_notifier(token):
+    """토큰별로 하나의 SlackNotifier(연결 풀)를 재사용합니다."""
+    with _notifiers_lock:
+        if token not in _notifiers:
+            _notifiers[token] = SlackNotifier(token)
+        return _notifiers[token]
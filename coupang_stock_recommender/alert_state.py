@@ -0,0 +1,112 @@
+"""
+품절 알림 상태 저장소 (SQLite)
+
+채널별로 마지막으로 알린 품절 SKU 목록과 고정(pin)된 요약 메시지의 ts를 보관합니다.
+실행할 때마다 전체 품절 목록을 다시 보내는 대신, 이전 목록과 비교하여
+새로 품절된 상품과 재입고된 상품만 알리는 데 사용합니다.
+"""
+
+import os
+import sqlite3
+import datetime
+from contextlib import closing
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_STATE_PATH = os.environ.get(
+    "STOCKOUT_STATE_PATH", os.path.join(script_dir, ".state", "stockout_alerts.sqlite3")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stockouts (
+    channel TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    product_name TEXT,
+    since TEXT NOT NULL,
+    PRIMARY KEY (channel, sku)
+);
+CREATE TABLE IF NOT EXISTS summary_messages (
+    channel TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class StockoutAlertStore:
+    """채널별 품절 SKU 목록과 고정 요약 메시지를 저장합니다."""
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def get_stockouts(self, channel):
+        """
+        마지막으로 저장된 품절 목록을 반환합니다.
+
+        :return: dict (sku -> (상품명, 품절 시작 시각))
+        """
+        with closing(self._conn.cursor()) as cur:
+            cur.execute(
+                "SELECT sku, product_name, since FROM stockouts WHERE channel = ?",
+                (channel,),
+            )
+            return {sku: (name, since) for sku, name, since in cur.fetchall()}
+
+    def diff(self, channel, current):
+        """
+        저장된 목록과 현재 품절 목록을 비교합니다.
+
+        :param current: dict (sku -> 상품명)
+        :return: (신규 품절 dict, 재입고 dict) - 모두 sku -> 상품명
+        """
+        previous = self.get_stockouts(channel)
+        new = {sku: name for sku, name in current.items() if sku not in previous}
+        recovered = {
+            sku: name for sku, (name, _) in previous.items() if sku not in current
+        }
+        return new, recovered
+
+    def save_stockouts(self, channel, current):
+        """현재 품절 목록을 저장합니다. (이미 있던 SKU는 품절 시작 시각 유지)"""
+        now = _now()
+        with self._conn:
+            previous = self.get_stockouts(channel)
+            removed = [(channel, sku) for sku in previous if sku not in current]
+            self._conn.executemany(
+                "DELETE FROM stockouts WHERE channel = ? AND sku = ?", removed
+            )
+            self._conn.executemany(
+                "INSERT INTO stockouts (channel, sku, product_name, since) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (channel, sku) DO UPDATE SET product_name = excluded.product_name",
+                [(channel, sku, name, now) for sku, name in current.items()],
+            )
+
+    def get_summary_message(self, channel):
+        """고정 요약 메시지의 (채널 ID, ts)를 반환합니다. 없으면 None."""
+        with closing(self._conn.cursor()) as cur:
+            cur.execute(
+                "SELECT channel_id, ts FROM summary_messages WHERE channel = ?",
+                (channel,),
+            )
+            return cur.fetchone()
+
+    def set_summary_message(self, channel, channel_id, ts):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summary_messages (channel, channel_id, ts, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (channel, channel_id, ts, _now()),
+            )
@@ -0,0 +1,164 @@
+"""
+입고 수량 결정 과정 기록 (설명 모드)
+
+입고수량이 이상해 보일 때 그 수량이 어느 단계(Sweep 전량 입고, 최소 수량 우선 확보,
+일별 시뮬레이션, 자사몰 최소 보존 수량 보정)에서 얼마나 정해졌고, 어떤 구성품 때문에
+막혔는지를 SKU별 이벤트로 남깁니다.
+
+이벤트는 미리 할당해 둔 배열에 순환(ring buffer) 방식으로 기록하므로 메모리 사용량이 고정되며,
+용량을 넘으면 가장 오래된 이벤트부터 덮어씁니다.
+기록을 켜지 않으면 엔진은 `trace is not None` 확인만 하므로 계산 비용이 거의 늘지 않습니다.
+
+환경 변수:
+    TRANSFER_TRACE: '1'이면 모든 SKU를, 'sku1,sku2'처럼 쓰면 해당 SKU만 기록 (없으면 기록하지 않음)
+    TRANSFER_TRACE_CAPACITY: 보관할 최대 이벤트 수 (기본 200000, 엑셀 시트 최대 행 수 이하)
+
+사용:
+    trace = new_trace()  # 설정이 없으면 None
+    df_reco = calculate_coupang_transfer_recommendations(df_final, ..., trace=trace)
+    df_trace = trace.to_frame()  # 추천 결과 엑셀의 '입고_근거' 시트로 내보냄
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+TRANSFER_TRACE = os.environ.get("TRANSFER_TRACE", "").strip()
+# 엑셀 시트 최대 행 수(1,048,576)에서 헤더 한 줄을 뺀 값을 넘지 않도록 합니다.
+MAX_CAPACITY = 1048575
+DEFAULT_CAPACITY = min(int(os.environ.get("TRANSFER_TRACE_CAPACITY", "200000")), MAX_CAPACITY)
+
+# 단계 코드 (배열에는 코드만 저장하고, 내보낼 때 이름으로 바꿉니다)
+STAGE_SWEEP = 0
+STAGE_MIN_QTY = 1
+STAGE_SIMULATION = 2
+STAGE_SIMULATION_STOP = 3
+STAGE_ENGINE_RESULT = 4
+STAGE_MIN_OWN_REPAIR = 5
+
+STAGE_NAMES = {
+    STAGE_SWEEP: "Sweep 전량 입고",
+    STAGE_MIN_QTY: "최소 수량 우선 확보",
+    STAGE_SIMULATION: "일별 시뮬레이션",
+    STAGE_SIMULATION_STOP: "시뮬레이션 중단",
+    STAGE_ENGINE_RESULT: "엔진 계산 결과",
+    STAGE_MIN_OWN_REPAIR: "자사몰 최소 보존 보정",
+}
+
+# 일차가 없는 이벤트 (시뮬레이션 이후 보정 등)
+NO_DAY = -1
+
+COL_TRACE_ORDER = "순서"
+COL_TRACE_SKU = "sku"
+COL_TRACE_DAY = "일차"
+COL_TRACE_STAGE = "단계"
+COL_TRACE_AMOUNT = "수량"
+COL_TRACE_LIMITER = "제한_구성품"
+TRACE_COLUMNS = [
+    COL_TRACE_ORDER,
+    COL_TRACE_SKU,
+    COL_TRACE_DAY,
+    COL_TRACE_STAGE,
+    COL_TRACE_AMOUNT,
+    COL_TRACE_LIMITER,
+]
+
+
+class AllocationTrace:
+    """SKU별 입고 결정 이벤트 (일차, 단계, 수량, 제한 구성품)를 고정 크기 배열에 기록합니다."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, skus=None):
+        """
+        :param capacity: 보관할 최대 이벤트 수 (넘으면 오래된 이벤트부터 덮어씀)
+        :param skus: 기록할 SKU 목록 (None이면 전체). 제한 구성품은 목록과 관계없이 표시됩니다.
+        """
+        self.capacity = max(1, min(int(capacity), MAX_CAPACITY))
+        self.only_skus = set(map(str, skus)) if skus else None
+        self.count = 0  # 지금까지 기록된 이벤트 수 (덮어쓴 것 포함)
+
+        self._sku_ids = np.empty(self.capacity, dtype=np.int32)
+        self._days = np.empty(self.capacity, dtype=np.int16)
+        self._stages = np.empty(self.capacity, dtype=np.int8)
+        self._amounts = np.empty(self.capacity, dtype=np.float64)
+        self._limiters = np.empty(self.capacity, dtype=np.int32)
+        self._skus = []  # SKU 번호 -> SKU
+        self._sku_index = {}  # SKU -> SKU 번호
+
+    def _id(self, sku):
+        sku_id = self._sku_index.get(sku)
+        if sku_id is None:
+            sku_id = len(self._skus)
+            self._sku_index[sku] = sku_id
+            self._skus.append(sku)
+        return sku_id
+
+    def record(self, sku, day, stage, amount, limiter=None):
+        """
+        이벤트 하나를 기록합니다.
+
+        :param day: 시뮬레이션 일차 (0: 시뮬레이션 전, NO_DAY: 일차 없음)
+        :param stage: 단계 코드 (STAGE_*)
+        :param amount: 입고수량 변화량 (보정으로 줄어든 경우 음수)
+        :param limiter: 수량을 제한한 구성품 SKU (없으면 None)
+        """
+        if self.only_skus is not None and str(sku) not in self.only_skus:
+            return
+        i = self.count % self.capacity
+        self._sku_ids[i] = self._id(sku)
+        self._days[i] = day
+        self._stages[i] = stage
+        self._amounts[i] = amount
+        self._limiters[i] = -1 if limiter is None else self._id(limiter)
+        self.count += 1
+
+    @property
+    def dropped(self):
+        """용량을 넘어 덮어쓴 (버려진) 이벤트 수"""
+        return max(0, self.count - self.capacity)
+
+    def to_frame(self):
+        """
+        기록된 이벤트를 오래된 순서로 DataFrame으로 반환합니다.
+
+        :return: DataFrame (순서, sku, 일차, 단계, 수량, 제한_구성품)
+        """
+        size = min(self.count, self.capacity)
+        if self.dropped:
+            print(
+                f"[입고 근거] 기록 용량({self.capacity}개)을 넘어 "
+                f"앞의 {self.dropped}개 이벤트는 제외되었습니다."
+            )
+            positions = np.arange(self.count - size, self.count) % self.capacity
+        else:
+            positions = np.arange(size)
+
+        skus = np.array(self._skus + [None], dtype=object)  # 마지막 칸: 제한 구성품 없음(-1)
+        days = pd.array(self._days[positions], dtype="Int64")
+        days[days == NO_DAY] = pd.NA
+
+        return pd.DataFrame(
+            {
+                COL_TRACE_ORDER: np.arange(self.count - size, self.count) + 1,
+                COL_TRACE_SKU: skus[self._sku_ids[positions]],
+                COL_TRACE_DAY: days,
+                COL_TRACE_STAGE: pd.Series(self._stages[positions]).map(STAGE_NAMES).to_numpy(),
+                COL_TRACE_AMOUNT: self._amounts[positions],
+                COL_TRACE_LIMITER: skus[self._limiters[positions]],
+            },
+            columns=TRACE_COLUMNS,
+        )
+
+
+def new_trace(setting=TRANSFER_TRACE, capacity=DEFAULT_CAPACITY):
+    """
+    TRANSFER_TRACE 설정으로 기록기를 만듭니다.
+
+    :return: AllocationTrace 또는 None (설정이 비어 있거나 '0')
+    """
+    if not setting or setting == "0":
+        return None
+    if setting == "1":
+        return AllocationTrace(capacity)
+    skus = [sku.strip() for sku in setting.split(",") if sku.strip()]
+    return AllocationTrace(capacity, skus=skus)
@@ -0,0 +1,565 @@
+"""
+입고 추천 정책 백테스트
+
+과거 일별 판매/입고 기록을 하루씩 재생하면서 매일 입고 추천을 적용하고,
+쿠팡 품절 일수, 입고 수량, 메인 창고 소진 현황을 SKU별로 집계합니다.
+
+하루의 순서:
+    1. 입고 도착 (LEAD_DAYS일 전에 보낸 쿠팡 입고분, 메인 창고 발주 입고분)
+    2. 입고 추천 (최근 30일/7일 '재생된' 판매량 기준, 쿠팡재고에는 입고 예정분 포함)
+    3. 실제 판매 적용 (쿠팡 판매는 쿠팡 재고에서, 자사몰 판매는 메인 창고에서)
+
+기본 엔진("approx")은 calculate_coupang_transfer_recommendations의 규칙
+(Sweep -> 최소 수량 확보 -> 60일 시뮬레이션 -> 자사몰 최소 보존 수량)을
+60일 일별 루프 대신 SKU x 일수 배열 연산으로 계산합니다. 단품은 기본 엔진과 결과가 같고,
+세트는 구성품 경합을 SKU 처리 순서와 관계없이 한 번에 계산하므로 기본 엔진과 조금 다를 수 있습니다.
+정확한 비교가 필요하면 --engine dict 처럼 TRANSFER_ENGINES의 엔진으로 재생할 수 있습니다. (느림)
+
+입력 기록 (CSV 또는 parquet, 날짜 x SKU 한 행):
+    날짜, sku, 쿠팡_판매량, 자사몰_판매량, [메인창고_입고량], [쿠팡로켓_옵션코드]
+    메인창고_재고, 쿠팡재고: 재생 시작일의 값만 사용 (없으면 가장 이른 날짜의 값)
+
+실행:
+    python coupang_stock_recommender/backtest.py --history sales_history.parquet --bom bom.csv
+    python coupang_stock_recommender/backtest.py --synthetic 10000 --days 365
+    python coupang_stock_recommender/backtest.py --synthetic 300 --days 90 --engine dict
+"""
+
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+# 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bom import explode_bom
+from config import DAILY_WORK_QTY_LIMIT, MINIMUM_PARTIAL_QTY
+from recommender import (
+    COL_BOM_COMPONENT_QTY,
+    COL_BOM_COMPONENT_SKU,
+    COL_COUPANG_OPTION_CODE,
+    COL_SALES_30D_COUPANG,
+    COL_SALES_30D_OWN,
+    COL_SALES_7D_OWN,
+    COL_SET_ID,
+    COL_SKU,
+    COL_STOCK_COUPANG,
+    COL_STOCK_MAIN,
+    MAX_DAYS,
+    MIN_OWN_STOCK,
+    MIN_QTY_TARGET,
+    OWN_DEFENSE_DAYS,
+    TRANSFER_ENGINES,
+    calculate_transfer_quantities,
+)
+
+# --- 기록 컬럼 ---
+COL_DATE = "날짜"
+COL_SALES_COUPANG = "쿠팡_판매량"
+COL_SALES_OWN = "자사몰_판매량"
+COL_RECEIPTS_MAIN = "메인창고_입고량"
+
+# --- 결과 컬럼 ---
+COL_STOCKOUT_DAYS = "품절일수"
+COL_LOST_SALES = "판매손실"
+COL_TRANSFERRED = "입고수량_합계"
+COL_TRANSFER_COUNT = "입고횟수"
+COL_MAIN_START = "메인창고_시작재고"
+COL_MAIN_END = "메인창고_종료재고"
+COL_MAIN_DEPLETED_ON = "메인창고_소진일"
+COL_AVG_EXCESS = "쿠팡_과잉재고_평균"
+
+# --- 재생 설정 기본값 ---
+DEFAULT_LEAD_DAYS = 3  # 입고 요청 후 쿠팡 재고에 반영되기까지 걸리는 일수
+WARMUP_DAYS = 30  # 판매량 계산에 필요한 기간 (기록의 처음 30일은 재생하지 않고 판매량만 채움)
+EXCESS_COVER_DAYS = MAX_DAYS  # 이 일수를 넘는 쿠팡 재고는 과잉으로 집계
+APPROX_ENGINE = "approx"
+
+
+def load_history(path):
+    """CSV / parquet 기록 파일을 읽습니다."""
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={COL_SKU: str, COL_COUPANG_OPTION_CODE: str})
+    df[COL_DATE] = pd.to_datetime(df[COL_DATE]).dt.normalize()
+    return df
+
+
+def load_sku_list(path):
+    """한 줄에 SKU 하나씩 적힌 파일을 읽습니다. (품절상품/쿠팡전용상품 목록)"""
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_bom(path):
+    """parse_bom() 결과 형태(세트_ID, 구성품_sku, 구성품_개수)의 CSV를 읽습니다."""
+    if not path:
+        return pd.DataFrame(columns=[COL_SET_ID, COL_BOM_COMPONENT_SKU, COL_BOM_COMPONENT_QTY])
+    return pd.read_csv(path, dtype={COL_SET_ID: str, COL_BOM_COMPONENT_SKU: str})
+
+
+class BomIndex:
+    """세트-구성품 관계를 SKU 위치(index) 배열로 표현합니다. (세트 안의 세트는 최하위 구성품까지 전개)"""
+
+    def __init__(self, skus, bom_parsed):
+        n = len(skus)
+        position = pd.Index(skus)
+        self.n = n
+        self.is_set = np.zeros(n, dtype=bool)
+        self.is_component = np.zeros(n, dtype=bool)
+        self.has_missing_component = np.zeros(n, dtype=bool)
+        self.set_idx = np.zeros(0, dtype=np.int64)
+        self.comp_idx = np.zeros(0, dtype=np.int64)
+        self.qty = np.zeros(0, dtype=float)
+        if bom_parsed is None or bom_parsed.empty:
+            return
+
+        bom = explode_bom(bom_parsed)
+        set_pos = position.get_indexer(bom[COL_SET_ID].astype(str))
+        comp_pos = position.get_indexer(bom[COL_BOM_COMPONENT_SKU].astype(str))
+        in_catalog = set_pos >= 0
+
+        self.is_set[set_pos[in_catalog]] = True
+        self.is_component[comp_pos[comp_pos >= 0]] = True
+        # 카탈로그에 없는 구성품이 있는 세트는 최소 수량 확보 대상에서 제외 (기본 엔진과 동일)
+        self.has_missing_component[set_pos[in_catalog & (comp_pos < 0)]] = True
+
+        valid = in_catalog & (comp_pos >= 0)
+        self.set_idx = set_pos[valid]
+        self.comp_idx = comp_pos[valid]
+        self.qty = pd.to_numeric(bom[COL_BOM_COMPONENT_QTY]).to_numpy(dtype=float)[valid]
+
+    def drain(self, quantities):
+        """SKU별 출고 수량을 구성품 단위 소요량으로 바꿉니다. (세트는 구성품으로, 단품은 그대로)"""
+        drain = np.where(self.is_set, 0.0, quantities)
+        if len(self.set_idx):
+            drain = drain + np.bincount(
+                self.comp_idx, weights=quantities[self.set_idx] * self.qty, minlength=self.n
+            )
+        return drain
+
+    def set_capacity(self, available):
+        """구성품 가용 재고로 만들 수 있는 세트 수량 (단품 위치는 inf)"""
+        capacity = np.full(self.n, np.inf)
+        if len(self.set_idx):
+            np.minimum.at(capacity, self.set_idx, available[self.comp_idx] / self.qty)
+        capacity[self.has_missing_component] = 0.0
+        return capacity
+
+    def min_over_components(self, values, initial):
+        """세트별로 구성품 값의 최소값을 취합니다. (단품 위치는 initial 그대로)"""
+        result = initial.copy()
+        if len(self.set_idx):
+            np.minimum.at(result, self.set_idx, values[self.comp_idx])
+        return result
+
+    def explode_days(self, values):
+        """(일수 x SKU) 판매량에서 세트 판매를 구성품 판매로 분해합니다. (data_processor와 동일)"""
+        exploded = np.where(self.is_set[None, :], 0.0, values)
+        if len(self.set_idx):
+            np.add.at(exploded.T, self.comp_idx, (values[:, self.set_idx] * self.qty).T)
+        return exploded
+
+
+def simulate_policy(main, coupang, daily_coupang, daily_own, is_sweep, has_code, requires_defense, bom):
+    """
+    입고 추천 규칙을 배열 연산으로 근사합니다.
+
+    60일 시뮬레이션은 일별 쿠팡 부족분과 구성품 소요량을 SKU x 60일 배열로 한 번에 계산하고,
+    메인 재고가 소요량을 처음 감당하지 못하는 날 직전까지의 부족분 합계를 입고수량으로 봅니다.
+
+    :return: SKU별 입고수량 (정수 배열)
+    """
+    main_w = main.astype(float)
+    coupang_w = coupang.astype(float)
+    transfer = np.zeros(len(main_w))
+
+    # 1. Sweep: 메인 재고 전량 입고
+    transfer[is_sweep] = main_w[is_sweep]
+    main_w[is_sweep] = 0.0
+    active = ~is_sweep
+
+    # 2. 최소 수량 우선 확보 (자사몰 7일치 또는 최소 보존 수량은 남김)
+    defense = np.where(requires_defense, np.maximum(daily_own * OWN_DEFENSE_DAYS, MIN_OWN_STOCK), 0.0)
+    available = np.maximum(0.0, main_w - defense)
+    allocatable = np.where(bom.is_set, bom.set_capacity(available), available)
+    prealloc = np.where(
+        active & has_code & (coupang_w < MIN_QTY_TARGET),
+        np.minimum(MIN_QTY_TARGET - coupang_w, allocatable),
+        0.0,
+    )
+    prealloc = np.maximum(prealloc, 0.0)
+    transfer += prealloc
+    coupang_w += prealloc
+    main_w -= bom.drain(prealloc)
+
+    # 3. 60일 시뮬레이션 (SKU x 일수)
+    # 누적값은 기본 엔진과 같은 순서로 더하여(cumsum) 반올림 경계에서도 같은 결과가 나오게 합니다.
+    n = len(main_w)
+    before = np.cumsum(
+        np.column_stack([coupang_w, np.repeat(-daily_coupang[:, None], MAX_DAYS - 1, axis=1)]),
+        axis=1,
+    )  # k일째 판매 전 쿠팡 재고 (부족해지기 전까지)
+    short = before < daily_coupang[:, None]
+    first_short = short & ~np.column_stack([np.zeros(n, dtype=bool), short[:, :-1]])
+    need = np.where(short, np.where(first_short, daily_coupang[:, None] - before, daily_coupang[:, None]), 0.0)
+    need[~active] = 0.0
+
+    drain = np.where(bom.is_set[:, None], 0.0, need) + daily_own[:, None]
+    if len(bom.set_idx):
+        np.add.at(drain, bom.comp_idx, need[bom.set_idx] * bom.qty[:, None])
+    stock_before = np.cumsum(np.column_stack([main_w, -drain[:, :-1]]), axis=1)
+
+    # 메인 재고가 버티는 일수 (처음으로 소요량을 감당하지 못하는 날 직전까지)
+    ok = stock_before >= drain
+    supplied_days = np.where(ok.all(axis=1), MAX_DAYS, ok.argmin(axis=1))
+    # 세트는 구성품 중 가장 먼저 바닥나는 날까지만 입고
+    supplied_days = bom.min_over_components(supplied_days, supplied_days)
+    cumulative = np.cumsum(np.column_stack([transfer, need]), axis=1)
+    transfer = cumulative[np.arange(n), supplied_days]
+
+    # 4. 자사몰 최소 보존 수량 보정 (초과분만큼 관련 SKU를 비율로 줄임)
+    proposed = np.rint(transfer)
+    usage = bom.drain(proposed)
+    limit = np.maximum(0.0, np.trunc(main - MIN_OWN_STOCK))
+    violated = requires_defense & (usage > limit)
+    if violated.any():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = np.where(violated, limit / usage, 1.0)
+        sku_factor = bom.min_over_components(factor, np.where(bom.is_set, 1.0, factor))
+        proposed = np.floor(proposed * sku_factor)
+    return proposed.astype(np.int64)
+
+
+def apply_daily_capacity(transfer, coupang, daily_coupang, capacity=DAILY_WORK_QTY_LIMIT):
+    """
+    일일 작업 목록과 같은 규칙으로 하루 입고 가능 수량을 적용합니다.
+    (재고 0개 우선 -> 재고 소진 예상일 -> 판매량 순, 넘치는 상품은 MINIMUM_PARTIAL_QTY 이상일 때만 분할)
+    """
+    idx = np.flatnonzero(transfer > 0)
+    if not len(idx):
+        return transfer
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depletion = np.where(daily_coupang > 0, coupang / daily_coupang, np.inf)
+    order = np.lexsort((-daily_coupang[idx], depletion[idx], coupang[idx] != 0))
+    ranked = idx[order]
+    cumulative = np.cumsum(transfer[ranked])
+
+    shipped = np.zeros_like(transfer)
+    within = cumulative <= capacity
+    shipped[ranked[within]] = transfer[ranked[within]]
+    if not within.all():
+        first_over = int(within.argmin())
+        remaining = capacity - (cumulative[first_over - 1] if first_over else 0)
+        if remaining >= MINIMUM_PARTIAL_QTY:
+            shipped[ranked[first_over]] = remaining
+    return shipped
+
+
+def _limit_to_stock(shipped, main, bom):
+    """구성품 재고를 넘는 출고가 없도록 세트/단품 수량을 비율로 줄입니다."""
+    usage = bom.drain(shipped.astype(float))
+    over = usage > main
+    if not over.any():
+        return shipped
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(over, np.maximum(main, 0) / usage, 1.0)
+    sku_factor = bom.min_over_components(factor, np.where(bom.is_set, 1.0, factor))
+    return np.floor(shipped * sku_factor).astype(shipped.dtype)
+
+
+def _engine_transfers(engine, skus, option_codes, main, coupang, sales30_c, sales30_o, sales7_o, bom_parsed, coupang_only_skus, discontinued_skus):
+    """TRANSFER_ENGINES의 엔진으로 하루치 입고수량을 계산합니다."""
+    df = pd.DataFrame({
+        COL_SKU: skus,
+        COL_STOCK_MAIN: main,
+        COL_STOCK_COUPANG: coupang,
+        COL_SALES_30D_COUPANG: sales30_c,
+        COL_SALES_30D_OWN: sales30_o,
+        COL_SALES_7D_OWN: sales7_o,
+        COL_COUPANG_OPTION_CODE: option_codes,
+    })
+    with contextlib.redirect_stdout(io.StringIO()):
+        quantities = calculate_transfer_quantities(
+            df,
+            coupang_only_skus=coupang_only_skus,
+            discontinued_skus=discontinued_skus,
+            bom_parsed=bom_parsed,
+            engine=engine,
+        )
+    return np.array([quantities.get(sku, 0) for sku in skus], dtype=np.int64)
+
+
+def _pivot(df, col, n_days, n_skus):
+    """기록 컬럼을 (일수 x SKU) 배열로 만듭니다. 없으면 0"""
+    values = np.zeros((n_days, n_skus))
+    if col in df.columns:
+        np.add.at(
+            values,
+            (df["_day"].to_numpy(), df["_sku"].to_numpy()),
+            pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=float),
+        )
+    return values
+
+
+def run_backtest(
+    df_history,
+    bom_parsed=None,
+    coupang_only_skus=None,
+    discontinued_skus=None,
+    lead_days=DEFAULT_LEAD_DAYS,
+    daily_capacity=None,
+    engine=APPROX_ENGINE,
+):
+    """
+    기록을 재생하여 SKU별 품절 일수, 입고 수량, 메인 창고 소진 현황을 계산합니다.
+
+    :param daily_capacity: 하루 최대 입고 수량 (None이면 제한 없음)
+    :param engine: "approx"(배열 근사) 또는 TRANSFER_ENGINES의 엔진 이름
+    :return: (SKU별 결과 DataFrame, 요약 dict)
+    """
+    if engine != APPROX_ENGINE and engine not in TRANSFER_ENGINES:
+        raise ValueError(f"알 수 없는 엔진입니다: {engine}")
+    coupang_only_skus = list(coupang_only_skus or [])
+    discontinued_skus = list(discontinued_skus or [])
+
+    df = df_history.copy()
+    df[COL_SKU] = df[COL_SKU].astype(str)
+    dates = np.sort(df[COL_DATE].unique())
+    skus = list(pd.unique(df[COL_SKU]))
+    n_days, n_skus = len(dates), len(skus)
+    if n_days <= WARMUP_DAYS:
+        raise ValueError(f"기록이 {WARMUP_DAYS}일보다 길어야 합니다. (현재 {n_days}일)")
+    df["_day"] = np.searchsorted(dates, df[COL_DATE].to_numpy())
+    df["_sku"] = pd.Index(skus).get_indexer(df[COL_SKU])
+
+    bom = BomIndex(skus, bom_parsed)
+    demand_coupang = _pivot(df, COL_SALES_COUPANG, n_days, n_skus)
+    demand_own = bom.explode_days(_pivot(df, COL_SALES_OWN, n_days, n_skus))
+    receipts = _pivot(df, COL_RECEIPTS_MAIN, n_days, n_skus)
+
+    # SKU 속성
+    if COL_COUPANG_OPTION_CODE in df.columns:
+        codes = df.drop_duplicates(COL_SKU).set_index(COL_SKU)[COL_COUPANG_OPTION_CODE]
+        option_codes = codes.reindex(skus).fillna("").astype(str).str.strip().to_numpy()
+        has_code = pd.Series(option_codes).str.match(r"^\d{11}$").to_numpy(dtype=bool)
+    else:
+        option_codes = np.array([str(10_000_000_000 + i) for i in range(n_skus)])
+        has_code = np.ones(n_skus, dtype=bool)
+    is_coupang_only = np.isin(skus, coupang_only_skus)
+    is_discontinued = np.isin(skus, discontinued_skus)
+    requires_defense = ~(is_coupang_only | is_discontinued)
+    is_sweep = ~(bom.is_set | bom.is_component) & ~requires_defense & has_code
+
+    # 시작 재고 (재생 시작일 값, 없으면 가장 이른 값)
+    start_day = WARMUP_DAYS
+    initial = df[df[COL_STOCK_MAIN].notna()] if COL_STOCK_MAIN in df.columns else df.iloc[0:0]
+    if initial.empty:
+        raise ValueError(f"시작 재고({COL_STOCK_MAIN}, {COL_STOCK_COUPANG}) 컬럼이 필요합니다.")
+    initial = initial.sort_values("_day")
+    at_start = initial[initial["_day"] <= start_day].drop_duplicates("_sku", keep="last")
+    if at_start.empty:
+        at_start = initial.drop_duplicates("_sku", keep="first")
+    main = np.zeros(n_skus)
+    coupang = np.zeros(n_skus)
+    main[at_start["_sku"]] = pd.to_numeric(at_start[COL_STOCK_MAIN], errors="coerce").fillna(0)
+    coupang[at_start["_sku"]] = pd.to_numeric(at_start[COL_STOCK_COUPANG], errors="coerce").fillna(0)
+
+    # 최근 30일 판매량 (재생 전 WARMUP_DAYS일은 기록 그대로)
+    sold_coupang = np.zeros((WARMUP_DAYS, n_skus))
+    sold_own = np.zeros((WARMUP_DAYS, n_skus))
+    sold_coupang[:] = demand_coupang[:WARMUP_DAYS]
+    sold_own[:] = demand_own[:WARMUP_DAYS]
+    sum30_coupang = sold_coupang.sum(axis=0)
+    sum30_own = sold_own.sum(axis=0)
+    sum7_own = sold_own[-7:].sum(axis=0)
+
+    pipeline = np.zeros((max(lead_days, 1), n_skus))
+    eligible = has_code & ~(is_discontinued & (main <= 0))
+
+    stockout_days = np.zeros(n_skus, dtype=np.int64)
+    lost_sales = np.zeros(n_skus)
+    transferred = np.zeros(n_skus)
+    transfer_count = np.zeros(n_skus, dtype=np.int64)
+    excess_total = np.zeros(n_skus)
+    main_start = main.copy()
+    depleted_on = np.full(n_skus, -1)
+    demand_total = 0.0
+    sold_total = 0.0
+
+    started = time.perf_counter()
+    for day in range(start_day, n_days):
+        slot = day % len(pipeline)
+        # 1. 입고 도착
+        if lead_days > 0:
+            coupang += pipeline[slot]
+            pipeline[slot] = 0.0
+        main += receipts[day]
+
+        # 2. 입고 추천 (쿠팡재고 = 보유 + 입고 예정)
+        in_transit = pipeline.sum(axis=0) if lead_days > 0 else 0.0
+        if engine == APPROX_ENGINE:
+            rate_own_30 = sum30_own / 30
+            rate_own_7 = sum7_own / 7
+            rate_own = np.where(rate_own_7 > rate_own_30, rate_own_30 * 0.7 + rate_own_7 * 0.3, rate_own_30)
+            daily_coupang = np.where(has_code, sum30_coupang / 30, 0.0)
+            daily_own = np.where(requires_defense, rate_own * 1.2, 0.0)
+            transfer = simulate_policy(
+                main, coupang + in_transit, daily_coupang, daily_own,
+                is_sweep, has_code, requires_defense, bom,
+            )
+        else:
+            daily_coupang = np.where(has_code, sum30_coupang / 30, 0.0)
+            transfer = _engine_transfers(
+                engine, skus, option_codes, main, coupang + in_transit,
+                sum30_coupang, sum30_own, sum7_own,
+                bom_parsed, coupang_only_skus, discontinued_skus,
+            )
+        if daily_capacity:
+            transfer = apply_daily_capacity(transfer, coupang + in_transit, daily_coupang, daily_capacity)
+        transfer = _limit_to_stock(transfer, main, bom)
+
+        main -= bom.drain(transfer.astype(float))
+        if lead_days > 0:
+            pipeline[slot] += transfer
+        else:
+            coupang += transfer
+        transferred += transfer
+        transfer_count += transfer > 0
+
+        # 3. 실제 판매
+        sold_c = np.minimum(coupang, demand_coupang[day])
+        coupang -= sold_c
+        lost_sales += demand_coupang[day] - sold_c
+        stockout_days += eligible & (coupang <= 0)
+        demand_total += demand_coupang[day][eligible].sum()
+        sold_total += sold_c[eligible].sum()
+
+        sold_o = np.minimum(main, demand_own[day])
+        main -= sold_o
+        newly_depleted = (depleted_on < 0) & (main_start > 0) & (main <= 0)
+        depleted_on[newly_depleted] = day
+
+        excess_total += np.maximum(0.0, coupang - daily_coupang * EXCESS_COVER_DAYS)
+
+        # 최근 30일/7일 판매량 갱신
+        ring = day % WARMUP_DAYS
+        sum30_coupang += sold_c - sold_coupang[ring]
+        sum7_own += sold_o - sold_own[(day - 7) % WARMUP_DAYS]
+        sum30_own += sold_o - sold_own[ring]
+        sold_coupang[ring] = sold_c
+        sold_own[ring] = sold_o
+
+    replay_days = n_days - start_day
+    elapsed = time.perf_counter() - started
+
+    df_result = pd.DataFrame({
+        COL_SKU: skus,
+        COL_STOCKOUT_DAYS: stockout_days,
+        COL_LOST_SALES: lost_sales.round().astype(np.int64),
+        COL_TRANSFERRED: transferred.astype(np.int64),
+        COL_TRANSFER_COUNT: transfer_count,
+        COL_MAIN_START: main_start.astype(np.int64),
+        COL_MAIN_END: main.round().astype(np.int64),
+        COL_MAIN_DEPLETED_ON: pd.Series(
+            np.where(depleted_on >= 0, dates[np.maximum(depleted_on, 0)], np.datetime64("NaT"))
+        ).dt.date,
+        COL_AVG_EXCESS: (excess_total / replay_days).round(1),
+    })
+    df_result = df_result.sort_values([COL_STOCKOUT_DAYS, COL_LOST_SALES], ascending=False)
+
+    summary = {
+        "engine": engine,
+        "skus": n_skus,
+        "start": str(pd.Timestamp(dates[start_day]).date()),
+        "end": str(pd.Timestamp(dates[-1]).date()),
+        "replay_days": replay_days,
+        "stockout_sku_days": int(stockout_days.sum()),
+        "stockout_rate": float(stockout_days.sum() / max(1, eligible.sum() * replay_days)),
+        "fill_rate": float(sold_total / demand_total) if demand_total else 1.0,
+        "lost_sales": int(lost_sales.sum()),
+        "units_transferred": int(transferred.sum()),
+        "avg_excess_units": float(excess_total.sum() / replay_days),
+        "main_depleted_skus": int((depleted_on >= 0).sum()),
+        "seconds": round(elapsed, 2),
+    }
+    return df_result.reset_index(drop=True), summary
+
+
+def print_summary(summary):
+    print(f"\n[백테스트] {summary['start']} ~ {summary['end']} ({summary['replay_days']}일, SKU {summary['skus']:,}개, 엔진: {summary['engine']})")
+    print(f"- 쿠팡 품절: {summary['stockout_sku_days']:,} SKU-일 (품절률 {summary['stockout_rate']:.2%})")
+    print(f"- 쿠팡 판매 충족률: {summary['fill_rate']:.2%} (판매 손실 {summary['lost_sales']:,}개)")
+    print(f"- 총 입고 수량: {summary['units_transferred']:,}개")
+    print(f"- 쿠팡 과잉 재고 (일평균, {EXCESS_COVER_DAYS}일치 초과분): {summary['avg_excess_units']:,.0f}개")
+    print(f"- 메인 창고 소진 SKU: {summary['main_depleted_skus']:,}개")
+    print(f"- 재생 시간: {summary['seconds']}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="입고 추천 정책 백테스트")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--history", help="일별 판매/입고 기록 파일 (CSV / parquet)")
+    source.add_argument("--synthetic", type=int, metavar="N_SKUS", help="가상 기록으로 실행")
+    parser.add_argument("--days", type=int, default=365, help="가상 기록 일수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bom", help="세트 구성 CSV (세트_ID, 구성품_sku, 구성품_개수)")
+    parser.add_argument("--discontinued", help="품절상품 SKU 목록 파일")
+    parser.add_argument("--coupang-only", help="쿠팡전용상품 SKU 목록 파일")
+    parser.add_argument("--lead-days", type=int, default=DEFAULT_LEAD_DAYS)
+    parser.add_argument(
+        "--daily-capacity",
+        type=int,
+        nargs="?",
+        const=DAILY_WORK_QTY_LIMIT,
+        help=f"하루 입고 가능 수량 (값 없이 쓰면 {DAILY_WORK_QTY_LIMIT})",
+    )
+    parser.add_argument(
+        "--engine",
+        default=APPROX_ENGINE,
+        choices=[APPROX_ENGINE] + list(TRANSFER_ENGINES),
+    )
+    parser.add_argument("--output", help="SKU별 결과를 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from synthetic_data import generate_history
+
+        df_history, bom_parsed, discontinued_skus, coupang_only_skus = generate_history(
+            args.synthetic, days=args.days, seed=args.seed
+        )
+    else:
+        df_history = load_history(args.history)
+        bom_parsed = load_bom(args.bom)
+        discontinued_skus = load_sku_list(args.discontinued)
+        coupang_only_skus = load_sku_list(args.coupang_only)
+
+    df_result, summary = run_backtest(
+        df_history,
+        bom_parsed=bom_parsed,
+        coupang_only_skus=coupang_only_skus,
+        discontinued_skus=discontinued_skus,
+        lead_days=args.lead_days,
+        daily_capacity=args.daily_capacity,
+        engine=args.engine,
+    )
+    print_summary(summary)
+    print("\n품절 일수 상위 SKU:")
+    print(df_result.head(10).to_string(index=False))
+
+    if args.output:
+        df_result.to_csv(args.output, index=False, encoding="utf-8-sig")
+        print(f"\nSKU별 결과를 '{args.output}'에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+다단계 BOM(세트 안에 세트) 전개
+
+세트의 구성품이 다시 세트인 경우까지 모두 펼쳐서, 세트 1개에 들어가는 최하위 구성품(단품) 수량을
+희소 행렬 하나로 계산합니다. 직접 구성 행렬 A(세트 -> 구성품)를 구성품이 세트인 경로가
+없어질 때까지 곱해 나가므로 중첩 깊이와 관계없이 결과는 같은 형태입니다.
+
+    전개 행렬 T = A·L + A·S·A·L + A·S·A·S·A·L + ...   (L: 단품 열, S: 세트 열)
+
+세트 판매량 분배와 구성품 재고 차감은 모두 T와의 행렬-벡터 곱 한 번으로 끝납니다.
+순환 참조(A 세트에 B, B 세트에 A)가 있으면 전개가 끝나지 않으므로 먼저 검사하여 오류를 냅니다.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# parse_bom() 결과 컬럼
+COL_SET_ID = "세트_ID"
+COL_BOM_COMPONENT_SKU = "구성품_sku"
+COL_BOM_COMPONENT_QTY = "구성품_개수"
+
+
+def find_bom_cycles(matrix, skus):
+    """
+    직접 구성 행렬에서 순환 참조에 포함된 SKU 묶음을 찾습니다.
+
+    :return: 순환 묶음(SKU 리스트)의 리스트, 없으면 빈 리스트
+    """
+    n_components, labels = connected_components(matrix, directed=True, connection="strong")
+    sizes = np.bincount(labels, minlength=n_components)
+    # 크기 2 이상인 강한 연결 요소, 또는 자기 자신을 구성품으로 가진 세트
+    on_cycle = sizes[labels] > 1
+    on_cycle |= matrix.diagonal() != 0
+    cycles = {}
+    for position in np.flatnonzero(on_cycle):
+        cycles.setdefault(labels[position], []).append(skus[position])
+    return list(cycles.values())
+
+
+class BomMatrix:
+    """
+    세트 -> 최하위 구성품 소요량을 희소 행렬로 보관합니다.
+
+    skus: 행/열 순서 (BOM에 처음 등장한 순서)
+    direct: 직접 구성 행렬 (세트 행, 구성품 열)
+    exploded: 전개 행렬 (세트 행, 최하위 구성품 열, 단품 행은 비어 있음)
+    """
+
+    def __init__(
+        self,
+        df_bom_long,
+        set_col=COL_SET_ID,
+        component_col=COL_BOM_COMPONENT_SKU,
+        qty_col=COL_BOM_COMPONENT_QTY,
+    ):
+        qty = pd.to_numeric(df_bom_long[qty_col], errors="coerce").fillna(0)
+        rows = df_bom_long[qty > 0]
+        set_skus = rows[set_col].astype(str).to_numpy()
+        component_skus = rows[component_col].astype(str).to_numpy()
+        quantities = qty[qty > 0].to_numpy()
+        # 입력 수량이 정수면 전개 결과도 정수로 유지 (기존 bom_map과 같은 타입)
+        self.integer_quantities = pd.api.types.is_integer_dtype(df_bom_long[qty_col])
+
+        order = np.empty(len(rows) * 2, dtype=object)
+        order[0::2] = set_skus
+        order[1::2] = component_skus
+        self.skus = pd.Index(pd.unique(order))
+        n = len(self.skus)
+
+        # 같은 세트-구성품 행이 여러 번 있으면 수량을 합산
+        self.direct = sparse.csr_matrix(
+            (
+                quantities.astype(float),
+                (self.skus.get_indexer(set_skus), self.skus.get_indexer(component_skus)),
+            ),
+            shape=(n, n),
+        )
+        self.direct.sum_duplicates()
+        self.is_set = np.diff(self.direct.indptr) > 0
+
+        cycles = find_bom_cycles(self.direct, self.skus)
+        if cycles:
+            names = ", ".join(f"[{', '.join(map(str, cycle))}]" for cycle in cycles)
+            raise ValueError(f"세트 구성에 순환 참조가 있습니다: {names}")
+
+        self.exploded, self.depth = self._explode()
+
+    def _explode(self):
+        """구성품이 세트인 경로가 없어질 때까지 곱하여 전개 행렬과 최대 중첩 깊이를 구합니다."""
+        keep_leaf = sparse.diags((~self.is_set).astype(float))
+        keep_set = sparse.diags(self.is_set.astype(float))
+
+        paths = self.direct
+        exploded = sparse.csr_matrix(self.direct.shape)
+        depth = 0
+        # 순환이 없으므로 세트 수만큼 곱하기 전에 반드시 끝납니다.
+        while paths.nnz:
+            depth += 1
+            exploded = exploded + paths @ keep_leaf
+            paths = paths @ keep_set @ self.direct
+            paths.eliminate_zeros()
+        exploded = exploded.tocsr()
+        exploded.eliminate_zeros()
+        exploded.sort_indices()
+        return exploded, depth
+
+    @property
+    def set_skus(self):
+        return self.skus[self.is_set]
+
+    def distribute(self, set_quantities):
+        """
+        세트별 수량(판매량 등)을 최하위 구성품 수량으로 분배합니다.
+
+        :param set_quantities: SKU 인덱스의 Series (세트가 아닌 SKU는 무시)
+        :return: 최하위 구성품 SKU 인덱스의 Series (0이 아닌 값만)
+        """
+        set_quantities = pd.Series(
+            set_quantities.to_numpy(), index=set_quantities.index.astype(str)
+        )
+        values = (
+            pd.to_numeric(set_quantities, errors="coerce")
+            .fillna(0)
+            .groupby(level=0)
+            .sum()
+            .reindex(self.skus, fill_value=0)
+            .to_numpy(dtype=float)
+        )
+        values[~self.is_set] = 0.0
+        distributed = self.exploded.T @ values
+        mask = distributed != 0
+        return pd.Series(distributed[mask], index=self.skus[mask])
+
+    def to_frame(self):
+        """전개 결과를 parse_bom()과 같은 형태(세트_ID, 구성품_sku, 구성품_개수)로 반환합니다."""
+        coo = self.exploded.tocoo()
+        quantities = coo.data
+        if self.integer_quantities:
+            quantities = np.rint(quantities).astype(np.int64)
+        return pd.DataFrame(
+            {
+                COL_SET_ID: self.skus[coo.row],
+                COL_BOM_COMPONENT_SKU: self.skus[coo.col],
+                COL_BOM_COMPONENT_QTY: quantities,
+            }
+        )
+
+
+def explode_bom(bom_parsed):
+    """
+    parse_bom() 결과를 최하위 구성품 기준으로 전개합니다.
+    중첩이 없는 BOM은 (중복 행 합산 외에는) 그대로 반환됩니다.
+    """
+    if bom_parsed is None or bom_parsed.empty:
+        return bom_parsed
+    return BomMatrix(bom_parsed).to_frame()
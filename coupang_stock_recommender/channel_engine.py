@@ -0,0 +1,187 @@
+"""
+창고 x SKU 배열 기반 다채널 입고 시뮬레이션
+
+기본 엔진(_allocate_dict)의 규칙(Sweep -> 최소 수량 우선 확보 -> 60일 시뮬레이션)을
+채널 창고 재고/일 수요를 (채널 수 x SKU 수) 배열로 두고 하루 단위로 모든 SKU를 한 번에 계산합니다.
+쿠팡 외의 풀필먼트 센터가 추가되어도 채널 배열에 행 하나를 더하면 같은 규칙이 적용됩니다.
+
+하루 동안 채널은 우선순위 순서로 처리합니다. 앞 채널(과 자사몰 수요)이 먼저 메인 창고에서
+구성품을 가져가고, 뒤 채널은 남은 재고로 같은 판정을 받습니다.
+채널이 하나(쿠팡)뿐이면 기본 엔진과 같은 순서로 더하고 비교하므로 결과가 같습니다.
+"""
+
+import numpy as np
+
+
+class ChannelBom:
+    """
+    bom_map을 SKU 위치 배열로 바꾼 것입니다.
+
+    소요량 항목(entry_sku -> entry_comp, entry_qty)은 기본 엔진이 구성품 소요량을 더하는 순서
+    (SKU 순서, 세트는 bom_map의 구성품 순서)대로 정렬되어 있어 np.bincount 합계가 같은 값이 됩니다.
+    """
+
+    def __init__(self, skus, bom_map):
+        position = {sku: i for i, sku in enumerate(skus)}
+        n = len(skus)
+        self.n = n
+        self.is_set = np.zeros(n, dtype=bool)
+        self.has_missing_component = np.zeros(n, dtype=bool)
+        # 최소 수량 확보용 (세트별 구성품 위치/수량, 카탈로그에 없는 구성품이 있으면 비움)
+        self.components = {}
+
+        entry_sku, entry_comp, entry_qty = [], [], []
+        for i, sku in enumerate(skus):
+            if sku not in bom_map:
+                entry_sku.append(i)
+                entry_comp.append(i)
+                entry_qty.append(1)
+                continue
+            self.is_set[i] = True
+            components = []
+            for comp_sku, qty in bom_map[sku]:
+                j = position.get(comp_sku)
+                if j is None:
+                    self.has_missing_component[i] = True
+                    continue
+                entry_sku.append(i)
+                entry_comp.append(j)
+                entry_qty.append(qty)
+                components.append((j, qty))
+            self.components[i] = components
+
+        self.entry_sku = np.array(entry_sku, dtype=np.int64)
+        self.entry_comp = np.array(entry_comp, dtype=np.int64)
+        self.entry_qty = np.array(entry_qty, dtype=float)
+        self.entry_is_set = self.is_set[self.entry_sku]
+
+    def drain(self, need, active):
+        """
+        SKU별 부족분을 구성품 단위 소요량으로 바꿉니다.
+
+        :return: (소요량, 소요량 항목이 하나라도 있는 구성품 여부)
+        """
+        mask = active[self.entry_sku]
+        comp = self.entry_comp[mask]
+        weights = np.where(
+            self.entry_is_set[mask],
+            need[self.entry_sku[mask]] * self.entry_qty[mask],
+            need[self.entry_sku[mask]],
+        )
+        drained = np.bincount(comp, weights=weights, minlength=self.n)
+        present = np.bincount(comp, minlength=self.n) > 0
+        return drained, present
+
+    def any_component(self, flags):
+        """세트는 구성품 중 하나라도 flags면 True, 단품은 자기 자신의 flags"""
+        result = np.where(self.is_set, False, flags)
+        set_entries = self.entry_is_set
+        hits = np.bincount(
+            self.entry_sku[set_entries],
+            weights=flags[self.entry_comp[set_entries]].astype(float),
+            minlength=self.n,
+        )
+        return result | (self.is_set & (hits > 0))
+
+
+def simulate_channels(
+    main,
+    stock,
+    demand,
+    own_demand,
+    receivable,
+    sweep,
+    requires_defense,
+    bom,
+    days,
+    min_qty_target,
+    own_defense_days,
+    min_own_stock,
+):
+    """
+    채널별 입고수량(반올림 전)을 계산합니다.
+
+    :param main: (SKU,) 메인 창고 재고
+    :param stock: (채널, SKU) 채널 창고 재고 (우선순위 순서)
+    :param demand: (채널, SKU) 채널별 일 수요
+    :param own_demand: (SKU,) 메인 창고에서 바로 나가는 일 수요 (자사몰)
+    :param receivable: (채널, SKU) 입고 가능 여부 (옵션 코드 등록)
+    :param sweep: (채널, SKU) 메인 재고 전량 입고 대상
+    :param requires_defense: (SKU,) 자사몰 방어 필요 여부
+    :param bom: ChannelBom
+    :return: (채널, SKU) 입고수량
+    """
+    main = main.astype(float)
+    stock = stock.astype(float)
+    n_channels, n = stock.shape
+    transfer = np.zeros((n_channels, n))
+    exhausted = np.zeros((n_channels, n), dtype=bool)
+
+    # 1. Sweep: 메인 재고 전량을 (우선순위가 가장 높은) 대상 채널로 보내고 시뮬레이션 제외
+    swept = np.zeros(n, dtype=bool)
+    for c in range(n_channels):
+        target = sweep[c] & ~swept
+        transfer[c, target] = main[target]
+        swept |= target
+    main[swept] = 0.0
+    exhausted[:, swept] = True
+
+    # 2. 최소 수량 우선 확보 (앞선 할당이 메인 재고를 줄이므로 후보 순서대로 처리)
+    defense = np.where(
+        requires_defense, np.maximum(own_demand * own_defense_days, min_own_stock), 0.0
+    )
+    for c in range(n_channels):
+        candidates = np.flatnonzero(~exhausted[c] & receivable[c] & (stock[c] < min_qty_target))
+        for i in candidates:
+            needed = min_qty_target - stock[c, i]
+            if bom.is_set[i]:
+                if bom.has_missing_component[i]:
+                    allocatable = 0
+                else:
+                    allocatable = float("inf")
+                    for j, qty in bom.components[i]:
+                        comp_avail = max(0, main[j] - defense[j])
+                        allocatable = min(allocatable, comp_avail / qty)
+            else:
+                allocatable = max(0, main[i] - defense[i])
+
+            alloc = min(needed, allocatable)
+            if alloc > 0:
+                transfer[c, i] += alloc
+                stock[c, i] += alloc
+                if bom.is_set[i]:
+                    for j, qty in bom.components[i]:
+                        main[j] -= alloc * qty
+                else:
+                    main[i] -= alloc
+
+    # 3. 일별 시뮬레이션
+    own_present = own_demand > 0
+    for _ in range(days):
+        for c in range(n_channels):
+            active = ~exhausted[c]
+
+            # 채널 재고 소진 및 부족분
+            covered = active & (stock[c] >= demand[c])
+            need = np.where(active & ~covered, demand[c] - stock[c], 0.0)
+            stock[c] = np.where(covered, stock[c] - demand[c], np.where(active, 0.0, stock[c]))
+
+            # 구성품별 메인 창고 소요량 (자사몰 수요는 첫 채널과 함께 차감)
+            drained, present = bom.drain(need, active)
+            if c == 0:
+                drained = drained + np.where(own_present, own_demand, 0.0)
+                present |= own_present
+
+            # 재고로 감당하지 못한 구성품은 소진 처리 (모든 채널에서 제외)
+            failed = present & ~(main >= drained)
+            main = np.where(present & ~failed, main - drained, main)
+            main[failed] = 0.0
+            exhausted[:, failed] = True
+
+            # 소요 구성품이 모두 버틴 SKU만 금일 부족분을 입고
+            waiting = (need > 0) & ~exhausted[c]
+            blocked = bom.any_component(failed)
+            transfer[c] += np.where(waiting & ~blocked, need, 0.0)
+            exhausted[c] |= waiting & blocked
+
+    return transfer
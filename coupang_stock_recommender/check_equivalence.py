@@ -0,0 +1,170 @@
+"""
+입고 수량 엔진 차이 검증
+
+고정해 둔 기준 엔진(recommender_reference)과 recommender.TRANSFER_ENGINES의 엔진을
+무작위 카탈로그/BOM으로 함께 실행하여 SKU별 입고수량 차이와 속도 비를 보고합니다.
+차이가 하나라도 있으면 종료 코드 1로 끝나므로, 성능 개선 작업의 통과 기준으로 사용합니다.
+
+실행:
+    python coupang_stock_recommender/check_equivalence.py --engine dict --cases 50
+    python coupang_stock_recommender/check_equivalence.py --engine dict --sizes 2000 10000 --cases 3
+"""
+
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+import numpy as np
+
+# 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_processor import process_data
+from recommender import POLICY_ENGINES, TRANSFER_ENGINES, calculate_transfer_quantities
+from recommender_reference import reference_transfer_quantities
+from synthetic_data import build_inputs, generate_sheet_values
+
+DEFAULT_CASES = 30
+DEFAULT_SIZE_RANGE = (20, 400)
+MAX_REPORTED_DIFFS = 10
+
+
+def _quiet(func, *args, **kwargs):
+    """함수의 출력(print)을 숨기고 (실행 시간, 결과)를 반환합니다."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        return time.perf_counter() - started, result
+
+
+def random_case(seed, n_skus=None):
+    """
+    무작위 카탈로그 하나를 만듭니다.
+    작은 카탈로그에 세트 비율을 높여 구성품 경합을 자주 만들고,
+    메인/쿠팡 재고를 경계값(0~3)으로 자주 설정하여 최소 수량/보존 수량 규칙을 건드리게 합니다.
+    """
+    rng = np.random.default_rng(seed)
+    if n_skus is None:
+        n_skus = int(rng.integers(*DEFAULT_SIZE_RANGE))
+    sheet_values = generate_sheet_values(
+        n_skus,
+        seed=seed,
+        set_ratio=float(rng.uniform(0.0, 0.4)),
+        max_components=int(rng.integers(2, 7)),
+    )
+
+    boundary_ratio = rng.uniform(0.0, 0.3)
+    for record in sheet_values["inventory_records"]:
+        if rng.random() < boundary_ratio:
+            record["한국창고재고"] = str(int(rng.integers(0, 4)))
+    for row in sheet_values["rocket_values"][2:]:
+        if rng.random() < boundary_ratio:
+            row[2] = str(int(rng.integers(0, 3)))
+            row[3] = "0"
+    return sheet_values
+
+
+def compare_case(sheet_values, engine):
+    """한 카탈로그에 대해 기준 엔진과 후보 엔진을 실행하고 차이를 반환합니다."""
+    (
+        df_inventory,
+        df_rocket,
+        df_sales,
+        df_bom,
+        discontinued_skus,
+        coupang_only_skus,
+    ) = build_inputs(sheet_values)
+    _, (df_final, _) = _quiet(process_data, df_inventory, df_rocket, df_sales, df_bom)
+
+    ref_seconds, expected = _quiet(
+        reference_transfer_quantities,
+        df_final.copy(),
+        df_bom=df_bom,
+        coupang_only_skus=coupang_only_skus,
+        discontinued_skus=discontinued_skus,
+    )
+    cand_seconds, actual = _quiet(
+        calculate_transfer_quantities,
+        df_final.copy(),
+        df_bom=df_bom,
+        coupang_only_skus=coupang_only_skus,
+        discontinued_skus=discontinued_skus,
+        engine=engine,
+    )
+
+    diffs = []
+    for sku in sorted(set(expected) | set(actual)):
+        ref_qty = expected.get(sku, 0)
+        cand_qty = actual.get(sku, 0)
+        if ref_qty != cand_qty:
+            diffs.append((sku, ref_qty, cand_qty))
+
+    return {
+        "n_skus": len(df_final),
+        "diffs": diffs,
+        "ref_seconds": ref_seconds,
+        "cand_seconds": cand_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="입고 수량 엔진 차이 검증")
+    parser.add_argument(
+        "--engine", default="dict", choices=sorted(set(TRANSFER_ENGINES) - POLICY_ENGINES)
+    )
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES)
+    parser.add_argument("--seed", type=int, default=0, help="첫 번째 케이스의 시드")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=None,
+        help="SKU 수를 고정하여 실행 (생략하면 케이스마다 무작위)",
+    )
+    parser.add_argument(
+        "--report-only",
+        action="store_true",
+        help="차이가 있어도 실패로 처리하지 않습니다. (의도적으로 정책이 다른 엔진 비교용)",
+    )
+    args = parser.parse_args()
+
+    sizes = args.sizes or [None]
+    total_ref = total_cand = 0.0
+    failed_cases = 0
+    total_diffs = 0
+
+    print(f"기준 엔진 vs '{args.engine}' 엔진 비교 ({args.cases}개 케이스 x {len(sizes)}개 규모)")
+    for size in sizes:
+        for case_no in range(args.cases):
+            seed = args.seed + case_no
+            result = compare_case(random_case(seed, size), args.engine)
+            total_ref += result["ref_seconds"]
+            total_cand += result["cand_seconds"]
+
+            status = "OK"
+            if result["diffs"]:
+                failed_cases += 1
+                total_diffs += len(result["diffs"])
+                status = f"차이 {len(result['diffs'])}개"
+            print(
+                f"  seed={seed:<6} SKU {result['n_skus']:>6}  "
+                f"기준 {result['ref_seconds']:.3f}초 / 후보 {result['cand_seconds']:.3f}초  {status}"
+            )
+            for sku, ref_qty, cand_qty in result["diffs"][:MAX_REPORTED_DIFFS]:
+                print(f"      {sku}: 입고수량 기준 {ref_qty} / 후보 {cand_qty}")
+
+    ratio = total_ref / total_cand if total_cand > 0 else float("inf")
+    print(
+        f"\n결과: 차이 발생 케이스 {failed_cases}개 (SKU {total_diffs}개), "
+        f"속도 비(기준/후보) {ratio:.2f}배"
+    )
+
+    if failed_cases and not args.report_only:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,4 +12,12 @@
 EXCLUDED_SKU_PREFIXES = [
     'set_fhb_',
     'set_gbft_',
-]
\ No newline at end of file
+]
+
+# --- 하루 입고 작업량 ---
+
+# 일일 작업 목록의 최대 총 수량 (입고수량의 누적 합계)
+# 엑셀 일일 작업 목록, 최적화 엔진의 하루 입고 가능 수량, 백테스트가 함께 사용합니다.
+DAILY_WORK_QTY_LIMIT = 160
+# 한도를 넘는 마지막 상품은 남은 수량이 이 값 이상일 때만 분할 입고
+MINIMUM_PARTIAL_QTY = 10
@@ -1,8 +1,11 @@
+import os
+import datetime
 import gspread
 import pandas as pd
 import numpy as np
-import socket
 from config import EXCLUDED_SKU_PREFIXES
+from google_client import open_spreadsheet as open_shared_spreadsheet
+from instrumentation import timed
 
 # --- 구글 시트 및 컬럼명 상수 ---
 
@@ -24,100 +27,302 @@ SRC_ROCKET_OPTION_ID = 'Option ID'
 
 # '매출시트' 원본 컬럼명
 SRC_SALES_SKU = '옵션관리코드'
+SRC_SALES_QTY = '수량'
+SRC_SALES_DATE = '날짜'
+
+# '0'이면 매출시트를 주문 행 그대로 DataFrame으로 만듭니다. (기본: SKU x 날짜별 합계로 미리 집계)
+SALES_PREAGGREGATE = os.environ.get("SALES_PREAGGREGATE", "1") != "0"
+# process_data의 최근 7일 매출 기준 (지금 - 7일, UTC)
+RECENT_SALES_DAYS = 7
 
 # '품절상품', '쿠팡전용상품' 원본 컬럼명
 SRC_COMMON_SKU = 'sku'
 
 
-def load_all_data(spreadsheet_name="로켓그로스_입고_발주_수량_관리시트_이이엘타임즈", creds_path='credentials/vocal-airline-291707-6cb22418b6f6.json'):
+def build_rocket_headers(header_level1, header_level2):
+    """
+    로켓그로스 재고의 2줄 헤더를 하나의 컬럼명 목록으로 합칩니다.
+    (예: 'Recent sales quantity' + 'Last 7 days' -> 'Recent sales quantity Last 7 days')
+    첫 줄이 병합 셀이라 비어 있으면 왼쪽 값을 이어서 사용합니다.
+
+    :param header_level1: 첫 번째 헤더 행
+    :param header_level2: 두 번째 헤더 행
+    :return: 합쳐진 컬럼명 리스트
+    """
+    level1 = pd.Series(list(header_level1), dtype=object).replace('', np.nan).ffill().fillna('')
+    return [
+        f"{h1} {h2}".strip() if h1 and h2 else h1 or h2 for h1, h2 in zip(level1, header_level2)
+    ]
+
+
+# 기본 스프레드시트 이름
+DEFAULT_SPREADSHEET_NAME = "로켓그로스_입고_발주_수량_관리시트_이이엘타임즈"
+DEFAULT_CREDS_PATH = 'credentials/vocal-airline-291707-6cb22418b6f6.json'
+
+
+@timed()
+def open_spreadsheet(spreadsheet_name=DEFAULT_SPREADSHEET_NAME, creds_path=DEFAULT_CREDS_PATH, refresh=False):
+    """
+    서비스 계정으로 인증하여 스프레드시트 핸들을 반환합니다.
+    반환된 핸들은 여러 번의 시트 로딩에 재사용할 수 있습니다.
+    인증된 클라이언트와 핸들은 google_client에서 공유하며, 요청별 타임아웃과 429/5xx 재시도가 적용됩니다.
+
+    :param refresh: True면 캐시된 연결을 버리고 다시 인증합니다.
+    """
+    spreadsheet_doc = open_shared_spreadsheet(spreadsheet_name, creds_path, refresh=refresh)
+    print(f"'{spreadsheet_name}' 스프레드시트에 성공적으로 연결했습니다.")
+    return spreadsheet_doc
+
+
+@timed()
+def load_inventory_sheet(spreadsheet_doc):
+    """'재고 시트' 데이터를 불러옵니다."""
+    inventory_sheet = spreadsheet_doc.worksheet(SHEET_INVENTORY)
+    inventory_data = inventory_sheet.get_all_records()
+    df_inventory = pd.DataFrame(inventory_data)
+    print(f"'{SHEET_INVENTORY}' 데이터를 성공적으로 불러왔습니다.")
+    return df_inventory
+
+
+def build_rocket_frame(rocket_values):
+    """'로켓그로스재고(매번입력)' 시트의 원본 값(2줄 헤더 포함)을 DataFrame으로 변환합니다."""
+    if len(rocket_values) < 2:
+        print(f"'{SHEET_ROCKET}' 시트에 데이터가 부족하여 처리할 수 없습니다.")
+        return pd.DataFrame()
+
+    df_rocket = pd.DataFrame(rocket_values[2:], columns=build_rocket_headers(rocket_values[0], rocket_values[1]))
+    print(f"'{SHEET_ROCKET}' 시트 데이터를 가공하여 성공적으로 불러왔습니다.")
+    return df_rocket
+
+
+@timed()
+def load_rocket_sheet(spreadsheet_doc):
+    """'로켓그로스재고(매번입력)' 데이터를 불러오고 복잡한 헤더를 가공합니다."""
+    rocket_sheet = spreadsheet_doc.worksheet(SHEET_ROCKET)
+    return build_rocket_frame(rocket_sheet.get_all_values())
+
+
+def _parse_sales_day(text):
+    """pandas로 날짜를 해석하여 UTC 기준 'YYYY-MM-DD'로 반환합니다. (process_data와 같은 규칙)"""
+    parsed = pd.to_datetime(text, format="mixed", errors="coerce", utc=True)
+    return None if pd.isna(parsed) else parsed.strftime("%Y-%m-%d")
+
+
+def sales_day(value, memo):
+    """
+    매출시트 날짜 값을 UTC 기준 날짜('YYYY-MM-DD')로 바꿉니다. 해석할 수 없으면 None.
+
+    시간대가 없는 값은 날짜 부분만으로 날짜가 정해지므로 날짜 부분별로 memo에 저장해 재사용하고,
+    시간대가 있는 값(+09:00 등)만 UTC로 변환합니다.
+    """
+    if value is None:
+        return None
+    text = value.strip() if isinstance(value, str) else str(value).strip()
+    if text[10:11] not in ("", " ", "T"):
+        # 'YYYY-MM-DD', 'YYYY.MM.DD HH:MM', 'YYYY-MM-DDTHH:MM:SS+09:00' 같은 모양이 아니면 값 전체로 해석
+        if text not in memo:
+            memo[text] = _parse_sales_day(text)
+        return memo[text]
+
+    date_part, time_part = text[:10], text[11:]
+    if "+" in time_part or "-" in time_part or time_part.endswith("Z"):
+        try:
+            parsed = datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+            if parsed.tzinfo is not None:
+                return parsed.astimezone(datetime.timezone.utc).date().isoformat()
+        except ValueError:
+            pass
+        return _parse_sales_day(text)
+
+    if date_part not in memo:
+        try:
+            memo[date_part] = datetime.date.fromisoformat(date_part).isoformat()
+        except ValueError:
+            # 'YYYY/MM/DD', 'YYYY.MM.DD' 등은 pandas로 해석, 날짜 부분만으로 안 되면 전체 값으로 한 번 더
+            memo[date_part] = _parse_sales_day(date_part)
+    if memo[date_part] is None and time_part:
+        return _parse_sales_day(text)
+    return memo[date_part]
+
+
+def _sales_quantity(value, memo):
+    """수량 값을 숫자로 바꿉니다. (clean_numeric_column과 같은 규칙, 해석할 수 없으면 0)"""
+    if value not in memo:
+        text = str(value).replace(",", "").strip()
+        try:
+            memo[value] = int(text)
+        except ValueError:
+            try:
+                quantity = float(text)
+                memo[value] = 0 if quantity != quantity else quantity
+            except ValueError:
+                memo[value] = 0
+    return memo[value]
+
+
+def aggregate_sales_values(sales_values, now=None):
+    """
+    '매출시트'의 원본 값을 한 번만 훑으며 SKU x 날짜(UTC)별 수량 합계로 바로 집계합니다.
+    주문 행 전체를 DataFrame으로 만들지 않으므로 메모리가 주문 수가 아닌 SKU-날짜 수에 비례합니다.
+
+    결과는 원본과 같은 컬럼(옵션관리코드, 날짜, 수량)이라 process_data가 그대로 처리합니다.
+    날짜는 'YYYY-MM-DD' 문자열이며, 해석할 수 없는 날짜는 None으로 모아 process_data가 원본처럼 제외합니다.
+
+    최근 7일 기준 시각(지금 - 7일)이 걸친 날만은 시각까지 해석하여 기준 이후/이전 합계를 나눕니다.
+    기준 이후 합계의 날짜는 그중 가장 늦은 시각이므로, process_data의 최근 7일 집계가 원본 행과 같습니다.
+
+    :param now: 기준 시각 (UTC pandas Timestamp, 기본값 지금)
+    :return: DataFrame, 옵션관리코드/수량 컬럼이 없으면 None
+    """
+    header = list(sales_values[2])
+    if SRC_SALES_SKU not in header or SRC_SALES_QTY not in header:
+        return None
+    sku_index = header.index(SRC_SALES_SKU)
+    qty_index = header.index(SRC_SALES_QTY)
+    date_index = header.index(SRC_SALES_DATE) if SRC_SALES_DATE in header else None
+
+    if now is None:
+        now = pd.to_datetime("today", utc=True)
+    cutoff = now - pd.Timedelta(days=RECENT_SALES_DAYS)
+    cutoff_day = cutoff.strftime("%Y-%m-%d")
+
+    totals = {}  # (sku, 날짜, 기준 이후 여부) -> 수량
+    latest = {}  # 기준일의 기준 이후 합계 키 -> 가장 늦은 시각
+    date_memo = {}
+    qty_memo = {}
+    time_memo = {}
+    for i in range(3, len(sales_values)):
+        row = sales_values[i]
+        if sku_index >= len(row) or row[sku_index] is None:
+            continue
+        quantity = _sales_quantity(row[qty_index], qty_memo) if qty_index < len(row) else 0
+        day = None
+        recent = False
+        if date_index is not None and date_index < len(row):
+            day = sales_day(row[date_index], date_memo)
+            if day == cutoff_day:
+                text = str(row[date_index]).strip()
+                if text not in time_memo:
+                    time_memo[text] = pd.to_datetime(
+                        text, format="mixed", errors="coerce", utc=True
+                    )
+                recent = time_memo[text] >= cutoff
+        key = (row[sku_index], day, recent)
+        totals[key] = totals.get(key, 0) + quantity
+        if recent and (key not in latest or time_memo[text] > latest[key]):
+            latest[key] = time_memo[text]
+
+    columns = {
+        SRC_SALES_SKU: [key[0] for key in totals],
+        SRC_SALES_QTY: list(totals.values()),
+    }
+    if date_index is not None:
+        columns[SRC_SALES_DATE] = [
+            latest[key].isoformat() if key[2] else key[1] for key in totals
+        ]
+    return pd.DataFrame(columns)
+
+
+def build_sales_frame(sales_values, aggregate=SALES_PREAGGREGATE):
+    """
+    '매출시트'의 원본 값(3번째 행이 헤더)을 DataFrame으로 변환합니다.
+
+    :param aggregate: True면 주문 행 대신 SKU x 날짜별 합계 (aggregate_sales_values)
+    """
+    if len(sales_values) < 3:
+        print(f"'{SHEET_SALES}'에 데이터가 부족하여 처리할 수 없습니다.")
+        return pd.DataFrame()
+
+    df_sales = aggregate_sales_values(sales_values) if aggregate else None
+    if df_sales is None:
+        df_sales = pd.DataFrame(sales_values[3:], columns=sales_values[2])
+    print(f"'{SHEET_SALES}' 데이터를 성공적으로 불러왔습니다.")
+    return df_sales
+
+
+@timed()
+def load_sales_sheet(spreadsheet_doc):
+    """'매출시트' 데이터를 불러옵니다."""
+    sales_sheet = spreadsheet_doc.worksheet(SHEET_SALES)
+    return build_sales_frame(sales_sheet.get_all_values())
+
+
+def build_bom_frame(bom_data, excluded_prefixes=EXCLUDED_SKU_PREFIXES):
+    """'세트구성품' 시트의 레코드를 DataFrame으로 변환하고 제외 대상 세트를 걸러냅니다."""
+    df_bom = pd.DataFrame(bom_data)
+    # 모든 sku를 문자열로 변환하여 join 오류 방지
+    df_bom = df_bom.astype(str)
+
+    # [추가] set_fhb_ 로 시작하는 세트 상품 제외 (BOM 관계 끊기)
+    if '세트_ID' in df_bom.columns and excluded_prefixes:
+        df_bom = df_bom[~df_bom['세트_ID'].str.startswith(tuple(excluded_prefixes), na=False)]
+
+    print(f"'{SHEET_BOM}' 시트 데이터를 성공적으로 불러왔습니다.")
+    return df_bom
+
+
+@timed()
+def load_bom_sheet(spreadsheet_doc, excluded_prefixes=EXCLUDED_SKU_PREFIXES):
+    """'세트구성품' 데이터를 불러옵니다. 시트가 없으면 None을 반환합니다."""
+    try:
+        bom_sheet = spreadsheet_doc.worksheet(SHEET_BOM)
+        return build_bom_frame(bom_sheet.get_all_records(), excluded_prefixes)
+    except gspread.exceptions.WorksheetNotFound:
+        print(f"경고: '{SHEET_BOM}' 워크시트를 찾을 수 없습니다. 세트 상품 판매량 분배가 비활성화됩니다.")
+        return None
+
+
+@timed()
+def load_sku_list_sheet(spreadsheet_doc, sheet_name):
+    """'품절상품', '쿠팡전용상품'처럼 sku 컬럼 하나로 된 시트를 SKU 리스트로 불러옵니다."""
+    try:
+        sku_sheet = spreadsheet_doc.worksheet(sheet_name)
+        df_skus = pd.DataFrame(sku_sheet.get_all_records())
+        skus = df_skus[SRC_COMMON_SKU].astype(str).tolist() if SRC_COMMON_SKU in df_skus.columns else []
+        print(f"'{sheet_name}' 시트에서 {len(skus)}개의 SKU를 불러왔습니다.")
+        return skus
+    except gspread.exceptions.WorksheetNotFound:
+        print(f"경고: '{sheet_name}' 워크시트를 찾을 수 없습니다.")
+        return []
+
+
+@timed()
+def load_all_data(
+    spreadsheet_name=DEFAULT_SPREADSHEET_NAME,
+    creds_path=DEFAULT_CREDS_PATH,
+    spreadsheet_doc=None,
+    excluded_prefixes=EXCLUDED_SKU_PREFIXES,
+):
     """
     Google Sheets에서 재고, 로켓그로스, 매출 데이터를 불러와 DataFrame으로 반환합니다.
     
     :param spreadsheet_name: 연결할 Google 스프레드시트 이름
     :param creds_path: 서비스 계정 인증 파일 경로
+    :param spreadsheet_doc: 이미 열어 둔 스프레드시트 핸들 (있으면 인증/열기를 건너뜀)
+    :param excluded_prefixes: 제외할 세트 SKU 접두사 (기본값 config.EXCLUDED_SKU_PREFIXES)
     :return: df_inventory, df_rocket, df_sales, df_bom, discontinued_skus, coupang_only_skus 6개의 객체를 담은 튜플
     """
     try:
-        # 네트워크 연결 타임아웃 설정 (무한 대기 방지, 120초)
-        socket.setdefaulttimeout(120)
-
-        # 서비스 계정 인증 정보 사용하여 구글 시트와 연결
-        gc = gspread.service_account(filename=creds_path)
-        spreadsheet_doc = gc.open(spreadsheet_name)
-        print(f"'{spreadsheet_name}' 스프레드시트에 성공적으로 연결했습니다.")
+        if spreadsheet_doc is None:
+            spreadsheet_doc = open_spreadsheet(spreadsheet_name, creds_path)
 
         # 1-1. '재고 시트' 데이터 불러오기
-        inventory_sheet = spreadsheet_doc.worksheet(SHEET_INVENTORY)
-        inventory_data = inventory_sheet.get_all_records()
-        df_inventory = pd.DataFrame(inventory_data)
-        print(f"'{SHEET_INVENTORY}' 데이터를 성공적으로 불러왔습니다.")
+        df_inventory = load_inventory_sheet(spreadsheet_doc)
 
         # 1-2. '로켓그로스재고(매번입력)' 데이터 불러오기 및 복잡한 헤더 가공
-        rocket_sheet = spreadsheet_doc.worksheet(SHEET_ROCKET)
-        rocket_values = rocket_sheet.get_all_values()
-        
-        if len(rocket_values) < 2:
-            print(f"'{SHEET_ROCKET}' 시트에 데이터가 부족하여 처리할 수 없습니다.")
-            df_rocket = pd.DataFrame()
-        else:
-            df_rocket = pd.DataFrame(rocket_values[2:], columns=pd.MultiIndex.from_arrays(rocket_values[:2]))
-            new_header_level1 = df_rocket.columns.get_level_values(0).to_series().replace('', np.nan).ffill().fillna('')
-            new_header_level2 = df_rocket.columns.get_level_values(1)
-            final_headers = [
-                f"{h1} {h2}".strip() if h1 and h2 else h1 or h2 for h1, h2 in zip(new_header_level1, new_header_level2)
-            ]
-            df_rocket.columns = final_headers
-            print(f"'{SHEET_ROCKET}' 시트 데이터를 가공하여 성공적으로 불러왔습니다.")
+        df_rocket = load_rocket_sheet(spreadsheet_doc)
 
         # 1-3. '매출시트' 데이터 불러오기
-        sales_sheet = spreadsheet_doc.worksheet(SHEET_SALES)
-        sales_values = sales_sheet.get_all_values()
-        
-        if len(sales_values) < 3:
-            print(f"'{SHEET_SALES}'에 데이터가 부족하여 처리할 수 없습니다.")
-            df_sales = pd.DataFrame()
-        else:
-            df_sales = pd.DataFrame(sales_values[3:], columns=sales_values[2])
-            print(f"'{SHEET_SALES}' 데이터를 성공적으로 불러왔습니다.")
+        df_sales = load_sales_sheet(spreadsheet_doc)
 
         # 1-4. '세트구성품' 데이터 불러오기
-        try:
-            bom_sheet = spreadsheet_doc.worksheet(SHEET_BOM)
-            bom_data = bom_sheet.get_all_records()
-            df_bom = pd.DataFrame(bom_data)
-            # 모든 sku를 문자열로 변환하여 join 오류 방지
-            df_bom = df_bom.astype(str)
-            
-            # [추가] set_fhb_ 로 시작하는 세트 상품 제외 (BOM 관계 끊기)
-            if '세트_ID' in df_bom.columns and EXCLUDED_SKU_PREFIXES:
-                df_bom = df_bom[~df_bom['세트_ID'].str.startswith(tuple(EXCLUDED_SKU_PREFIXES), na=False)]
-
-            print(f"'{SHEET_BOM}' 시트 데이터를 성공적으로 불러왔습니다.")
-        except gspread.exceptions.WorksheetNotFound:
-            print(f"경고: '{SHEET_BOM}' 워크시트를 찾을 수 없습니다. 세트 상품 판매량 분배가 비활성화됩니다.")
-            df_bom = None
+        df_bom = load_bom_sheet(spreadsheet_doc, excluded_prefixes)
 
         # 1-5. '품절상품' 데이터 불러오기
-        try:
-            discontinued_sheet = spreadsheet_doc.worksheet(SHEET_DISCONTINUED)
-            discontinued_data = discontinued_sheet.get_all_records()
-            df_discontinued = pd.DataFrame(discontinued_data)
-            discontinued_skus = df_discontinued[SRC_COMMON_SKU].astype(str).tolist() if SRC_COMMON_SKU in df_discontinued.columns else []
-            print(f"'{SHEET_DISCONTINUED}' 시트에서 {len(discontinued_skus)}개의 SKU를 불러왔습니다.")
-        except gspread.exceptions.WorksheetNotFound:
-            print(f"경고: '{SHEET_DISCONTINUED}' 워크시트를 찾을 수 없습니다.")
-            discontinued_skus = []
+        discontinued_skus = load_sku_list_sheet(spreadsheet_doc, SHEET_DISCONTINUED)
 
         # 1-6. '쿠팡전용상품' 데이터 불러오기
-        try:
-            coupang_only_sheet = spreadsheet_doc.worksheet(SHEET_COUPANG_ONLY)
-            coupang_only_data = coupang_only_sheet.get_all_records()
-            df_coupang_only = pd.DataFrame(coupang_only_data)
-            coupang_only_skus = df_coupang_only[SRC_COMMON_SKU].astype(str).tolist() if SRC_COMMON_SKU in df_coupang_only.columns else []
-            print(f"'{SHEET_COUPANG_ONLY}' 시트에서 {len(coupang_only_skus)}개의 SKU를 불러왔습니다.")
-        except gspread.exceptions.WorksheetNotFound:
-            print(f"경고: '{SHEET_COUPANG_ONLY}' 워크시트를 찾을 수 없습니다.")
-            coupang_only_skus = []
+        coupang_only_skus = load_sku_list_sheet(spreadsheet_doc, SHEET_COUPANG_ONLY)
 
         return df_inventory, df_rocket, df_sales, df_bom, discontinued_skus, coupang_only_skus
 
@@ -1,5 +1,6 @@
 import pandas as pd
 from config import EXCLUDED_SKU_PREFIXES
+from instrumentation import lap, timed
 
 # --- 컬럼명 상수 ---
 
@@ -60,10 +61,12 @@ def clean_numeric_column(series):
     ).fillna(0)
 
 
-def process_data(df_inventory, df_rocket, df_sales, df_bom):
+@timed()
+def process_data(df_inventory, df_rocket, df_sales, df_bom, excluded_prefixes=EXCLUDED_SKU_PREFIXES):
     """
     각 시트의 데이터를 정제하고 'SKU'를 기준으로 통합된 DataFrame을 반환합니다.
 
+    :param excluded_prefixes: 결과에서 제외할 SKU 접두사 (기본값 config.EXCLUDED_SKU_PREFIXES)
     """
     if (
         df_inventory is None or df_rocket is None or df_sales is None
@@ -102,6 +105,7 @@ def process_data(df_inventory, df_rocket, df_sales, df_bom):
     ].copy()
 
     print("'재고 시트' 전처리 완료.")
+    lap("inventory", rows=len(df_inventory_processed))
 
     # --- 2. '로켓그로스재고' 시트 전처리 ---
     ## '재고 시트'의 매핑 정보를 사용하여 쿠팡 Option ID를 우리 시스템 SKU로 변환합니다.
@@ -168,6 +172,7 @@ def process_data(df_inventory, df_rocket, df_sales, df_bom):
         df_rocket_processed.drop(columns=[COL_INBOUND_COUPANG], inplace=True)
 
     print("'로켓그로스재고' 시트 전처리 완료.")
+    lap("rocket", rows=len(df_rocket_processed))
 
     # --- 3. '매출시트' 전처리 ---
     # '옵션정보' 컬럼에서 코드를 추출해야 할 수도 있습니다. 우선 '상품번호'로 가정합니다.
@@ -230,6 +235,8 @@ def process_data(df_inventory, df_rocket, df_sales, df_bom):
         print("'매출시트'에 'sku' 또는 '수량' 컬럼이 없어 집계할 수 없습니다.")
         monthly_sales = pd.DataFrame(columns=[COL_SKU, COL_SALES_30D_OWN])
 
+    lap("sales", rows=len(df_sales))
+
     # 세트 판매량 분배 결과를 저장할 빈 데이터프레임 초기화
     component_sales_coupang = pd.DataFrame(columns=[COL_SKU, COL_SALES_30D_COUPANG])
     component_sales_ownmall = pd.DataFrame(columns=[COL_SKU, COL_SALES_30D_OWN])
@@ -285,56 +292,44 @@ def process_data(df_inventory, df_rocket, df_sales, df_bom):
         )
         df_bom_long["구성품_개수"] = clean_numeric_column(df_bom_long["조합_개수"])
 
-        # 3. 세트 판매량 -> 단품 판매량 분배 (쿠팡)
+        # 3. 세트 -> 최하위 구성품 전개 (세트 안의 세트까지 모두 펼침)
+        # scipy를 쓰는 BOM 모듈은 세트 구성 정보가 있을 때만 불러옵니다. (스냅샷 기록 등 시작 시간 단축)
+        from bom import BomMatrix
+
+        bom_matrix = BomMatrix(
+            df_bom_long,
+            set_col=COL_SET_ID,
+            component_col=COL_BOM_COMPONENT_SKU,
+            qty_col="구성품_개수",
+        )
+        if bom_matrix.depth > 1:
+            print(f"다단계 세트 구성 전개 완료 (최대 {bom_matrix.depth}단계).")
+
+        # 4. 세트 판매량 -> 단품 판매량 분배 (쿠팡)
         if not set_sales_coupang.empty:
-            # 세트 판매 정보와 세트 구성 정보 병합
-            bom_coupang_sales = pd.merge(
-                df_bom_long,
-                set_sales_coupang,
-                left_on=COL_SET_ID,
-                right_on=COL_SKU,
-                how="left",
-            )
-            # 단품 레벨로 판매량 분배 (NaN은 0으로 처리 후 계산)
-            bom_coupang_sales[COL_SALES_30D_COUPANG] = (
-                bom_coupang_sales[COL_SALES_30D_COUPANG].fillna(0)
-                * bom_coupang_sales["구성품_개수"]
-            )
-            # '구성품_옵션' 기준으로 판매량 집계
             component_sales_coupang = (
-                bom_coupang_sales.groupby(COL_BOM_COMPONENT_SKU)[COL_SALES_30D_COUPANG]
-                .sum()
-                .reset_index()
-            )
-            component_sales_coupang.rename(
-                columns={COL_BOM_COMPONENT_SKU: COL_SKU}, inplace=True
+                bom_matrix.distribute(
+                    set_sales_coupang.set_index(COL_SKU)[COL_SALES_30D_COUPANG]
+                )
+                .rename_axis(COL_SKU)
+                .reset_index(name=COL_SALES_30D_COUPANG)
             )
 
-        # 4. 세트 판매량 -> 단품 판매량 분배 (자사몰/스토어)
+        # 5. 세트 판매량 -> 단품 판매량 분배 (자사몰/스토어)
         if not set_sales_ownmall.empty:
-            # 세트 판매 정보와 세트 구성 정보 병합
-            bom_ownmall_sales = pd.merge(
-                df_bom_long, set_sales_ownmall, left_on=COL_SET_ID, right_on=COL_SKU
-            )
-
-            # 단품 레벨로 판매량 분배 (NaN은 0으로 처리 후 계산)
-            bom_ownmall_sales[COL_SALES_30D_OWN] = (
-                bom_ownmall_sales[COL_SALES_30D_OWN].fillna(0)
-                * bom_ownmall_sales["구성품_개수"]
-            )
-            # '구성품_옵션' 기준으로 판매량 집계
             component_sales_ownmall = (
-                bom_ownmall_sales.groupby(COL_BOM_COMPONENT_SKU)[COL_SALES_30D_OWN]
-                .sum()
-                .reset_index()
-            )
-            component_sales_ownmall.rename(
-                columns={COL_BOM_COMPONENT_SKU: COL_SKU}, inplace=True
+                bom_matrix.distribute(
+                    set_sales_ownmall.set_index(COL_SKU)[COL_SALES_30D_OWN]
+                )
+                .rename_axis(COL_SKU)
+                .reset_index(name=COL_SALES_30D_OWN)
             )
         print("세트 판매량 분배 완료.")
     else:
         print("경고: '세트구성품' 데이터가 없어 판매량 재계산을 건너뜁니다.")
 
+    lap("bom_distribution")
+
     # --- 4. 데이터 통합 ---
     # 1. 재고 + 로켓그로스 재고 병합
     # 'outer' join을 사용하여 한쪽에만 있는 상품도 포함시킵니다.
@@ -450,12 +445,13 @@ def process_data(df_inventory, df_rocket, df_sales, df_bom):
         df_final.drop(columns=[COL_TEMP_DIST_SALES_OWN], inplace=True)
 
     # [추가] set_fhb_ 로 시작하는 상품 제외 (없는 상품 처리)
-    if COL_SKU in df_final.columns and EXCLUDED_SKU_PREFIXES:
+    if COL_SKU in df_final.columns and excluded_prefixes:
         df_final = df_final[
-            ~df_final[COL_SKU].str.startswith(tuple(EXCLUDED_SKU_PREFIXES), na=False)
+            ~df_final[COL_SKU].str.startswith(tuple(excluded_prefixes), na=False)
         ]
 
     print("최종 데이터 통합 및 정제 완료.")
+    lap("merge", rows=len(df_final))
 
     # 세트 상품 SKU 목록 추출
     if df_bom is not None and not df_bom.empty:
@@ -0,0 +1,179 @@
+"""
+추천 결과 엑셀 파일 생성
+
+전체 추천 목록과 일일 작업 목록을 openpyxl 쓰기 전용(write-only) 모드로 메모리 버퍼에 작성합니다.
+쓰기 전용 모드는 행을 바로 직렬화하므로 목록 크기와 관계없이 메모리 사용량이 일정하며,
+결과는 {파일명: bytes}로 반환되어 슬랙 업로드나 캐시에 그대로 사용할 수 있습니다.
+디스크에는 save_workbooks()를 호출할 때만 저장합니다.
+"""
+
+import io
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from config import DAILY_WORK_QTY_LIMIT, MINIMUM_PARTIAL_QTY
+from instrumentation import timed
+
+# Excel 출력용 컬럼 (재고 소진 예상일, 쿠팡 재고, 메인 재고는 제외)
+OUTPUT_COLUMNS = [
+    "상품그룹",
+    "sku",
+    "상품명",
+    "쿠팡재고",
+    "쿠팡_재고소진_예상일",
+    "입고수량",
+]
+
+EXCEL_FILE_NAME = "recommendation_result_local.xlsx"
+DAILY_EXCEL_FILE_NAME = "daily_work_stocks.xlsx"
+DEFAULT_SHEET_NAME = "Sheet1"
+# 설명 모드(allocation_trace)의 입고 결정 기록을 전체 추천 목록 파일에 덧붙이는 시트
+TRACE_SHEET_NAME = "입고_근거"
+
+
+def sort_by_group_urgency(df_reco):
+    """
+    그룹 긴급도 순으로 전체 목록을 정렬합니다.
+    그룹의 긴급도는 그룹 내 최소 재고 소진 예상일로 결정됩니다.
+    """
+    df_reco = df_reco.copy()
+    df_reco["_group_min_depletion"] = df_reco.groupby("상품그룹")[
+        "쿠팡_재고소진_예상일"
+    ].transform("min")
+    return df_reco.sort_values(
+        by=["_group_min_depletion", "상품그룹", "쿠팡_재고소진_예상일"],
+        ascending=[True, True, True],
+    ).reset_index(drop=True)
+
+
+def build_daily_work_list(df_reco, output_cols):
+    """
+    일일 작업 목록을 만듭니다.
+    (입고수량 누적 합계 160개까지, 마지막 제품은 10개 이상일 경우 분할 입고)
+    정렬 기준: 재고 0개 우선, 그 다음 재고 소진 예상일 (오름차순)
+    """
+    df_for_daily = df_reco.copy()
+    df_for_daily["_is_zero_stock"] = (df_for_daily["쿠팡재고"] == 0).astype(int)
+    df_for_daily = df_for_daily.sort_values(
+        by=["_is_zero_stock", "쿠팡_재고소진_예상일", "쿠팡_일평균_판매량"],
+        ascending=[False, True, False],
+    ).reset_index(drop=True)
+
+    daily_list = []
+    total_qty = 0
+
+    for _, row in df_for_daily.iterrows():
+        item_qty = row["입고수량"]
+        if total_qty + item_qty <= DAILY_WORK_QTY_LIMIT:
+            daily_list.append(row)
+            total_qty += item_qty
+        else:
+            remaining_qty = DAILY_WORK_QTY_LIMIT - total_qty
+            if remaining_qty >= MINIMUM_PARTIAL_QTY:
+                last_item = row.copy()
+                last_item["입고수량"] = remaining_qty
+                daily_list.append(last_item)
+            break
+
+    df_daily = pd.DataFrame(daily_list)
+    if not df_daily.empty:
+        df_daily = df_daily.reset_index(drop=True)
+
+    # 목록 확정 후 "긴급" 열 추가
+    # 조건: 재고 소진 예상일 < 7일 또는 재고 <= 1개
+    df_daily["긴급"] = ""
+    if not df_daily.empty:
+        urgent_condition = (df_daily["쿠팡_재고소진_예상일"] < 7) | (
+            df_daily["쿠팡재고"] <= 1
+        )
+        df_daily.loc[urgent_condition, "긴급"] = "긴급"
+
+        # 160개 리스트업이 완료된 후, 제품군별로 나열
+        df_daily = df_daily.sort_values(by=["상품그룹"]).reset_index(drop=True)
+
+    # "긴급" 열을 맨 마지막에 추가하여 일일 작업 목록의 출력 열 정의
+    daily_output_cols = output_cols + ["긴급"]
+    final_daily_cols = [col for col in daily_output_cols if col in df_daily.columns]
+    return df_daily[final_daily_cols]
+
+
+def build_export_frames(df_reco):
+    """
+    엑셀로 내보낼 목록을 만듭니다.
+
+    :return: dict (파일명 -> DataFrame)
+    """
+    df_reco = sort_by_group_urgency(df_reco)
+    available_cols = [col for col in OUTPUT_COLUMNS if col in df_reco.columns]
+    return {
+        EXCEL_FILE_NAME: df_reco[available_cols].copy(),
+        DAILY_EXCEL_FILE_NAME: build_daily_work_list(df_reco, available_cols),
+    }
+
+
+def _to_cell_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):  # numpy 스칼라 -> 파이썬 기본 타입
+        return value.item()
+    return value
+
+
+def sheets_to_xlsx_bytes(sheets):
+    """
+    여러 시트를 가진 엑셀 파일 하나를 메모리에 작성합니다.
+
+    :param sheets: dict (시트명 -> DataFrame)
+    :return: bytes
+    """
+    wb = Workbook(write_only=True)
+    header_font = Font(bold=True)
+
+    for sheet_name, df in sheets.items():
+        ws = wb.create_sheet(title=sheet_name)
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(ws, value=str(col))
+            cell.font = header_font
+            header.append(cell)
+        ws.append(header)
+        for row in df.itertuples(index=False, name=None):
+            ws.append([_to_cell_value(v) for v in row])
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@timed("export_excel")
+def export_workbooks(frames, trace_frame=None):
+    """
+    build_export_frames() 결과를 엑셀 파일로 메모리에 만듭니다.
+
+    :param trace_frame: AllocationTrace.to_frame() 결과. 있으면 전체 추천 목록 파일에
+        '입고_근거' 시트로 추가합니다.
+    :return: dict (파일명 -> bytes)
+    """
+    files = {}
+    for file_name, df in frames.items():
+        sheets = {DEFAULT_SHEET_NAME: df}
+        if trace_frame is not None and file_name == EXCEL_FILE_NAME:
+            sheets[TRACE_SHEET_NAME] = trace_frame
+        files[file_name] = sheets_to_xlsx_bytes(sheets)
+    return files
+
+
+def save_workbooks(files, directory):
+    """메모리에 만든 엑셀 파일을 디스크에 저장하고 경로 목록을 반환합니다."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for file_name, content in files.items():
+        path = os.path.join(directory, file_name)
+        with open(path, "wb") as f:
+            f.write(content)
+        paths.append(path)
+    return paths
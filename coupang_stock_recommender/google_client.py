@@ -0,0 +1,112 @@
+"""
+구글 시트 공용 클라이언트 (시트 로딩 / 로켓그로스 재고 업로드 공용)
+
+- 자격증명 파일별로 인증된 gspread 클라이언트 하나를, 스프레드시트 이름별로 핸들 하나를 재사용합니다.
+- 연결 풀을 가진 세션으로 HTTPS 연결을 재사용하고, 요청마다 (연결, 응답) 타임아웃을 적용합니다.
+  (전역 socket.setdefaulttimeout을 바꾸지 않음)
+- 429(할당량 초과)/5xx 응답과 연결 오류는 지터를 섞은 지수 백오프로 재시도합니다.
+  부하가 몰리면 실행이 실패하는 대신 느려집니다.
+
+사용:
+    from google_client import open_spreadsheet
+
+    spreadsheet = open_spreadsheet(spreadsheet_name, creds_path)
+"""
+
+import os
+import time
+import random
+import threading
+
+import gspread
+import requests
+from gspread.http_client import HTTPClient
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (10, 120)  # (연결, 응답) 초
+DEFAULT_POOL_SIZE = 8
+MAX_RETRIES = int(os.environ.get("GOOGLE_MAX_RETRIES", "6"))
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 64.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryingHTTPClient(HTTPClient):
+    """연결 풀, 요청별 타임아웃, 429/5xx 재시도를 갖춘 gspread HTTP 클라이언트"""
+
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
+        adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.set_timeout(DEFAULT_TIMEOUT)
+        self.max_retries = MAX_RETRIES
+
+    def _wait(self, attempt, retry_after=None):
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            # full jitter: 동시에 실패한 요청들이 같은 시각에 다시 몰리지 않도록 분산
+            delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2**attempt))
+        time.sleep(delay)
+
+    def request(self, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return super().request(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status = e.response.status_code
+                if status not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    raise
+                retry_after = e.response.headers.get("Retry-After")
+                retry_after = float(retry_after) if retry_after and retry_after.isdigit() else None
+                print(f"[구글 시트] HTTP {status}, 재시도합니다. ({attempt + 1}/{self.max_retries})")
+                self._wait(attempt, retry_after)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"[구글 시트] 연결 오류, 재시도합니다. ({attempt + 1}/{self.max_retries}): {e}")
+                self._wait(attempt)
+
+
+_clients = {}
+_spreadsheets = {}
+_lock = threading.Lock()
+
+
+def get_client(creds_path):
+    """자격증명 파일별로 하나의 인증된 gspread 클라이언트(연결 풀)를 재사용합니다."""
+    with _lock:
+        if creds_path not in _clients:
+            _clients[creds_path] = gspread.service_account(
+                filename=creds_path, http_client=RetryingHTTPClient
+            )
+        return _clients[creds_path]
+
+
+def open_spreadsheet(spreadsheet_name, creds_path, refresh=False):
+    """
+    스프레드시트 핸들을 반환합니다. 같은 이름/자격증명으로 이미 연 핸들이 있으면 재사용합니다.
+
+    :param refresh: True면 인증부터 다시 하여 새로 엽니다. (인증 만료 등 연결 문제 후)
+    """
+    key = (creds_path, spreadsheet_name)
+    if refresh:
+        reset(creds_path)
+    with _lock:
+        spreadsheet = _spreadsheets.get(key)
+    if spreadsheet is not None:
+        return spreadsheet
+
+    spreadsheet = get_client(creds_path).open(spreadsheet_name)
+    with _lock:
+        _spreadsheets[key] = spreadsheet
+    return spreadsheet
+
+
+def reset(creds_path=None):
+    """캐시된 클라이언트와 핸들을 지웁니다. (creds_path가 없으면 전부)"""
+    with _lock:
+        for key in [k for k in _spreadsheets if creds_path is None or k[0] == creds_path]:
+            del _spreadsheets[key]
+        for key in [k for k in _clients if creds_path is None or k == creds_path]:
+            del _clients[key]
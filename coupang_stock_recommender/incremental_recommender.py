@@ -0,0 +1,182 @@
+"""
+변경된 SKU만 다시 계산하는 증분 추천
+
+실행 사이에 재고/판매량이 바뀌는 SKU는 보통 수백 개뿐이므로,
+직전 실행의 SKU별 엔진 입력과 입고수량을 보관해 두고 이번 입력과 비교합니다.
+세트-구성품 관계로 연결된 SKU 묶음(BOM 연결 요소) 단위로만 재고가 서로 영향을 주므로,
+변경된 SKU가 속한 묶음만 다시 시뮬레이션하고 나머지는 저장된 결과를 그대로 사용합니다.
+
+BOM, 엔진, 정책 상수가 바뀌었거나 중복 SKU가 있으면 전체를 다시 계산합니다.
+모든 SKU를 함께 푸는 엔진(GLOBAL_ENGINES, 예: optimizer)은 항상 전체를 다시 계산합니다.
+서비스 모드처럼 프로세스가 계속 살아 있는 경우에 사용합니다.
+"""
+
+import pandas as pd
+
+from instrumentation import lap, timed
+from recommender import (
+    COL_SKU,
+    COL_STOCK_COUPANG,
+    COL_STOCK_MAIN,
+    GLOBAL_ENGINES,
+    MAX_DAYS,
+    MIN_OWN_STOCK,
+    MIN_QTY_TARGET,
+    OWN_DEFENSE_DAYS,
+    _build_display,
+    _get_engine,
+    _prepare_inputs,
+)
+
+# 엔진 결과를 결정하는 SKU별 입력 (_prepare_inputs 이후 컬럼)
+ENGINE_INPUT_COLUMNS = [
+    COL_STOCK_MAIN,
+    COL_STOCK_COUPANG,
+    "sim_daily_coupang",
+    "sim_daily_own",
+    "is_coupang_only",
+    "is_discontinued",
+    "has_missing_code",
+    "is_sweep",
+]
+
+
+def _engine_inputs(df):
+    """SKU를 인덱스로 하는 엔진 입력 DataFrame을 만듭니다."""
+    return df.set_index(COL_SKU)[ENGINE_INPUT_COLUMNS]
+
+
+def _changed_skus(prev_inputs, inputs):
+    """추가/삭제되었거나 엔진 입력 값이 바뀐 SKU 집합을 반환합니다."""
+    added = inputs.index.difference(prev_inputs.index)
+    removed = prev_inputs.index.difference(inputs.index)
+    common = inputs.index.intersection(prev_inputs.index)
+
+    before = prev_inputs.loc[common]
+    after = inputs.loc[common]
+    differs = (before != after) & ~(before.isna() & after.isna())
+    modified = common[differs.any(axis=1).to_numpy()]
+
+    return set(added) | set(removed) | set(modified)
+
+
+def build_bom_components(skus, bom_map):
+    """
+    세트와 구성품을 연결한 그래프의 연결 요소를 구합니다. (Union-Find)
+
+    :return: dict (sku -> 연결 요소 대표 SKU)
+    """
+    parent = {}
+
+    def find(node):
+        root = parent.setdefault(node, node)
+        while root != parent[root]:
+            root = parent[root]
+        # 경로 압축
+        while node != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for sku in skus:
+        find(sku)
+    for set_sku, components in bom_map.items():
+        set_root = find(set_sku)
+        for comp_sku, _ in components:
+            comp_root = find(comp_sku)
+            if comp_root != set_root:
+                parent[comp_root] = set_root
+
+    return {node: find(node) for node in parent}
+
+
+def _bom_signature(bom_map):
+    return tuple(sorted((set_sku, tuple(components)) for set_sku, components in bom_map.items()))
+
+
+class IncrementalRecommender:
+    """직전 실행 결과를 보관하며 변경된 BOM 연결 요소만 다시 계산합니다."""
+
+    def __init__(self):
+        self._state = None
+
+    def reset(self):
+        """보관 중인 결과를 지워 다음 실행을 전체 계산으로 만듭니다."""
+        self._state = None
+
+    def _settings_key(self, engine, bom_map):
+        policy = (MIN_QTY_TARGET, OWN_DEFENSE_DAYS, MIN_OWN_STOCK, MAX_DAYS)
+        return (engine, policy, _bom_signature(bom_map))
+
+    @timed("calculate_coupang_transfer_recommendations")
+    def calculate(
+        self,
+        df_final,
+        df_bom=None,
+        coupang_safety_days=30,
+        coupang_only_skus=None,
+        discontinued_skus=None,
+        bom_parsed=None,
+        engine="dict",
+        trace=None,
+    ):
+        """
+        calculate_coupang_transfer_recommendations()와 같은 인자/결과를 갖습니다.
+        (trace에는 이번 실행에서 다시 계산한 SKU의 입고 결정만 기록됩니다.)
+        """
+        if df_final.empty:
+            return pd.DataFrame()
+        allocate = _get_engine(engine)
+
+        df, bom_map, comp_usage_map = _prepare_inputs(
+            df_final, df_bom, coupang_only_skus, discontinued_skus, bom_parsed
+        )
+        inputs = _engine_inputs(df)
+        settings_key = self._settings_key(engine, bom_map)
+
+        prev = self._state
+        if (
+            prev is None
+            or engine in GLOBAL_ENGINES
+            or prev["settings_key"] != settings_key
+            or inputs.index.duplicated().any()
+        ):
+            quantities = allocate(df, bom_map, comp_usage_map, trace=trace)
+            lap("incremental", mode="full", resimulated=len(df), total=len(df))
+        else:
+            changed = _changed_skus(prev["inputs"], inputs)
+            components = build_bom_components(
+                set(inputs.index) | set(prev["inputs"].index), bom_map
+            )
+            dirty_roots = {components[sku] for sku in changed}
+            dirty_mask = df[COL_SKU].map(components).isin(dirty_roots)
+
+            quantities = {
+                sku: qty
+                for sku, qty in prev["quantities"].items()
+                if sku in inputs.index and components[sku] not in dirty_roots
+            }
+            if dirty_mask.any():
+                quantities.update(allocate(df[dirty_mask], bom_map, comp_usage_map, trace=trace))
+
+            resimulated = int(dirty_mask.sum())
+            print(
+                f"[증분 계산] 변경 SKU {len(changed)}개 -> "
+                f"{resimulated}/{len(df)}개 SKU 재계산"
+            )
+            lap(
+                "incremental",
+                mode="partial",
+                changed=len(changed),
+                resimulated=resimulated,
+                total=len(df),
+            )
+
+        self._state = {
+            "settings_key": settings_key,
+            "inputs": inputs,
+            "quantities": quantities,
+        }
+
+        df_display = _build_display(df, quantities, bom_map)
+        lap("result", rows=len(df_display))
+        return df_display
@@ -0,0 +1,233 @@
+"""
+파이프라인 단계별 실행 시간/메모리 계측 도구입니다.
+
+- stage(): 단계 하나를 감싸는 컨텍스트 매니저 (데코레이터로도 사용 가능)
+- lap(): 현재 단계 안에서 직전 lap 이후의 구간을 하위 단계로 기록
+- count(): 단계 안에서 발생한 수치(예: 시뮬레이션 일자별 활성 SKU 수)를 단계 기록에 합산
+
+기록은 JSON lines 형식으로 내보내며, summarize()로 슬랙 메시지용 요약을 만들 수 있습니다.
+count()는 호출마다 한 줄씩 내보내지 않고 감싸는 단계의 기록 한 줄에 "counters"로 합쳐 넣으므로
+시뮬레이션 일자마다 호출해도 출력이 늘어나지 않습니다.
+
+실행(start_run)과 기록 목록은 프로세스 전체에서 하나입니다. 단계 경로만 스레드별로 따로 쌓으므로
+작업 스레드에서는 stage()/lap()/count()만 사용하고, start_run()은 실행을 시작하는 메인 스레드
+(서비스 모드에서는 한 번에 하나씩 실행되는 추천 실행)에서만 호출합니다.
+
+환경 변수:
+    PIPELINE_METRICS_PATH: JSON lines를 추가로 기록할 파일 경로 ('-'이면 표준 출력)
+    PIPELINE_TRACE_MEMORY: '1'이면 tracemalloc으로 단계별 최대 메모리 사용량을 측정
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource  # 윈도우에는 없음
+except ImportError:
+    resource = None
+
+METRICS_PATH = os.environ.get("PIPELINE_METRICS_PATH")
+TRACE_MEMORY = os.environ.get("PIPELINE_TRACE_MEMORY") == "1"
+
+# 프로세스 전체에서 공유하는 실행 ID/기록 (start_run으로 초기화)
+_run_id = None
+_records = []
+_run_lock = threading.RLock()
+# 진행 중인 단계 프레임 (스레드마다 따로 쌓아 여러 매장을 동시에 실행해도 경로가 섞이지 않음)
+_local = threading.local()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class _Frame:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.started = time.perf_counter()
+        self.last_lap = self.started
+        self.peak_bytes = 0  # 하위 단계에서 관측된 최대 메모리
+        self.counters = {}  # count() 합계 (이름 -> {samples, total, max, <필드>_total})
+
+
+def start_run(run_id=None):
+    """
+    새 실행을 시작합니다. 이전 실행의 기록은 지웁니다.
+
+    프로세스 전체의 기록을 지우므로 작업 스레드에서 호출하지 않습니다. (모듈 설명 참고)
+    """
+    global _run_id
+    with _run_lock:
+        _run_id = run_id or uuid.uuid4().hex[:12]
+        _records.clear()
+    _stack().clear()
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _run_id
+
+
+def get_records():
+    """현재 실행에서 기록된 항목 목록을 반환합니다."""
+    return list(_records)
+
+
+def _path(name=None):
+    names = [frame.name for frame in _stack()]
+    if name is not None:
+        names.append(name)
+    return "/".join(names)
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # 리눅스는 KB, macOS는 byte 단위
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 1)
+
+
+def _take_peak():
+    """직전 측정 이후의 최대 메모리를 반환하고 측정을 초기화합니다."""
+    if not tracemalloc.is_tracing():
+        return None
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    return peak
+
+
+def _emit(record):
+    record = {"run_id": _run_id, "ts": round(time.time(), 3), **record}
+    _records.append(record)
+    if not METRICS_PATH:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    if METRICS_PATH == "-":
+        print(line)
+    else:
+        with open(METRICS_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _record_timing(path, seconds, peak_bytes, fields):
+    record = {"stage": path, "seconds": round(seconds, 4)}
+    if peak_bytes is not None:
+        record["peak_mb"] = round(peak_bytes / 2**20, 2)
+    rss = _max_rss_mb()
+    if rss is not None:
+        record["max_rss_mb"] = rss
+    record.update(fields)
+    _emit(record)
+
+
+def _merge_peak_into_parent(peak_bytes):
+    stack = _stack()
+    if peak_bytes is not None and stack:
+        stack[-1].peak_bytes = max(stack[-1].peak_bytes, peak_bytes)
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    단계 하나의 실행 시간(및 최대 메모리)을 기록합니다.
+
+        with stage("load_all_data"):
+            ...
+    """
+    if _run_id is None:
+        with _run_lock:
+            if _run_id is None:
+                start_run()
+
+    # 상위 단계의 최대 메모리를 보존한 뒤 측정을 초기화
+    _merge_peak_into_parent(_take_peak())
+    frame = _Frame(name, fields)
+    path = _path(name)
+    _stack().append(frame)
+    try:
+        yield frame
+    finally:
+        _stack().pop()
+        peak = _take_peak()
+        if peak is not None:
+            peak = max(peak, frame.peak_bytes)
+        fields = frame.fields
+        if frame.counters:
+            fields = {**fields, "counters": frame.counters}
+        _record_timing(path, time.perf_counter() - frame.started, peak, fields)
+        _merge_peak_into_parent(peak)
+
+
+def timed(name=None):
+    """함수 실행을 하나의 단계로 기록하는 데코레이터입니다."""
+
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def lap(name, **fields):
+    """현재 단계 안에서 직전 lap(또는 단계 시작) 이후의 구간을 하위 단계로 기록합니다."""
+    stack = _stack()
+    if not stack:
+        return
+    frame = stack[-1]
+    now = time.perf_counter()
+    peak = _take_peak()
+    _record_timing(_path(name), now - frame.last_lap, peak, fields)
+    if peak is not None:
+        frame.peak_bytes = max(frame.peak_bytes, peak)
+    frame.last_lap = now
+
+
+def count(name, value, **fields):
+    """
+    현재 단계에서 관측한 수치를 단계 기록에 합산합니다.
+
+    단계 기록의 counters[name]에 호출 횟수(samples), 값의 합계(total)/최댓값(max)과
+    숫자 필드별 합계(<필드>_total)를 남깁니다. 단계 밖에서 호출하면 바로 한 줄로 기록합니다.
+    """
+    stack = _stack()
+    if not stack:
+        _emit({"stage": _path(), "counter": name, "value": value, **fields})
+        return
+    counter = stack[-1].counters.setdefault(name, {"samples": 0, "total": 0, "max": value})
+    counter["samples"] += 1
+    counter["total"] += value
+    counter["max"] = max(counter["max"], value)
+    for key, field_value in fields.items():
+        if isinstance(field_value, (int, float)):
+            counter[f"{key}_total"] = counter.get(f"{key}_total", 0) + field_value
+
+
+def summarize(max_depth=1):
+    """슬랙 메시지에 붙일 단계별 소요 시간 요약을 만듭니다."""
+    lines = []
+    for record in _records:
+        if "seconds" not in record:
+            continue
+        depth = record["stage"].count("/")
+        if depth >= max_depth:
+            continue
+        line = f"{'  ' * depth}• {record['stage']}: {record['seconds']:.2f}초"
+        if "peak_mb" in record:
+            line += f" (최대 {record['peak_mb']:.1f}MB)"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+"""
+용량 제약 입고 최적화 (선형 계획법)
+
+기본 엔진은 구성품 재고가 부족한 날 먼저 부족해진 SKU를 그대로 제외하는 탐욕적 방식이라,
+여러 세트/단품이 같은 구성품을 나눠 써야 할 때 일부 SKU가 통째로 밀려날 수 있습니다.
+이 모듈은 입고수량을 변수로 두고 아래 제약 안에서 가중 충족 판매 일수를 최대화합니다.
+
+    - 구성품별 메인 창고 재고 - 자사몰 방어분(MAX_DAYS일치 + 최소 보존 수량) 이하로만 출고
+    - 하루 입고 가능 수량(기본 DAILY_WORK_QTY_LIMIT, OPTIMIZER_DAILY_CAPACITY로 변경) 이하
+    - SKU별로 쿠팡 재고가 목표(최소 수량, 7/30/60일치)에 닿을 때까지만 입고
+
+목적 함수는 입고로 채운 쿠팡 판매 일수(입고수량 / 하루 판매량)에 구간별 가중치
+(최소 수량 > 7일 > 30일 > 60일)를 곱한 합으로, 판매량이 많은 SKU가 수량만으로 용량을
+독차지하지 않고 여러 SKU의 급한 일수부터 채웁니다. Sweep 전량 입고는 남는 용량으로만 채웁니다.
+scipy의 HiGHS 솔버를 사용하며, 1만 SKU 규모도 수 초 안에 풉니다.
+"""
+
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from config import DAILY_WORK_QTY_LIMIT
+
+# 쿠팡 재고 목표 구간 (일수, 가중치). 앞 구간을 모두 채워야 다음 구간으로 넘어가는 것과 같은 효과
+COVER_SEGMENTS = [(7, 3.0), (30, 2.0), (60, 1.0)]
+# 최소 수량(MIN_QTY_TARGET)까지의 가중치 (판매량이 없어도 진열용으로 우선 확보)
+MIN_QTY_WEIGHT = 4.0
+# 쿠팡전용/품절 단품의 전량 입고 가중치 (다른 수요를 모두 채운 뒤 남는 용량으로)
+SWEEP_WEIGHT = 0.5
+# 판매 일수 환산 시 하루 판매량 하한 (판매량이 0인 SKU의 1개가 무한한 일수가 되지 않도록)
+MIN_DAILY_DEMAND = 0.1
+# 하루 입고 가능 수량 ('0'이면 제한 없이 전체 추천 수량을 계산)
+DAILY_CAPACITY = int(os.environ.get("OPTIMIZER_DAILY_CAPACITY", DAILY_WORK_QTY_LIMIT)) or None
+# 솔버 제한 시간 (초). 넘기면 기본 엔진 결과를 사용합니다.
+SOLVER_TIME_LIMIT_SECONDS = 10.0
+
+
+def _segment_bounds(coupang, daily, min_qty_target):
+    """SKU별 목표 구간의 입고 한도 (구간 수 x SKU)"""
+    levels = [np.full_like(coupang, float(min_qty_target))]
+    levels += [np.maximum(daily * days, min_qty_target) for days, _ in COVER_SEGMENTS]
+    bounds = []
+    floor = coupang
+    for level in levels:
+        bounds.append(np.maximum(0.0, level - np.maximum(floor, 0.0)))
+        floor = np.maximum(floor, level)
+    return np.vstack(bounds)
+
+
+def optimize_transfers(
+    main,
+    coupang,
+    daily_coupang,
+    daily_own,
+    receivable,
+    sweep,
+    requires_defense,
+    bom,
+    min_qty_target,
+    min_own_stock,
+    defense_days,
+    capacity=DAILY_CAPACITY,
+):
+    """
+    SKU별 입고수량을 선형 계획법으로 계산합니다.
+
+    :param bom: channel_engine.ChannelBom
+    :param capacity: 하루 입고 가능 수량 (None이면 제한 없음)
+    :return: (SKU별 입고수량 정수 배열, 풀이 성공 여부)
+    """
+    n = len(main)
+    main = main.astype(float)
+
+    # 변수: (구간 x SKU) + Sweep 전량 입고
+    bounds = _segment_bounds(coupang.astype(float), daily_coupang, min_qty_target)
+    eligible = receivable & ~sweep & ~bom.has_missing_component
+    bounds[:, ~eligible] = 0.0
+    sweep_bounds = np.where(sweep & receivable, np.maximum(main, 0.0), 0.0)
+
+    weights = np.array([MIN_QTY_WEIGHT] + [weight for _, weight in COVER_SEGMENTS])
+    n_segments = len(weights)
+    upper = np.concatenate([bounds.ravel(), sweep_bounds])
+    # 1개당 가치 = 가중치 x 채우는 판매 일수 (1 / 하루 판매량)
+    demand = np.maximum(np.asarray(daily_coupang, dtype=float), MIN_DAILY_DEMAND)
+    segment_value = (weights[:, None] / demand[None, :]).ravel()
+    # Sweep은 어떤 SKU의 목표 구간 1개보다도 가치가 낮도록 가장 큰 판매량 기준으로 환산
+    sweep_value = np.full(n, SWEEP_WEIGHT / demand.max()) if n else np.zeros(0)
+    cost = -np.concatenate([segment_value, sweep_value])
+
+    # 구성품 소요 행렬 (구성품 x SKU): 세트는 구성품 수량만큼, 단품은 자기 자신 1개
+    usage = sparse.csr_matrix(
+        (bom.entry_qty, (bom.entry_comp, bom.entry_sku)), shape=(n, n)
+    )
+    # 모든 구간/Sweep 변수가 같은 SKU 입고수량이므로 열을 반복
+    per_variable = sparse.hstack([usage] * (n_segments + 1), format="csr")
+
+    reserve = daily_own * defense_days + np.where(requires_defense, min_own_stock, 0.0)
+    available = np.maximum(0.0, main - reserve)
+    rows = [per_variable]
+    limits = [available]
+    if capacity is not None:
+        rows.append(sparse.csr_matrix(np.ones((1, per_variable.shape[1]))))
+        limits.append(np.array([float(capacity)]))
+
+    # 변수 상한이 0인 열은 미리 제외하여 문제 크기를 줄임
+    active = np.flatnonzero(upper > 0)
+    if not len(active):
+        return np.zeros(n, dtype=np.int64), True
+    constraints = sparse.vstack(rows, format="csc")[:, active]
+    limit = np.concatenate(limits)
+
+    result = linprog(
+        cost[active],
+        A_ub=constraints,
+        b_ub=limit,
+        bounds=np.column_stack([np.zeros(len(active)), upper[active]]),
+        method="highs",
+        options={"time_limit": SOLVER_TIME_LIMIT_SECONDS},
+    )
+    if result.status != 0 or result.x is None:
+        print(f"[최적화] 풀이 실패 ({result.message}), 기본 엔진 결과를 사용합니다.")
+        return None, False
+
+    values = np.zeros(len(upper))
+    values[active] = result.x
+    fractional = values.reshape(n_segments + 1, n).sum(axis=0)
+
+    # 정수로 내림한 뒤, 남은 재고/용량 안에서 소수점이 큰 SKU부터 1개씩 올림
+    quantities = np.floor(fractional + 1e-9)
+    remaining = limit - np.concatenate(
+        [usage @ quantities, [quantities.sum()]] if capacity is not None else [usage @ quantities]
+    )
+    remainder = fractional - quantities
+    for i in np.argsort(-remainder):
+        if remainder[i] < 0.5:
+            break
+        column = usage[:, i].toarray().ravel()
+        need = np.concatenate([column, [1.0]]) if capacity is not None else column
+        if np.all(need <= remaining + 1e-9):
+            quantities[i] += 1
+            remaining -= need
+    return quantities.astype(np.int64), True
@@ -1,5 +1,16 @@
 import pandas as pd
 import numpy as np
+from instrumentation import count, lap, timed
+from channel_engine import ChannelBom, simulate_channels
+from allocation_trace import (
+    NO_DAY,
+    STAGE_ENGINE_RESULT,
+    STAGE_MIN_OWN_REPAIR,
+    STAGE_MIN_QTY,
+    STAGE_SIMULATION,
+    STAGE_SIMULATION_STOP,
+    STAGE_SWEEP,
+)
 
 # --- 컬럼명 상수 ---
 COL_SKU = "sku"
@@ -30,8 +41,29 @@ COL_SET_ID = "세트_ID"
 COL_BOM_COMPONENT_SKU = "구성품_sku"
 COL_BOM_COMPONENT_QTY = "구성품_개수"
 
-
-def _parse_bom(df_bom):
+# --- 추천 정책 상수 ---
+MIN_QTY_TARGET = 2  # 쿠팡 재고가 이보다 적으면 우선 확보
+OWN_DEFENSE_DAYS = 7  # 최소 수량 확보 시 남겨 둘 자사몰 판매 일수
+MIN_OWN_STOCK = 2  # [추가] 자사몰 최소 보존 수량 (매출이 0이어도 이만큼은 남김)
+MAX_DAYS = 60  # 시뮬레이션 기간 (쿠팡 목표 재고 일수)
+
+# --- 입고 채널 설정 ---
+# priority가 작은 채널부터 매일 메인 창고 재고를 가져갑니다.
+# stock: 채널 창고 재고 컬럼, daily_demand: 일 수요 컬럼 (없으면 sales_30d / 30)
+# missing_code: 입고 불가 여부 컬럼 (없으면 code 컬럼이 비어 있지 않고 code_pattern과 맞는지로 판단)
+# sweep: True면 쿠팡전용/품절 단품(Sweep 대상)의 메인 재고 전량을 이 채널로 보냄
+COUPANG_CHANNEL = {
+    "name": "쿠팡",
+    "priority": 1,
+    "stock": COL_STOCK_COUPANG,
+    "daily_demand": "sim_daily_coupang",
+    "missing_code": "has_missing_code",
+    "sweep": True,
+}
+
+
+@timed()
+def parse_bom(df_bom):
     """BOM 데이터프레임을 파싱하여 세트-구성품 관계를 정의합니다."""
     if df_bom is None or df_bom.empty:
         return pd.DataFrame()
@@ -69,20 +101,44 @@ def _parse_bom(df_bom):
     return df_pivot[[COL_SET_ID, COL_BOM_COMPONENT_SKU, COL_BOM_COMPONENT_QTY]]
 
 
-def calculate_coupang_transfer_recommendations(
-    df_final,
-    df_bom=None,
-    coupang_safety_days=30,
-    coupang_only_skus=None,
-    discontinued_skus=None,
-):
+def build_bom_maps(bom_parsed):
     """
-    구성품 재고를 고려하여 쿠팡 입고 추천 수량을 계산합니다.
-    (자사몰 방어 -> 쿠팡 단품 입고 -> 쿠팡 세트 입고 순서로 재고 할당)
+    parse_bom() 결과로 세트-구성품 매핑을 만듭니다.
+    세트 안의 세트는 최하위 구성품까지 전개하므로, bom_map의 구성품은 모두 단품입니다.
+
+    :return: (bom_map, comp_usage_map)
     """
-    if df_final.empty:
-        return pd.DataFrame()
+    # scipy를 불러오므로 필요할 때 import (stockout 등 컬럼 상수만 쓰는 모듈은 가볍게 유지)
+    from bom import explode_bom
+
+    bom_parsed = explode_bom(bom_parsed)
+
+    # SKU -> 세트/구성품 관계 매핑
+    # bom_map: 세트 SKU -> [(구성품 SKU, 수량), ...]
+    # comp_usage_map: 구성품 SKU -> [세트 SKU, ...]
+    bom_map = {}
+    comp_usage_map = {}
 
+    if bom_parsed is not None and not bom_parsed.empty:
+        for _, row in bom_parsed.iterrows():
+            set_sku = row[COL_SET_ID]
+            comp_sku = row[COL_BOM_COMPONENT_SKU]
+            qty = row[COL_BOM_COMPONENT_QTY]
+
+            if set_sku not in bom_map:
+                bom_map[set_sku] = []
+            bom_map[set_sku].append((comp_sku, qty))
+
+            if comp_sku not in comp_usage_map:
+                comp_usage_map[comp_sku] = []
+            if set_sku not in comp_usage_map[comp_sku]:
+                comp_usage_map[comp_sku].append(set_sku)
+
+    return bom_map, comp_usage_map
+
+
+def _prepare_frame(df_final, coupang_only_skus, discontinued_skus):
+    """일평균 판매량, 시뮬레이션용 수요, SKU 속성(쿠팡전용/품절/옵션코드 미등록)을 계산합니다."""
     df = df_final.copy()
 
     # 0. 전처리
@@ -120,6 +176,8 @@ def calculate_coupang_transfer_recommendations(
     # 1-3. 속성 정의
     is_coupang_only = df[COL_SKU].isin(coupang_only_skus if coupang_only_skus else [])
     is_discontinued = df[COL_SKU].isin(discontinued_skus if discontinued_skus else [])
+    df["is_coupang_only"] = is_coupang_only
+    df["is_discontinued"] = is_discontinued
 
     # 1-4. 시뮬레이션용 일일 수요량 설정
     # 쿠팡 수요: 순수 판매량
@@ -143,6 +201,8 @@ def calculate_coupang_transfer_recommendations(
         # 대신, 입고 추천 대상이 되지 않도록 시뮬레이션 수요(daily_coupang)를 0으로 설정
         df.loc[is_missing_code, "sim_daily_coupang"] = 0
 
+    df["has_missing_code"] = is_missing_code
+
     # 중복 SKU 체크
     if df[COL_SKU].duplicated().any():
         dup_skus = df.loc[df[COL_SKU].duplicated(), COL_SKU].unique()
@@ -150,31 +210,11 @@ def calculate_coupang_transfer_recommendations(
             f"[경고] 재고 데이터에 중복된 SKU가 발견되었습니다. 해당 SKU들의 재고를 합산하여 처리합니다: {dup_skus}"
         )
 
-    # --- 2. BOM(세트) 구조 파싱 ---
-    # SKU -> 세트/구성품 관계 매핑
-    # bom_map: 세트 SKU -> [(구성품 SKU, 수량), ...]
-    # comp_usage_map: 구성품 SKU -> [세트 SKU, ...]
-    bom_map = {}
-    comp_usage_map = {}
-
-    if df_bom is not None and not df_bom.empty:
-        bom_parsed = _parse_bom(df_bom)
-        for _, row in bom_parsed.iterrows():
-            set_sku = row[COL_SET_ID]
-            comp_sku = row[COL_BOM_COMPONENT_SKU]
-            qty = row[COL_BOM_COMPONENT_QTY]
+    return df
 
-            if set_sku not in bom_map:
-                bom_map[set_sku] = []
-            bom_map[set_sku].append((comp_sku, qty))
-
-            if comp_sku not in comp_usage_map:
-                comp_usage_map[comp_sku] = []
-            if set_sku not in comp_usage_map[comp_sku]:
-                comp_usage_map[comp_sku].append(set_sku)
-
-    # --- 3. 로직 분기 (Sweep vs Simulation) ---
 
+def _mark_sweep_targets(df, bom_map, comp_usage_map):
+    """세트/구성품 여부와 Sweep(전량 입고) 대상 여부를 표시합니다."""
     # 3-1. 세트/구성품 여부 확인 (Step 1)
     # BOM에 정의된 세트이거나, BOM에 정의된 구성품인 경우
     set_related_skus = set(bom_map.keys()) | set(comp_usage_map.keys())
@@ -183,12 +223,27 @@ def calculate_coupang_transfer_recommendations(
     # 3-2. Sweep 대상 식별 (Step 2)
     # 세트/구성품이 아니면서, (쿠팡전용 OR 품절상품)인 경우 -> 전량 입고
     # [수정] 옵션 코드가 없는 상품은 Sweep 대상에서도 제외 (입고 불가하므로)
-    sweep_mask = (
+    df["is_sweep"] = (
         (~df["is_set_related"])
-        & (is_coupang_only | is_discontinued)
-        & (~is_missing_code)
+        & (df["is_coupang_only"] | df["is_discontinued"])
+        & (~df["has_missing_code"])
     )
 
+
+def _allocate_dict(df, bom_map, comp_usage_map, trace=None):
+    """
+    딕셔너리 기반 일별 시뮬레이션 엔진 (기본 엔진)
+    Sweep -> 최소 수량 우선 확보 -> 60일 시뮬레이션 -> 자사몰 최소 보존 수량 보정 순서로 계산합니다.
+
+    :param trace: AllocationTrace. 있으면 단계별 입고 결정을 기록합니다.
+    :return: dict (sku -> 입고수량)
+    """
+    # --- 3. 로직 분기 (Sweep vs Simulation) ---
+    sweep_mask = df["is_sweep"]
+    is_coupang_only = df["is_coupang_only"]
+    is_discontinued = df["is_discontinued"]
+    is_missing_code = df["has_missing_code"]
+
     # 결과 저장을 위한 딕셔너리 초기화
     sim_state = {}
 
@@ -217,13 +272,13 @@ def calculate_coupang_transfer_recommendations(
             sim_state[sku]["transfer_qty"] = transfer_amount
             sim_state[sku]["main_stock"] = 0.0  # 재고 소진
             sim_state[sku]["is_exhausted"] = True  # 시뮬레이션 참여 안 함
+            if trace is not None:
+                trace.record(sku, 0, STAGE_SWEEP, transfer_amount)
+
+    lap("init_state", skus=len(sim_state), sweep=int(sweep_mask.sum()))
 
     # --- 3.5. [추가] 최소 수량(2개) 우선 확보 로직 ---
     # 조건: 쿠팡 재고가 2개 미만이고, 메인 창고에 자사몰 7일치 방어 후 여유가 있다면 우선 할당
-    MIN_QTY_TARGET = 2
-    OWN_DEFENSE_DAYS = 7
-    MIN_OWN_STOCK = 2  # [추가] 자사몰 최소 보존 수량 (매출이 0이어도 이만큼은 남김)
-
     for sku, state in sim_state.items():
         if state["is_sweep"]:
             continue
@@ -238,6 +293,7 @@ def calculate_coupang_transfer_recommendations(
 
             # 할당 가능 수량 계산
             allocatable = 0.0
+            limiter = None  # 할당 가능 수량을 정한 구성품 (설명 모드 기록용)
 
             # A. 세트 상품
             if sku in bom_map:
@@ -246,6 +302,7 @@ def calculate_coupang_transfer_recommendations(
                 for comp_sku, qty in bom_map[sku]:
                     if comp_sku not in sim_state:
                         max_set_possible = 0
+                        limiter = comp_sku
                         break
 
                     comp_state = sim_state[comp_sku]
@@ -262,7 +319,9 @@ def calculate_coupang_transfer_recommendations(
 
                     # 구성품 재고로 만들 수 있는 세트 수량
                     sets_from_comp = comp_avail / qty
-                    max_set_possible = min(max_set_possible, sets_from_comp)
+                    if sets_from_comp < max_set_possible:
+                        max_set_possible = sets_from_comp
+                        limiter = comp_sku
 
                 allocatable = max_set_possible
 
@@ -276,9 +335,14 @@ def calculate_coupang_transfer_recommendations(
                 )
                 avail = max(0, state["main_stock"] - defense)
                 allocatable = avail
+                limiter = sku
 
             # 최종 할당 (필요량과 가능량 중 더 작은 값)
             alloc = min(needed, allocatable)
+            if trace is not None:
+                trace.record(
+                    sku, 0, STAGE_MIN_QTY, alloc, limiter if allocatable < needed else None
+                )
 
             if alloc > 0:
                 state["transfer_qty"] += alloc
@@ -292,6 +356,8 @@ def calculate_coupang_transfer_recommendations(
                 else:
                     state["main_stock"] -= alloc
 
+    lap("min_qty_prealloc")
+
     # --- 4. 일별 재고 시뮬레이션 (Step 3 & 4) ---
     # 대상: Sweep 되지 않은 나머지 모든 상품 (일반 단품, 세트, 구성품)
     # 목표: 최대 60일까지 재고 균형 맞추기
@@ -301,8 +367,6 @@ def calculate_coupang_transfer_recommendations(
     # 품절 상품인 경우도 0으로 처리됨.
     # 따라서 시뮬레이션 로직은 그대로 진행하면 됨.
 
-    MAX_DAYS = 60
-
     for day in range(1, MAX_DAYS + 1):
         # 1. 각 SKU별로 금일(Day) 쿠팡 재고 부족분 계산
         # (아직 메인 재고 차감 전)
@@ -438,29 +502,53 @@ def calculate_coupang_transfer_recommendations(
 
             if can_supply:
                 sim_state[sku]["transfer_qty"] += need
+                if trace is not None:
+                    trace.record(sku, day, STAGE_SIMULATION, need)
             else:
                 # [추가] 실패한 날, 0으로 끝내지 않고 남은 재고 비율만큼이라도 할당 (부분 채우기)
                 # 이를 위해서는 각 구성품의 잔여 재고 비율을 알아야 함.
                 # 현재 코드 구조가 복잡하므로, 우선 round() 적용을 먼저 수행.
                 # 금일 공급 실패 -> 향후 시뮬레이션에서도 제외 (균형 유지를 위해)
                 sim_state[sku]["is_exhausted"] = True
+                if trace is not None:
+                    failed = [c for c, _ in bom_map.get(sku, [(sku, 1)]) if c in failed_comps]
+                    trace.record(sku, day, STAGE_SIMULATION_STOP, 0.0, failed[0])
+
+        count(
+            "simulation_day",
+            len(daily_needs),
+            drained_components=len(comp_drain),
+            failed_components=len(failed_comps),
+        )
 
-    # --- 4.5. [추가] 자사몰 최소 보존 수량(2개) 최종 강제 적용 ---
+    lap("simulation", days=MAX_DAYS)
+
+    transfers = {sku: state["transfer_qty"] for sku, state in sim_state.items()}
+    return _repair_min_own_stock(df, transfers, bom_map, comp_usage_map, trace=trace)
 
+
+def _repair_min_own_stock(df, transfers, bom_map, comp_usage_map, committed=None, trace=None):
+    """
+    시뮬레이션 결과(반올림 후)가 메인 창고의 최소 보존 수량을 침범하지 않도록 마지막으로 방어합니다.
+
+    :param transfers: dict (sku -> 반올림 전 입고수량)
+    :param committed: dict (구성품 SKU -> 다른 채널에 이미 배정된 수량). 다채널 엔진에서
+        우선순위가 낮은 채널을 보정할 때 보낼 수 있는 최대량에서 뺍니다.
+    :param trace: AllocationTrace. 있으면 보정으로 줄어든 수량을 기록합니다.
+    :return: dict (sku -> 입고수량)
+    """
     # --- 4.5. [추가] 자사몰 최소 보존 수량(2개) 최종 강제 적용 ---
-    # 시뮬레이션 결과(반올림 후)가 메인 창고의 최소 보존 수량을 침범하지 않도록 마지막으로 방어합니다.
+    committed = committed or {}
 
     # 1. SKU별 초기 재고 및 설정 맵핑
     sku_info = {}
     for _, row in df.iterrows():
         sku = row[COL_SKU]
-        is_defense = not (is_coupang_only[row.name] or is_discontinued[row.name])
+        is_defense = not (row["is_coupang_only"] or row["is_discontinued"])
         sku_info[sku] = {
             "initial_main": row[COL_STOCK_MAIN],
             "requires_defense": is_defense,
-            "proposed_qty": int(
-                round(sim_state[sku]["transfer_qty"])
-            ),  # 반올림된 1차 결과
+            "proposed_qty": int(round(transfers[sku])),  # 반올림된 1차 결과
         }
 
     # 2. 구성품별 총 출고 예정 수량 집계
@@ -489,7 +577,9 @@ def calculate_coupang_transfer_recommendations(
             continue
 
         # 남겨야 할 재고(2개)를 제외하고 보낼 수 있는 최대량
-        limit = max(0, int(info["initial_main"] - MIN_OWN_STOCK))
+        limit = max(0, int(info["initial_main"] - MIN_OWN_STOCK)) - committed.get(
+            comp_sku, 0
+        )
 
         if usage > limit:
             violated_comps[comp_sku] = usage - limit
@@ -530,12 +620,163 @@ def calculate_coupang_transfer_recommendations(
                     proposed -= 1
                     current_excess -= qty_per_unit
 
+                if trace is not None and proposed != sku_info[r_sku]["proposed_qty"]:
+                    reduced = proposed - sku_info[r_sku]["proposed_qty"]
+                    trace.record(r_sku, NO_DAY, STAGE_MIN_OWN_REPAIR, reduced, comp_sku)
                 sku_info[r_sku]["proposed_qty"] = proposed
 
+    lap("min_own_stock_repair", violated=len(violated_comps))
+
+    return {sku: info["proposed_qty"] for sku, info in sku_info.items()}
+
+
+def _channel_arrays(frame, channel):
+    """채널 설정으로 (창고 재고, 일 수요, 입고 가능 여부, Sweep 대상) 배열을 만듭니다."""
+    stock = pd.to_numeric(frame[channel["stock"]], errors="coerce").fillna(0)
+    if channel.get("missing_code"):
+        receivable = ~frame[channel["missing_code"]].astype(bool)
+    elif channel.get("code"):
+        code_str = frame[channel["code"]].fillna("").astype(str).str.strip()
+        receivable = code_str.str.match(channel.get("code_pattern", r"^\S+$"))
+    else:
+        receivable = pd.Series(True, index=frame.index)
+
+    if channel.get("daily_demand"):
+        demand = frame[channel["daily_demand"]].astype(float)
+    else:
+        demand = pd.to_numeric(frame[channel["sales_30d"]], errors="coerce").fillna(0) / 30
+    # 입고할 수 없는 상품은 수요를 0으로 두어 추천 대상에서 제외 (재고 추적은 유지)
+    demand = demand.where(receivable, 0.0)
+
+    if channel.get("sweep"):
+        sweep = frame["is_sweep"].astype(bool) & receivable
+    else:
+        sweep = pd.Series(False, index=frame.index)
+
+    return (
+        stock.to_numpy(dtype=float),
+        demand.to_numpy(dtype=float),
+        receivable.to_numpy(dtype=bool),
+        sweep.to_numpy(dtype=bool),
+    )
+
+
+def _simulate_channel_frame(df, channels, bom_map):
+    """
+    채널 목록(우선순위 순서)에 대해 배열 엔진을 실행합니다.
+
+    :return: (SKU 목록, (채널 x SKU) 반올림 전 입고수량)
+    """
+    # 중복 SKU는 기본 엔진과 같이 처음 등장한 순서에 마지막 행의 값을 사용
+    skus = list(pd.unique(df[COL_SKU]))
+    frame = df.drop_duplicates(COL_SKU, keep="last").set_index(COL_SKU).reindex(skus)
+
+    arrays = [_channel_arrays(frame, channel) for channel in channels]
+    stock, demand, receivable, sweep = (np.vstack(values) for values in zip(*arrays))
+    requires_defense = ~(
+        frame["is_coupang_only"].astype(bool) | frame["is_discontinued"].astype(bool)
+    ).to_numpy()
+
+    transfer = simulate_channels(
+        frame[COL_STOCK_MAIN].to_numpy(dtype=float),
+        stock,
+        demand,
+        frame["sim_daily_own"].to_numpy(dtype=float),
+        receivable,
+        sweep,
+        requires_defense,
+        ChannelBom(skus, bom_map),
+        days=MAX_DAYS,
+        min_qty_target=MIN_QTY_TARGET,
+        own_defense_days=OWN_DEFENSE_DAYS,
+        min_own_stock=MIN_OWN_STOCK,
+    )
+    lap("channel_simulation", skus=len(skus), channels=len(channels), days=MAX_DAYS)
+    return skus, transfer
+
+
+def _record_engine_result(trace, transfers):
+    """배열/최적화 엔진은 단계별 기록 없이 SKU별 계산 결과(반올림 전)만 기록합니다."""
+    for sku, qty in transfers.items():
+        if qty > 0:
+            trace.record(sku, MAX_DAYS, STAGE_ENGINE_RESULT, qty)
+
+
+def _allocate_vector(df, bom_map, comp_usage_map, trace=None):
+    """
+    창고 x SKU 배열 엔진 (쿠팡 채널 하나)
+    하루 단위로 모든 SKU를 배열 연산으로 계산하며, 결과는 기본 엔진과 같습니다.
+
+    :return: dict (sku -> 입고수량)
+    """
+    skus, transfer = _simulate_channel_frame(df, [COUPANG_CHANNEL], bom_map)
+    transfers = dict(zip(skus, transfer[0]))
+    if trace is not None:
+        _record_engine_result(trace, transfers)
+    return _repair_min_own_stock(df, transfers, bom_map, comp_usage_map, trace=trace)
+
+
+def _allocate_optimizer(df, bom_map, comp_usage_map, trace=None):
+    """
+    선형 계획법 엔진 (optimizer.py)
+    구성품 재고/자사몰 방어분/하루 입고 가능 수량 제약 안에서 가중 충족 판매 일수를 최대화합니다.
+    풀이에 실패하면 기본 규칙(vector 엔진) 결과를 반환합니다.
+
+    :return: dict (sku -> 입고수량)
+    """
+    from optimizer import optimize_transfers
+
+    skus = list(pd.unique(df[COL_SKU]))
+    frame = df.drop_duplicates(COL_SKU, keep="last").set_index(COL_SKU).reindex(skus)
+    _, daily_coupang, receivable, sweep = _channel_arrays(frame, COUPANG_CHANNEL)
+    requires_defense = ~(
+        frame["is_coupang_only"].astype(bool) | frame["is_discontinued"].astype(bool)
+    ).to_numpy()
+
+    quantities, solved = optimize_transfers(
+        frame[COL_STOCK_MAIN].to_numpy(dtype=float),
+        frame[COL_STOCK_COUPANG].to_numpy(dtype=float),
+        daily_coupang,
+        frame["sim_daily_own"].to_numpy(dtype=float),
+        receivable,
+        sweep,
+        requires_defense,
+        ChannelBom(skus, bom_map),
+        min_qty_target=MIN_QTY_TARGET,
+        min_own_stock=MIN_OWN_STOCK,
+        defense_days=MAX_DAYS,
+    )
+    lap("optimizer", skus=len(skus), solved=solved)
+    if not solved:
+        return _allocate_vector(df, bom_map, comp_usage_map, trace=trace)
+    transfers = dict(zip(skus, quantities.astype(float)))
+    if trace is not None:
+        _record_engine_result(trace, transfers)
+    return _repair_min_own_stock(df, transfers, bom_map, comp_usage_map, trace=trace)
+
+
+# 입고 수량 계산 엔진 목록
+# 엔진은 (df, bom_map, comp_usage_map, trace=None)을 받아 {sku: 입고수량}을 반환합니다.
+# trace(AllocationTrace)가 주어지면 입고 결정 과정을 기록합니다. (allocation_trace.py)
+# 새 엔진은 check_equivalence.py로 기준 엔진과 결과를 비교한 뒤 등록합니다.
+TRANSFER_ENGINES = {
+    "dict": _allocate_dict,
+    "vector": _allocate_vector,
+    "optimizer": _allocate_optimizer,
+}
+# 기본 규칙과 다른 정책으로 계산하는 엔진 (check_equivalence 비교 대상에서 제외)
+POLICY_ENGINES = {"optimizer"}
+# 모든 SKU를 하나의 제약(하루 입고 가능 수량 등)으로 묶어 계산하는 엔진
+# BOM 연결 요소끼리도 결과가 서로 영향을 주므로 증분 계산을 하지 않습니다.
+GLOBAL_ENGINES = {"optimizer"}
+
+
+def _build_display(df, quantities, bom_map):
+    """엔진이 계산한 입고수량을 적용하고 표시용 지표를 계산합니다."""
     # --- 5. 결과 적용 ---
     # [수정] 최종 방어 로직을 거친 수량을 적용
     df[COL_TRANSFER_RECOMMENDATION] = df[COL_SKU].map(
-        lambda x: sku_info[x]["proposed_qty"]
+        lambda x: quantities.get(x, 0)
     )
 
     # 자사몰 필요재고 역산 (대시보드 표시용)
@@ -570,7 +811,7 @@ def calculate_coupang_transfer_recommendations(
     # 쿠팡 필요재고 컬럼 업데이트 (60일치 목표)
     # Sweep 대상은 '전량'이 목표였으므로, 필요재고를 전량(또는 그 이상)으로 표시하거나 60일치로 유지
     df[COL_REQUIRED_STOCK_COUPANG] = np.where(
-        sweep_mask,
+        df["is_sweep"],
         df[COL_STOCK_COUPANG]
         + df[COL_TRANSFER_RECOMMENDATION],  # Sweep은 현재+입고가 곧 목표
         df[COL_AVG_DAILY_SALES_COUPANG] * MAX_DAYS,
@@ -644,4 +885,124 @@ def calculate_coupang_transfer_recommendations(
             COL_AVG_DAILY_SALES_COUPANG
         ].round(1)
 
-    return df_display
\ No newline at end of file
+    return df_display
+
+
+def _prepare_inputs(df_final, df_bom, coupang_only_skus, discontinued_skus, bom_parsed):
+    """엔진 실행에 필요한 전처리 DataFrame과 BOM 매핑을 준비합니다."""
+    df = _prepare_frame(df_final, coupang_only_skus, discontinued_skus)
+    lap("prepare", rows=len(df))
+
+    # --- 2. BOM(세트) 구조 파싱 ---
+    if bom_parsed is None and df_bom is not None and not df_bom.empty:
+        bom_parsed = parse_bom(df_bom)
+    bom_map, comp_usage_map = build_bom_maps(bom_parsed)
+    lap("bom_map", sets=len(bom_map), components=len(comp_usage_map))
+
+    _mark_sweep_targets(df, bom_map, comp_usage_map)
+    return df, bom_map, comp_usage_map
+
+
+def _get_engine(engine):
+    if engine not in TRANSFER_ENGINES:
+        raise ValueError(f"알 수 없는 엔진입니다: {engine} (사용 가능: {list(TRANSFER_ENGINES)})")
+    return TRANSFER_ENGINES[engine]
+
+
+def calculate_transfer_quantities(
+    df_final,
+    df_bom=None,
+    coupang_only_skus=None,
+    discontinued_skus=None,
+    bom_parsed=None,
+    engine="dict",
+):
+    """
+    표시용 지표 계산 없이 SKU별 입고수량만 계산합니다. (엔진 비교/검증용)
+
+    :return: dict (sku -> 입고수량)
+    """
+    if df_final.empty:
+        return {}
+    allocate = _get_engine(engine)
+    df, bom_map, comp_usage_map = _prepare_inputs(
+        df_final, df_bom, coupang_only_skus, discontinued_skus, bom_parsed
+    )
+    return allocate(df, bom_map, comp_usage_map)
+
+
+def calculate_channel_transfers(
+    df_final,
+    channels=None,
+    df_bom=None,
+    coupang_only_skus=None,
+    discontinued_skus=None,
+    bom_parsed=None,
+):
+    """
+    여러 입고 채널(쿠팡, 다른 마켓 풀필먼트 센터 등)의 입고수량을 한 번에 계산합니다.
+
+    채널은 priority 순서로 매일 메인 창고 재고를 가져가며, 자사몰 최소 보존 수량 보정도
+    같은 순서로 적용하여 뒤 채널은 앞 채널이 가져간 뒤 남은 재고 안에서만 줄여 맞춥니다.
+
+    :param channels: 채널 설정 dict 목록 (COUPANG_CHANNEL 참고, 기본값 쿠팡만)
+    :return: DataFrame (index: sku, 컬럼: 채널 이름, 값: 입고수량)
+    """
+    channels = sorted(channels or [COUPANG_CHANNEL], key=lambda c: c.get("priority", 0))
+    names = [channel["name"] for channel in channels]
+    if df_final.empty:
+        return pd.DataFrame(columns=names, dtype="int64")
+
+    df, bom_map, comp_usage_map = _prepare_inputs(
+        df_final, df_bom, coupang_only_skus, discontinued_skus, bom_parsed
+    )
+    skus, transfer = _simulate_channel_frame(df, channels, bom_map)
+
+    result = {}
+    committed = {}
+    for name, channel_transfer in zip(names, transfer):
+        quantities = _repair_min_own_stock(
+            df, dict(zip(skus, channel_transfer)), bom_map, comp_usage_map, committed
+        )
+        result[name] = quantities
+        # 이 채널이 가져간 구성품 수량을 다음 채널의 보정 한도에서 제외
+        for sku, qty in quantities.items():
+            if qty <= 0:
+                continue
+            for comp_sku, comp_qty in bom_map.get(sku, [(sku, 1)]):
+                committed[comp_sku] = committed.get(comp_sku, 0) + qty * comp_qty
+
+    return pd.DataFrame(result, index=pd.Index(skus, name=COL_SKU))[names]
+
+
+@timed()
+def calculate_coupang_transfer_recommendations(
+    df_final,
+    df_bom=None,
+    coupang_safety_days=30,
+    coupang_only_skus=None,
+    discontinued_skus=None,
+    bom_parsed=None,
+    engine="dict",
+    trace=None,
+):
+    """
+    구성품 재고를 고려하여 쿠팡 입고 추천 수량을 계산합니다.
+    (자사몰 방어 -> 쿠팡 단품 입고 -> 쿠팡 세트 입고 순서로 재고 할당)
+
+    bom_parsed: parse_bom(df_bom) 결과를 미리 계산해 둔 경우 전달하면 BOM 파싱을 건너뜁니다.
+    engine: 입고 수량 계산 엔진 이름 (TRANSFER_ENGINES 참고)
+    trace: AllocationTrace. 있으면 SKU별 입고 결정 과정을 기록합니다. (설명 모드)
+    """
+    if df_final.empty:
+        return pd.DataFrame()
+    allocate = _get_engine(engine)
+
+    df, bom_map, comp_usage_map = _prepare_inputs(
+        df_final, df_bom, coupang_only_skus, discontinued_skus, bom_parsed
+    )
+    quantities = allocate(df, bom_map, comp_usage_map, trace=trace)
+
+    df_display = _build_display(df, quantities, bom_map)
+    lap("result", rows=len(df_display))
+    return df_display
@@ -0,0 +1,319 @@
+"""
+재고 추천 서비스 모드
+
+Github Actions에서 매번 새로 실행하는 대신, 프로세스를 계속 띄워 두고
+HTTP 요청(또는 슬랙 이벤트)으로 추천을 실행합니다.
+구글 인증 클라이언트, 스프레드시트 핸들, 시트 스냅샷, 파싱된 BOM을 메모리에 유지하므로
+트리거 후 슬랙 메시지까지 걸리는 시간이 크게 줄어듭니다.
+
+실행:
+    python coupang_stock_recommender/recommender_service.py --port 8080
+
+트리거 (로컬):
+    curl -X POST http://localhost:8080/trigger
+    curl -X POST http://localhost:8080/trigger -d '{"refresh": true, "wait": true}'
+
+슬랙 이벤트 구독 URL은 /slack/events 로 설정합니다. (봇 멘션 시 실행)
+"""
+
+import os
+import sys
+import json
+import time
+import hmac
+import hashlib
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import (
+    DEFAULT_SPREADSHEET_NAME,
+    SHEET_COUPANG_ONLY,
+    SHEET_DISCONTINUED,
+    load_bom_sheet,
+    load_inventory_sheet,
+    load_rocket_sheet,
+    load_sales_sheet,
+    load_sku_list_sheet,
+    open_spreadsheet,
+)
+from recommender import parse_bom
+from google_client import reset as reset_google_client
+from single_flight import SingleFlight
+from incremental_recommender import IncrementalRecommender
+from instrumentation import start_run
+from result_cache import get_default_cache
+from alert_state import StockoutAlertStore
+from snapshot_store import get_default_store
+from run_recommender_slack import (
+    RECOMMENDER_MODE,
+    STOCKOUT_DELTA_ALERTS,
+    creds_path,
+    recommend_and_notify,
+    send_slack_notification,
+)
+
+# --- 설정 ---
+# 자주 바뀌는 시트(재고/로켓/매출)의 스냅샷 유지 시간
+SNAPSHOT_TTL_SECONDS = int(os.environ.get("SNAPSHOT_TTL_SECONDS", "60"))
+# 거의 바뀌지 않는 시트(세트구성품/품절상품/쿠팡전용상품)의 스냅샷 유지 시간
+STATIC_TTL_SECONDS = int(os.environ.get("STATIC_TTL_SECONDS", "3600"))
+SLACK_SIGNING_SECRET = os.environ.get("SLACK_SIGNING_SECRET")
+# 이 시간 안에 연달아 들어온 트리거는 한 번의 실행으로 합쳐집니다.
+TRIGGER_DEBOUNCE_SECONDS = float(os.environ.get("TRIGGER_DEBOUNCE_SECONDS", "3"))
+
+# 슬랙 요청 서명 허용 시간 (재전송 공격 방지)
+SLACK_SIGNATURE_MAX_AGE = 60 * 5
+
+
+class RecommenderService:
+    """스프레드시트 연결과 시트 스냅샷을 메모리에 유지하며 추천을 실행합니다."""
+
+    def __init__(
+        self,
+        spreadsheet_name=DEFAULT_SPREADSHEET_NAME,
+        creds_path=creds_path,
+        snapshot_ttl=SNAPSHOT_TTL_SECONDS,
+        static_ttl=STATIC_TTL_SECONDS,
+        debounce_seconds=TRIGGER_DEBOUNCE_SECONDS,
+    ):
+        self.spreadsheet_name = spreadsheet_name
+        self.creds_path = creds_path
+        self.snapshot_ttl = snapshot_ttl
+        self.static_ttl = static_ttl
+
+        # 겹치는 트리거는 하나의 실행으로 합치고, 실행은 한 번에 하나만 진행
+        self._flight = SingleFlight(self._run_once, debounce_seconds=debounce_seconds)
+        self._spreadsheet_doc = None
+        self._snapshots = {}  # 이름 -> (불러온 시각, 값)
+        self._bom_source = None
+        self._bom_parsed = None
+        self._result_cache = get_default_cache()
+        # 직전 실행 결과를 보관하여 변경된 SKU 묶음만 다시 시뮬레이션
+        self._incremental = IncrementalRecommender()
+        self._alert_store = StockoutAlertStore() if STOCKOUT_DELTA_ALERTS else None
+        self._snapshot_store = get_default_store()
+
+    def _spreadsheet(self):
+        if self._spreadsheet_doc is None:
+            self._spreadsheet_doc = open_spreadsheet(
+                self.spreadsheet_name, self.creds_path
+            )
+        return self._spreadsheet_doc
+
+    def _snapshot(self, name, ttl, loader, force_refresh):
+        """유지 시간이 지나지 않은 스냅샷은 재사용하고, 지났으면 시트에서 다시 불러옵니다."""
+        now = time.monotonic()
+        entry = self._snapshots.get(name)
+        if not force_refresh and entry is not None and now - entry[0] < ttl:
+            return entry[1]
+
+        value = loader(self._spreadsheet())
+        self._snapshots[name] = (now, value)
+        return value
+
+    def load(self, force_refresh=False):
+        """load_all_data()와 같은 형태의 튜플을 반환합니다."""
+        df_inventory = self._snapshot(
+            "inventory", self.snapshot_ttl, load_inventory_sheet, force_refresh
+        )
+        df_rocket = self._snapshot(
+            "rocket", self.snapshot_ttl, load_rocket_sheet, force_refresh
+        )
+        df_sales = self._snapshot(
+            "sales", self.snapshot_ttl, load_sales_sheet, force_refresh
+        )
+        df_bom = self._snapshot("bom", self.static_ttl, load_bom_sheet, force_refresh)
+        discontinued_skus = self._snapshot(
+            "discontinued",
+            self.static_ttl,
+            lambda doc: load_sku_list_sheet(doc, SHEET_DISCONTINUED),
+            force_refresh,
+        )
+        coupang_only_skus = self._snapshot(
+            "coupang_only",
+            self.static_ttl,
+            lambda doc: load_sku_list_sheet(doc, SHEET_COUPANG_ONLY),
+            force_refresh,
+        )
+
+        # BOM 스냅샷이 바뀌었을 때만 다시 파싱
+        if df_bom is not self._bom_source:
+            self._bom_parsed = (
+                parse_bom(df_bom) if df_bom is not None and not df_bom.empty else None
+            )
+            self._bom_source = df_bom
+
+        # process_data가 입력 DataFrame을 직접 수정하므로 스냅샷은 복사해서 넘깁니다.
+        return (
+            df_inventory.copy(),
+            df_rocket.copy(),
+            df_sales.copy(),
+            df_bom.copy() if df_bom is not None else None,
+            list(discontinued_skus),
+            list(coupang_only_skus),
+        )
+
+    def _run_once(self, force_refresh=False):
+        started = time.monotonic()
+        start_run()
+        try:
+            data = self.load(force_refresh)
+        except Exception as e:
+            # 인증 만료 등 연결 문제일 수 있으므로 다음 실행 때 다시 연결합니다.
+            self._spreadsheet_doc = None
+            reset_google_client(self.creds_path)
+            msg = f"데이터 로드 중 오류 발생: {e}"
+            send_slack_notification(msg)
+            return msg
+
+        msg = recommend_and_notify(
+            data,
+            bom_parsed=self._bom_parsed,
+            cache=self._result_cache,
+            recommender=self._incremental.calculate,
+            mode=RECOMMENDER_MODE,
+            alert_store=self._alert_store,
+            snapshot_store=self._snapshot_store,
+        )
+        print(f"[서비스] 추천 실행 완료 ({time.monotonic() - started:.1f}초)")
+        return msg
+
+    def run(self, force_refresh=False):
+        """추천을 실행하고 슬랙으로 보낸 메시지를 반환합니다. (겹치는 트리거는 결과를 공유)"""
+        return self.run_in_background(force_refresh).wait()
+
+    def run_in_background(self, force_refresh=False):
+        """추천 실행을 등록하고 즉시 Flight를 반환합니다."""
+        flight = self._flight.submit(force_refresh=force_refresh)
+        if flight.trigger_count > 1:
+            print(f"[서비스] 트리거가 기존 실행에 합쳐졌습니다. (누적 {flight.trigger_count}건)")
+        return flight
+
+
+def verify_slack_signature(headers, body, signing_secret=SLACK_SIGNING_SECRET):
+    """슬랙 요청 서명을 검증합니다. 서명 키가 설정되지 않았으면 검증을 건너뜁니다."""
+    if not signing_secret:
+        return True
+
+    timestamp = headers.get("X-Slack-Request-Timestamp", "")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SLACK_SIGNATURE_MAX_AGE:
+        return False
+
+    base = f"v0:{timestamp}:".encode() + body
+    expected = "v0=" + hmac.new(signing_secret.encode(), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, headers.get("X-Slack-Signature", ""))
+
+
+def make_handler(service):
+    """서비스 인스턴스를 사용하는 HTTP 요청 핸들러 클래스를 만듭니다."""
+
+    class TriggerHandler(BaseHTTPRequestHandler):
+        def _respond(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._respond(200, {"status": "ok"})
+            else:
+                self._respond(404, {"error": "not found"})
+
+        def do_POST(self):
+            body = self._read_body()
+            if self.path == "/trigger":
+                self._handle_trigger(body)
+            elif self.path == "/slack/events":
+                self._handle_slack_event(body)
+            else:
+                self._respond(404, {"error": "not found"})
+
+        def _handle_trigger(self, body):
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                self._respond(400, {"error": "invalid json"})
+                return
+
+            force_refresh = bool(payload.get("refresh", False))
+            if payload.get("wait"):
+                # 실행 중 오류도 연결을 끊지 않고 다른 오류와 같은 JSON 형식으로 알려줍니다.
+                try:
+                    msg = service.run(force_refresh=force_refresh)
+                except Exception as e:
+                    print(f"[서비스] 추천 실행 중 오류 발생: {e}")
+                    self._respond(500, {"error": str(e)})
+                    return
+                self._respond(200, {"status": "done", "message": msg})
+            else:
+                service.run_in_background(force_refresh=force_refresh)
+                self._respond(202, {"status": "accepted"})
+
+        def _handle_slack_event(self, body):
+            if not verify_slack_signature(self.headers, body):
+                self._respond(401, {"error": "invalid signature"})
+                return
+
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                self._respond(400, {"error": "invalid json"})
+                return
+
+            # 이벤트 구독 URL 등록 시 확인 요청
+            if payload.get("type") == "url_verification":
+                self._respond(200, {"challenge": payload.get("challenge")})
+                return
+
+            # 슬랙은 3초 안에 응답이 없으면 같은 이벤트를 재전송하므로 재전송은 무시합니다.
+            if self.headers.get("X-Slack-Retry-Num"):
+                self._respond(200, {"status": "ignored"})
+                return
+
+            event = payload.get("event", {})
+            if payload.get("type") == "event_callback" and event.get("type") == "app_mention":
+                service.run_in_background(force_refresh="새로고침" in event.get("text", ""))
+            self._respond(200, {"status": "ok"})
+
+        def log_message(self, format, *args):
+            print(f"[서비스] {self.address_string()} - {format % args}")
+
+    return TriggerHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재고 추천 서비스 모드")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--warm", action="store_true", help="시작 시 시트를 미리 불러와 캐시를 채웁니다."
+    )
+    args = parser.parse_args()
+
+    service = RecommenderService()
+    if args.warm:
+        service.load()
+        print("[서비스] 시트 스냅샷을 미리 불러왔습니다.")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"[서비스] http://{args.host}:{args.port} 에서 트리거를 기다립니다.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[서비스] 종료합니다.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
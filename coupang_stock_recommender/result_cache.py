@@ -0,0 +1,195 @@
+"""
+입력 내용 기반 추천 결과 캐시
+
+같은 시트 내용으로 추천을 다시 실행하는 경우가 많으므로,
+입력(각 시트 DataFrame, BOM, 품절/쿠팡전용 목록, 정책 파라미터)의 지문(hash)을 키로
+추천 결과(df_display)와 생성된 엑셀 파일을 디스크에 저장해 둡니다.
+캐시에 있으면 process_data와 시뮬레이션을 건너뛰고 저장된 결과를 그대로 사용합니다.
+
+오래 사용하지 않은 항목부터 지워 최대 항목 수(RESULT_CACHE_MAX_ENTRIES)를 유지합니다. (LRU)
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import datetime
+import tempfile
+
+import pandas as pd
+
+from config import EXCLUDED_SKU_PREFIXES
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_DIR = os.environ.get(
+    "RESULT_CACHE_DIR", os.path.join(script_dir, ".cache", "results")
+)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "20"))
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1") == "1"
+
+# 결과에 영향을 주는 코드가 바뀌면 이전 캐시를 쓰지 않도록 소스 내용도 지문에 포함합니다.
+# (캐시된 엑셀 파일/품절 목록을 만드는 excel_export.py, allocation_trace.py, stockout.py 포함)
+POLICY_SOURCE_FILES = [
+    "config.py",
+    "data_processor.py",
+    "recommender.py",
+    "bom.py",
+    "channel_engine.py",
+    "optimizer.py",
+    "snapshot_store.py",
+    "stockout.py",
+    "excel_export.py",
+    "allocation_trace.py",
+]
+
+RESULT_FILE_NAME = "df_display.pkl"
+STOCKOUTS_FILE_NAME = "df_stockouts.pkl"
+FILES_DIR_NAME = "files"
+
+
+def _update_with_frame(hasher, df):
+    if df is None:
+        hasher.update(b"<none>")
+        return
+    hasher.update(json.dumps([str(c) for c in df.columns], ensure_ascii=False).encode())
+    hasher.update(str(len(df)).encode())
+    if not df.empty:
+        hasher.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+
+def _policy_source_digest():
+    hasher = hashlib.sha256()
+    for name in POLICY_SOURCE_FILES:
+        path = os.path.join(script_dir, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def fingerprint_inputs(data, params=None, excluded_prefixes=EXCLUDED_SKU_PREFIXES):
+    """
+    load_all_data() 결과와 정책 파라미터로 입력 지문을 계산합니다.
+    process_data가 입력을 직접 수정하므로 반드시 처리 전에 호출해야 합니다.
+
+    최근 7일 매출 집계가 실행 날짜에 따라 달라지므로 오늘 날짜(UTC)도 지문에 포함됩니다.
+    """
+    (
+        df_inventory,
+        df_rocket,
+        df_sales,
+        df_bom,
+        discontinued_skus,
+        coupang_only_skus,
+    ) = data
+
+    hasher = hashlib.sha256()
+    for df in (df_inventory, df_rocket, df_sales, df_bom):
+        _update_with_frame(hasher, df)
+    for skus in (discontinued_skus, coupang_only_skus):
+        hasher.update(json.dumps(sorted(map(str, skus or [])), ensure_ascii=False).encode())
+
+    context = {
+        "params": params or {},
+        "excluded_prefixes": list(excluded_prefixes),
+        "date": datetime.datetime.now(datetime.timezone.utc).date().isoformat(),
+        "source": _policy_source_digest(),
+    }
+    hasher.update(json.dumps(context, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """지문을 키로 추천 결과와 엑셀 파일을 저장하는 디스크 캐시입니다."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """
+        캐시된 결과를 반환합니다. 없으면 None.
+
+        :return: dict (df_display, files: {파일명: bytes}, df_stockouts: 저장하지 않았으면 None)
+        """
+        entry_dir = self._entry_dir(key)
+        result_path = os.path.join(entry_dir, RESULT_FILE_NAME)
+        if not os.path.exists(result_path):
+            return None
+
+        try:
+            df_display = pd.read_pickle(result_path)
+            stockouts_path = os.path.join(entry_dir, STOCKOUTS_FILE_NAME)
+            df_stockouts = (
+                pd.read_pickle(stockouts_path) if os.path.exists(stockouts_path) else None
+            )
+            files = {}
+            files_dir = os.path.join(entry_dir, FILES_DIR_NAME)
+            if os.path.isdir(files_dir):
+                for name in sorted(os.listdir(files_dir)):
+                    with open(os.path.join(files_dir, name), "rb") as f:
+                        files[name] = f.read()
+        except Exception as e:
+            print(f"[캐시] 손상된 캐시 항목을 삭제합니다: {key[:12]} ({e})")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        # 최근 사용 시각 갱신 (LRU)
+        now = time.time()
+        os.utime(entry_dir, (now, now))
+        print(f"[캐시] 같은 입력의 추천 결과를 재사용합니다: {key[:12]}")
+        return {"df_display": df_display, "files": files, "df_stockouts": df_stockouts}
+
+    def put(self, key, df_display, files=None, df_stockouts=None):
+        """
+        추천 결과와 엑셀 파일을 저장합니다.
+
+        :param files: {파일명: bytes}
+        :param df_stockouts: find_stockouts() 결과 (품절 변경 알림을 캐시 적중 시에도 같은 기준으로 계산)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # 다른 실행과 겹쳐도 반쯤 쓴 항목이 보이지 않도록 임시 폴더에 쓴 뒤 이름을 바꿉니다.
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            df_display.to_pickle(os.path.join(tmp_dir, RESULT_FILE_NAME))
+            if df_stockouts is not None:
+                df_stockouts.to_pickle(os.path.join(tmp_dir, STOCKOUTS_FILE_NAME))
+            if files:
+                files_dir = os.path.join(tmp_dir, FILES_DIR_NAME)
+                os.makedirs(files_dir)
+                for name, content in files.items():
+                    with open(os.path.join(files_dir, os.path.basename(name)), "wb") as f:
+                        f.write(content)
+
+            entry_dir = self._entry_dir(key)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except Exception as e:
+            print(f"[캐시] 추천 결과 저장 실패: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self._evict()
+
+    def _evict(self):
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if not name.startswith(".tmp-")
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for entry_dir in entries[: len(entries) - self.max_entries]:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def get_default_cache():
+    """환경 변수 설정에 따라 기본 캐시를 반환합니다. (비활성화 시 None)"""
+    return ResultCache() if RESULT_CACHE_ENABLED else None
@@ -0,0 +1,185 @@
+"""
+process_data / calculate_coupang_transfer_recommendations 벤치마크
+
+가상 데이터(synthetic_data)로 SKU 규모별 실행 시간을 측정하고,
+결과를 benchmark_history.jsonl에 누적하여 이전 측정과 비교합니다.
+
+실행:
+    python coupang_stock_recommender/run_benchmark.py
+    python coupang_stock_recommender/run_benchmark.py --sizes 500 10000 100000 --repeat 3
+    python coupang_stock_recommender/run_benchmark.py --fail-on-regression 1.2
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import datetime
+import subprocess
+import contextlib
+
+import pandas as pd
+
+# 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_processor import process_data
+from recommender import calculate_coupang_transfer_recommendations
+from synthetic_data import build_inputs, generate_sheet_values
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.path.join(script_dir, "benchmark_history.jsonl")
+
+DEFAULT_SIZES = [500, 2000, 10000]
+DEFAULT_REPEAT = 3
+DEFAULT_SEED = 42
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=script_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time_call(func, *args, **kwargs):
+    """함수의 출력(print)을 숨기고 실행 시간과 결과를 반환합니다."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+    return elapsed, result
+
+
+def benchmark_size(n_skus, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    """SKU 규모 하나에 대해 각 단계의 실행 시간(최소/중앙값)을 측정합니다."""
+    sheet_values = generate_sheet_values(n_skus, seed=seed)
+    timings = {"process_data": [], "calculate_coupang_transfer_recommendations": []}
+    n_recommended = None
+
+    for _ in range(repeat):
+        # process_data가 입력을 직접 수정하므로 매번 새 입력을 만듭니다. (측정 시간에서 제외)
+        (
+            df_inventory,
+            df_rocket,
+            df_sales,
+            df_bom,
+            discontinued_skus,
+            coupang_only_skus,
+        ) = build_inputs(sheet_values)
+
+        elapsed, (df_final, _) = _time_call(
+            process_data, df_inventory, df_rocket, df_sales, df_bom
+        )
+        timings["process_data"].append(elapsed)
+
+        elapsed, df_reco = _time_call(
+            calculate_coupang_transfer_recommendations,
+            df_final,
+            df_bom=df_bom,
+            coupang_only_skus=coupang_only_skus,
+            discontinued_skus=discontinued_skus,
+        )
+        timings["calculate_coupang_transfer_recommendations"].append(elapsed)
+        n_recommended = len(df_reco)
+
+    results = []
+    for name, values in timings.items():
+        values = sorted(values)
+        results.append({
+            "function": name,
+            "n_skus": n_skus,
+            "seed": seed,
+            "repeat": repeat,
+            "min_seconds": round(values[0], 4),
+            "median_seconds": round(values[len(values) // 2], 4),
+            "n_recommended": n_recommended,
+        })
+    return results
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _previous_result(history, result):
+    """같은 함수/규모/시드의 가장 최근 측정 결과를 찾습니다."""
+    for record in reversed(history):
+        if (
+            record["function"] == result["function"]
+            and record["n_skus"] == result["n_skus"]
+            and record["seed"] == result["seed"]
+        ):
+            return record
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재고 추천 파이프라인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--history", default=HISTORY_PATH, help="측정 결과를 누적할 파일")
+    parser.add_argument("--no-save", action="store_true", help="측정 결과를 기록하지 않습니다.")
+    parser.add_argument(
+        "--fail-on-regression",
+        type=float,
+        default=None,
+        help="이전 측정 대비 이 배수 이상 느려지면 종료 코드 1로 끝냅니다. (예: 1.2)",
+    )
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    run_info = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+
+    regressions = []
+    new_records = []
+    print(f"{'함수':<45}{'SKU 수':>8}{'최소(초)':>10}{'중앙값(초)':>12}{'이전 대비':>10}")
+    for n_skus in args.sizes:
+        for result in benchmark_size(n_skus, repeat=args.repeat, seed=args.seed):
+            previous = _previous_result(history, result)
+            ratio = (
+                result["min_seconds"] / previous["min_seconds"]
+                if previous and previous["min_seconds"] > 0
+                else None
+            )
+            print(
+                f"{result['function']:<45}{n_skus:>8}{result['min_seconds']:>10.3f}"
+                f"{result['median_seconds']:>12.3f}{(f'{ratio:.2f}x' if ratio else '-'):>10}"
+            )
+            if args.fail_on_regression and ratio and ratio >= args.fail_on_regression:
+                regressions.append((result, ratio))
+            new_records.append({**run_info, **result})
+
+    if not args.no_save:
+        with open(args.history, "a", encoding="utf-8") as f:
+            for record in new_records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"\n측정 결과를 '{args.history}'에 기록했습니다.")
+
+    if regressions:
+        print("\n[성능 저하 감지]")
+        for result, ratio in regressions:
+            print(f"• {result['function']} ({result['n_skus']} SKU): 이전 대비 {ratio:.2f}배")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+여러 매장(브랜드) 재고 추천 동시 실행
+
+브랜드마다 스프레드시트가 따로 있으므로, 매장 설정 목록을 읽어 매장별로
+시트 로딩 -> 데이터 처리 -> 입고 추천을 동시에(최대 MAX_STORE_WORKERS개) 실행합니다.
+매장마다 입력/제외 규칙/스냅샷 경로를 따로 쓰고, 한 매장에서 오류가 나도 다른 매장은 계속 진행합니다.
+
+결과:
+    - 매장별 엑셀 파일: <출력 경로>/<매장 이름>/
+    - 매장별 슬랙 알림: 매장 설정의 slack_channel (없으면 생략)
+    - 전체 요약: TARGET_CHANNEL로 한 번 전송
+
+매장 설정 파일 (JSON, STORES_CONFIG_PATH 또는 --config):
+    [
+        {
+            "name": "brand_a",
+            "spreadsheet": "브랜드A_입고_발주_수량_관리시트",
+            "credentials": "credentials/brand_a.json",
+            "slack_channel": "C0123456789",
+            "excluded_prefixes": ["set_fhb_"]
+        }
+    ]
+
+credentials가 없으면 기본 자격증명 파일을, excluded_prefixes가 없으면 config.EXCLUDED_SKU_PREFIXES를 사용합니다.
+상대 경로는 설정 파일이 있는 폴더 기준입니다. (엑셀 첨부 시 slack_channel은 채널 ID)
+
+실행:
+    python coupang_stock_recommender/run_multi_store.py --config stores.json --workers 3
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import EXCLUDED_SKU_PREFIXES
+from instrumentation import stage, start_run, summarize
+from run_recommender_slack import (
+    COUPANG_SAFETY_DAYS,
+    OPTIMIZER_DAILY_CAPACITY,
+    SLACK_ATTACH_EXCEL,
+    SLACK_INCLUDE_TIMINGS,
+    TRANSFER_ENGINE,
+    build_follow_up_message,
+    creds_path,
+    send_slack_notification,
+)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# --- 설정 ---
+STORES_CONFIG_PATH = os.environ.get(
+    "STORES_CONFIG_PATH", os.path.join(script_dir, "stores.json")
+)
+# 동시에 실행할 최대 매장 수 (시트 API 할당량을 고려하여 작게 유지)
+MAX_STORE_WORKERS = int(os.environ.get("MAX_STORE_WORKERS", "2"))
+# 매장별 엑셀 파일 저장 경로
+STORE_OUTPUT_DIR = os.environ.get(
+    "STORE_OUTPUT_DIR", os.path.join(script_dir, "store_outputs")
+)
+
+REQUIRED_STORE_KEYS = ["name", "spreadsheet"]
+# 매장 이름은 출력 폴더/스냅샷 경로로 쓰이므로 경로 구분자 없이
+STORE_NAME_PATTERN = re.compile(r"[\w-]+")
+
+
+def load_store_configs(path=STORES_CONFIG_PATH):
+    """
+    매장 설정 파일을 읽고 기본값을 채웁니다.
+
+    :return: 매장 설정 dict 리스트 (name, spreadsheet, credentials, slack_channel, excluded_prefixes)
+    """
+    with open(path, encoding="utf-8") as f:
+        raw_stores = json.load(f)
+    if not isinstance(raw_stores, list) or not raw_stores:
+        raise ValueError("매장 설정은 비어 있지 않은 리스트여야 합니다.")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    stores = []
+    names = set()
+    for i, raw in enumerate(raw_stores):
+        missing = [key for key in REQUIRED_STORE_KEYS if not raw.get(key)]
+        if missing:
+            raise ValueError(f"{i + 1}번째 매장 설정에 {', '.join(missing)} 항목이 없습니다.")
+        name = str(raw["name"])
+        if not STORE_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"매장 이름에는 문자, 숫자, '_', '-'만 쓸 수 있습니다: {name}")
+        if name in names:
+            raise ValueError(f"매장 이름이 중복되었습니다: {name}")
+        names.add(name)
+
+        store_creds = raw.get("credentials")
+        stores.append(
+            {
+                "name": name,
+                "spreadsheet": raw["spreadsheet"],
+                "credentials": os.path.join(base_dir, store_creds) if store_creds else creds_path,
+                "slack_channel": raw.get("slack_channel"),
+                "excluded_prefixes": list(raw.get("excluded_prefixes", EXCLUDED_SKU_PREFIXES)),
+            }
+        )
+    return stores
+
+
+def run_store(store, cache=None, output_dir=STORE_OUTPUT_DIR):
+    """
+    매장 하나의 추천을 계산하고 엑셀 파일을 매장 폴더에 저장합니다.
+
+    :param cache: ResultCache (매장끼리 공유해도 입력/제외 규칙이 지문에 포함되어 섞이지 않음)
+    :return: dict (df_reco, files, paths, message)
+    """
+    from data_loader import load_all_data
+    from data_processor import process_data
+    from recommender import calculate_coupang_transfer_recommendations
+    from result_cache import fingerprint_inputs
+    from snapshot_store import (
+        DEFAULT_SNAPSHOT_DIR,
+        SNAPSHOTS_ENABLED,
+        USE_ADJUSTED_DEMAND,
+        SnapshotStore,
+        adjust_demand,
+        record_snapshot,
+    )
+    from excel_export import build_export_frames, export_workbooks, save_workbooks
+    from allocation_trace import TRANSFER_TRACE, new_trace
+
+    name = store["name"]
+    prefixes = store["excluded_prefixes"]
+    print(f"[매장 {name}] 추천 분석을 시작합니다.")
+
+    data = load_all_data(store["spreadsheet"], store["credentials"], excluded_prefixes=prefixes)
+    if data[0] is None:
+        raise RuntimeError("시트 데이터를 불러오지 못했습니다.")
+
+    # 매장마다 스냅샷 기록을 따로 쌓습니다. (process_data가 입력을 수정하므로 처리 전에 기록)
+    snapshot_store = (
+        SnapshotStore(os.path.join(DEFAULT_SNAPSHOT_DIR, name)) if SNAPSHOTS_ENABLED else None
+    )
+    record_snapshot(snapshot_store, data[1])
+
+    cache_key = None
+    cached = None
+    if cache is not None:
+        params = {
+            "coupang_safety_days": COUPANG_SAFETY_DAYS,
+            "engine": TRANSFER_ENGINE,
+            "optimizer_daily_capacity": OPTIMIZER_DAILY_CAPACITY,
+        }
+        if TRANSFER_TRACE:
+            params["trace"] = TRANSFER_TRACE
+        if USE_ADJUSTED_DEMAND and snapshot_store is not None:
+            params["adjusted_demand"] = snapshot_store.fingerprint()
+        cache_key = fingerprint_inputs(data, params, excluded_prefixes=prefixes)
+        cached = cache.get(cache_key)
+
+    if cached is not None:
+        df_reco = cached["df_display"]
+        files = cached["files"]
+    else:
+        df_inventory, df_rocket, df_sales, df_bom, discontinued_skus, coupang_only_skus = data
+        df_final, _ = process_data(
+            df_inventory, df_rocket, df_sales, df_bom, excluded_prefixes=prefixes
+        )
+        df_final = adjust_demand(df_final, snapshot_store)
+        if df_final.empty:
+            raise RuntimeError("분석할 데이터가 없습니다.")
+
+        # 매장마다 입고 결정 기록을 따로 만듭니다. (TRANSFER_TRACE가 없으면 None)
+        trace = new_trace()
+
+        df_reco = calculate_coupang_transfer_recommendations(
+            df_final,
+            df_bom=df_bom,
+            coupang_safety_days=COUPANG_SAFETY_DAYS,
+            coupang_only_skus=coupang_only_skus,
+            discontinued_skus=discontinued_skus,
+            engine=TRANSFER_ENGINE,
+            trace=trace,
+        )
+        trace_frame = trace.to_frame() if trace is not None else None
+        files = (
+            export_workbooks(build_export_frames(df_reco), trace_frame=trace_frame)
+            if not df_reco.empty
+            else {}
+        )
+        if cache_key is not None:
+            cache.put(cache_key, df_reco, files=files)
+
+    paths = save_workbooks(files, os.path.join(output_dir, name)) if files else []
+    print(f"[매장 {name}] 완료: 추천 {len(df_reco)}개 상품")
+    return {
+        "df_reco": df_reco,
+        "files": files,
+        "paths": paths,
+        "message": build_follow_up_message(df_reco),
+    }
+
+
+def _run_store_stage(store, cache, output_dir):
+    # 스레드마다 단계 기록이 따로 쌓이므로 매장 이름을 최상위 단계로 둡니다.
+    with stage(f"store[{store['name']}]"):
+        return run_store(store, cache=cache, output_dir=output_dir)
+
+
+def run_stores(stores, max_workers=MAX_STORE_WORKERS, cache=None, output_dir=STORE_OUTPUT_DIR):
+    """
+    여러 매장의 추천을 동시에 실행합니다.
+
+    :return: dict (매장 이름 -> run_store 결과 / Exception(실패)), 설정 순서 유지
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stores)))) as executor:
+        futures = {
+            store["name"]: executor.submit(_run_store_stage, store, cache, output_dir)
+            for store in stores
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"[매장 {name}] 추천 분석 실패: {e}")
+                results[name] = e
+    return results
+
+
+def build_combined_summary(results):
+    """매장별 결과를 한 메시지로 요약합니다."""
+    succeeded = [r for r in results.values() if not isinstance(r, Exception)]
+    msg = f"🏬 *매장별 쿠팡 입고 추천 요약 (성공 {len(succeeded)} / 전체 {len(results)})*\n\n"
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            msg += f"• {name}: ⚠️ 실패 ({result})\n"
+            continue
+        df_reco = result["df_reco"]
+        if df_reco.empty:
+            msg += f"• {name}: 입고 추천 없음 (재고 충분)\n"
+            continue
+        stockout_count = int((df_reco["쿠팡재고"] == 0).sum())
+        msg += (
+            f"• {name}: {len(df_reco)}개 상품, 총 {int(df_reco['입고수량'].sum())}개"
+            f" (즉시 품절 {stockout_count}개)\n"
+        )
+    return msg
+
+
+def notify_stores(stores, results):
+    """매장 설정에 슬랙 채널이 있으면 매장별 결과를 보냅니다."""
+    for store in stores:
+        result = results[store["name"]]
+        if not store["slack_channel"]:
+            continue
+        if isinstance(result, Exception):
+            msg = f"🏬 *[{store['name']}]*\n추천 분석 중 오류 발생: {result}"
+            files = None
+        else:
+            msg = f"🏬 *[{store['name']}]*\n{result['message']}"
+            files = result["files"] if SLACK_ATTACH_EXCEL else None
+        send_slack_notification(msg, files=files, channel=store["slack_channel"])
+
+
+def main():
+    """매장 설정 목록으로 재고 추천을 동시에 실행하는 메인 함수입니다."""
+    parser = argparse.ArgumentParser(description="여러 매장 쿠팡 재고 추천")
+    parser.add_argument("--config", default=STORES_CONFIG_PATH, help="매장 설정 JSON 파일")
+    parser.add_argument("--workers", type=int, default=MAX_STORE_WORKERS, help="동시에 실행할 매장 수")
+    parser.add_argument("--output-dir", default=STORE_OUTPUT_DIR, help="매장별 엑셀 저장 경로")
+    args = parser.parse_args()
+
+    try:
+        stores = load_store_configs(args.config)
+    except (OSError, ValueError) as e:
+        print(f"매장 설정을 불러오지 못했습니다: {e}")
+        return
+
+    from result_cache import get_default_cache
+
+    print(f"{len(stores)}개 매장의 재고 추천 분석을 시작합니다... (동시 실행 {args.workers}개)")
+    start_run()
+    results = run_stores(
+        stores, max_workers=args.workers, cache=get_default_cache(), output_dir=args.output_dir
+    )
+
+    notify_stores(stores, results)
+    summary = build_combined_summary(results)
+    if SLACK_INCLUDE_TIMINGS:
+        summary += f"\n⏱️ *단계별 소요 시간*\n{summarize()}"
+    send_slack_notification(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,11 @@
 import os
 import sys
-import pandas as pd
 
 # 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from data_loader import load_all_data
-from data_processor import process_data
-from recommender import calculate_coupang_transfer_recommendations
+# 시트 로딩, 처리/추천, 엑셀 모듈은 해당 단계에서 불러옵니다. (run_recommender_slack.py 참고)
+from instrumentation import start_run, summarize
 
 # Google Cloud 자격증명 파일의 경로를 설정합니다.
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,41 +17,81 @@ if not os.path.exists(creds_path):
         script_dir, "credentials", "vocal-airline-291707-6cb22418b6f6.json"
     )
 
-# Excel 출력용 컬럼 (재고 소진 예상일, 쿠팡 재고, 메인 재고는 제외)
-OUTPUT_COLUMNS = [
-    "상품그룹",
-    "sku",
-    "상품명",
-    "쿠팡재고",
-    "쿠팡_재고소진_예상일",
-    "입고수량",
-]
-
-# 일일 작업 목록의 최대 총 수량 (입고수량의 누적 합계)
-DAILY_WORK_QTY_LIMIT = 160
+COUPANG_SAFETY_DAYS = 30
 
 
 def main():
     """재고 추천 프로세스를 로컬에서 실행하는 메인 함수입니다."""
     print("재고 추천 분석을 시작합니다...")
+    start_run()
+
+    # 자격증명 파일이 없으면 시트 모듈을 불러오기 전에 바로 종료합니다.
+    if not os.path.exists(creds_path):
+        print(f"데이터 로드 중 오류 발생: 자격증명 파일이 없습니다 ({creds_path})")
+        return
 
     # 1. 데이터 로드
+    from data_loader import load_all_data
+    from result_cache import fingerprint_inputs, get_default_cache
+    from snapshot_store import (
+        USE_ADJUSTED_DEMAND,
+        adjust_demand,
+        get_default_store,
+        record_snapshot,
+    )
+    from excel_export import (
+        DAILY_EXCEL_FILE_NAME,
+        build_export_frames,
+        export_workbooks,
+        save_workbooks,
+    )
+    from allocation_trace import TRANSFER_TRACE, new_trace
+
     try:
-        (
-            df_inventory,
-            df_rocket,
-            df_sales,
-            df_bom,
-            discontinued_skus,
-            coupang_only_skus,
-        ) = load_all_data(creds_path=creds_path)
+        data = load_all_data(creds_path=creds_path)
     except Exception as e:
         print(f"데이터 로드 중 오류 발생: {e}")
         return
 
+    # 로켓그로스 재고 스냅샷 기록 (process_data가 입력을 수정하므로 처리 전에 기록)
+    snapshot_store = get_default_store()
+    record_snapshot(snapshot_store, data[1])
+
+    # 같은 입력으로 만든 결과가 있으면 처리/시뮬레이션 없이 저장된 파일을 그대로 사용
+    cache = get_default_cache()
+    cache_key = None
+    if cache is not None:
+        params = {"coupang_safety_days": COUPANG_SAFETY_DAYS}
+        if TRANSFER_TRACE:
+            params["trace"] = TRANSFER_TRACE
+        if USE_ADJUSTED_DEMAND and snapshot_store is not None:
+            params["adjusted_demand"] = snapshot_store.fingerprint()
+        cache_key = fingerprint_inputs(data, params)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            df_reco = cached["df_display"]
+            print(f"총 추천 상품 수: {len(df_reco)}개")
+            for path in save_workbooks(cached["files"], script_dir):
+                print(f"저장된 결과 복원 완료: {path}")
+            return
+
+    # 캐시에 없을 때만 처리/추천 모듈(scipy 포함)을 불러옵니다.
+    from data_processor import process_data
+    from recommender import calculate_coupang_transfer_recommendations
+
+    (
+        df_inventory,
+        df_rocket,
+        df_sales,
+        df_bom,
+        discontinued_skus,
+        coupang_only_skus,
+    ) = data
+
     # 2. 데이터 처리
     try:
         df_final, _ = process_data(df_inventory, df_rocket, df_sales, df_bom)
+        df_final = adjust_demand(df_final, snapshot_store)
     except Exception as e:
         print(f"데이터 처리 중 오류 발생: {e}")
         return
@@ -63,16 +101,21 @@ def main():
         print("분석할 데이터가 없습니다.")
         return
 
+    # TRANSFER_TRACE가 설정되어 있으면 입고 결정 과정을 기록하여 '입고_근거' 시트로 저장
+    trace = new_trace()
     try:
         df_reco = calculate_coupang_transfer_recommendations(
             df_final,
             df_bom=df_bom,
-            coupang_safety_days=30,
+            coupang_safety_days=COUPANG_SAFETY_DAYS,
             coupang_only_skus=coupang_only_skus,
             discontinued_skus=discontinued_skus,
+            trace=trace,
         )
 
         if df_reco.empty:
+            if cache_key is not None:
+                cache.put(cache_key, df_reco)
             print("현재 쿠팡으로 배송할 상품이 없습니다 (재고 충분).")
             return
 
@@ -87,78 +130,24 @@ def main():
         print(f"총 추천 입고 수량: {total_quantity}개")
         print(f"{ '='*50}\n")
 
-        # 그룹 긴급도 순으로 전체 목록 정렬
-        # 그룹의 긴급도는 그룹 내 최소 재고 소진 예상일로 결정됩니다.
-        df_reco["_group_min_depletion"] = df_reco.groupby("상품그룹")[
-            "쿠팡_재고소진_예상일"
-        ].transform("min")
-        df_reco = df_reco.sort_values(
-            by=["_group_min_depletion", "상품그룹", "쿠팡_재고소진_예상일"],
-            ascending=[True, True, True],
-        ).reset_index(drop=True)
-
-        # Excel 출력용 컬럼 필터링
-        available_cols = [col for col in OUTPUT_COLUMNS if col in df_reco.columns]
-        df_export = df_reco[available_cols].copy()
-
-        # 1. 전체 추천 목록 저장
-        excel_path = os.path.join(script_dir, "recommendation_result_local.xlsx")
-        df_export.to_excel(excel_path, index=False)
-        print(f"전체 추천 목록 저장 완료: {excel_path}")
-
-        # 2. 일일 작업 목록 저장 (입고수량 누적 합계 160개까지, 마지막 제품은 10개 이상일 경우 분할 입고)
-        # 정렬 기준: 재고 0개 우선, 그 다음 재고 소진 예상일 (오름차순)
-        df_for_daily = df_reco.copy()
-        df_for_daily["_is_zero_stock"] = (df_for_daily["쿠팡재고"] == 0).astype(int)
-        df_for_daily = df_for_daily.sort_values(
-            by=["_is_zero_stock", "쿠팡_재고소진_예상일", "쿠팡_일평균_판매량"],
-            ascending=[False, True, False],
-        ).reset_index(drop=True)
-
-        daily_list = []
-        total_qty = 0
-        MINIMUM_PARTIAL_QTY = 10
-
-        for _, row in df_for_daily.iterrows():
-            item_qty = row["입고수량"]
-            if total_qty + item_qty <= DAILY_WORK_QTY_LIMIT:
-                daily_list.append(row)
-                total_qty += item_qty
-            else:
-                remaining_qty = DAILY_WORK_QTY_LIMIT - total_qty
-                if remaining_qty >= MINIMUM_PARTIAL_QTY:
-                    last_item = row.copy()
-                    last_item["입고수량"] = remaining_qty
-                    daily_list.append(last_item)
-                break
-        
-        df_daily = pd.DataFrame(daily_list)
-        if not df_daily.empty:
-            df_daily = df_daily.reset_index(drop=True)
-
-        # 목록 확정 후 "긴급" 열 추가
-        # 조건: 재고 소진 예상일 < 7일 또는 재고 <= 1개
-        df_daily["긴급"] = ""
-        urgent_condition = (df_daily["쿠팡_재고소진_예상일"] < 7) | (
-            df_daily["쿠팡재고"] <= 1
+        # 전체 추천 목록 / 일일 작업 목록 (입고수량 누적 합계 160개까지)
+        frames = build_export_frames(df_reco)
+        files = export_workbooks(
+            frames, trace_frame=trace.to_frame() if trace is not None else None
         )
-        df_daily.loc[urgent_condition, "긴급"] = "긴급"
-
-        # 160개 리스트업이 완료된 후, 제품군별로 나열
-        df_daily = df_daily.sort_values(by=["상품그룹"]).reset_index(drop=True)
-
-        # "긴급" 열을 맨 마지막에 추가하여 일일 작업 목록의 출력 열 정의
-        daily_output_cols = available_cols + ["긴급"]
-        final_daily_cols = [col for col in daily_output_cols if col in df_daily.columns]
-        df_daily = df_daily[final_daily_cols]
+        excel_path, daily_excel_path = save_workbooks(files, script_dir)
+        print(f"전체 추천 목록 저장 완료: {excel_path}")
 
-        daily_excel_path = os.path.join(script_dir, "daily_work_stocks.xlsx")
-        df_daily.to_excel(daily_excel_path, index=False)
-        daily_qty = int(df_daily["입고수량"].sum())
+        df_daily = frames[DAILY_EXCEL_FILE_NAME]
+        daily_qty = int(df_daily["입고수량"].sum()) if not df_daily.empty else 0
         print(
             f"일일 작업 목록 저장 완료: {daily_excel_path} ({len(df_daily)}개 상품, {daily_qty}개 수량)"
         )
 
+        if cache_key is not None:
+            cache.put(cache_key, df_reco, files=files)
+        print(f"\n단계별 소요 시간\n{summarize()}")
+
     except Exception as e:
         print(f"추천 분석 중 오류 발생: {e}")
 
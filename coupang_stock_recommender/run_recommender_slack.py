@@ -1,19 +1,53 @@
 import os
 import sys
-import pandas as pd
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# 광고 리포트 봇과 함께 쓰는 공용 모듈 (슬랙 알림)
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common")
+)
 
-from data_loader import load_all_data
-from data_processor import process_data
-from recommender import calculate_coupang_transfer_recommendations
+# 시작 시간을 줄이기 위해 pandas, 시트 로딩, 처리/추천, 엑셀, 슬랙 모듈은 해당 단계에서 불러옵니다.
+# (자격증명 누락이나 캐시 적중처럼 일찍 끝나는 실행은 처리/추천 모듈을 불러오지 않습니다)
+# 시작 시간 확인: python common/import_report.py coupang_stock_recommender/run_recommender_slack.py
+from instrumentation import stage, start_run, summarize
+from alert_state import StockoutAlertStore
 
 # --- 설정 ---
 SLACK_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
 SLACK_CHANNEL = os.environ.get("TARGET_CHANNEL", "#general")
+# 파일 업로드(files_upload_v2)는 채널 ID가 필요하므로, 채널 이름을 쓰는 경우 따로 지정합니다.
+SLACK_CHANNEL_ID = os.environ.get("TARGET_CHANNEL_ID")
+# '1'이면 단계별 소요 시간 요약을 슬랙 메시지에 덧붙입니다.
+SLACK_INCLUDE_TIMINGS = os.environ.get("SLACK_INCLUDE_TIMINGS") == "1"
+
+# 추천 정책 파라미터 (결과 캐시 키에 포함됩니다)
+COUPANG_SAFETY_DAYS = 30
+# 입고 수량 엔진 (recommender.TRANSFER_ENGINES, 'optimizer'면 용량 제약 최적화)
+TRANSFER_ENGINE = os.environ.get("TRANSFER_ENGINE", "dict")
+# optimizer 엔진의 하루 입고 가능 수량 (optimizer.DAILY_CAPACITY, 결과 캐시 키에만 사용)
+OPTIMIZER_DAILY_CAPACITY = os.environ.get("OPTIMIZER_DAILY_CAPACITY")
+
+# 실행 모드
+# full: 전체 추천 계산 후 한 번에 알림 (기존 방식)
+# fast: 품절/품절 임박 목록을 시뮬레이션 없이 먼저 알리고, 전체 추천은 스레드 답글로 이어서 전송
+# stockout: 품절/품절 임박 목록만 알림 (시뮬레이션 생략)
+MODE_FULL = "full"
+MODE_FAST = "fast"
+MODE_STOCKOUT = "stockout"
+RECOMMENDER_MODES = [MODE_FULL, MODE_FAST, MODE_STOCKOUT]
+RECOMMENDER_MODE = os.environ.get("RECOMMENDER_MODE", MODE_FULL)
+# 재고 소진 예상일이 이 일수보다 적으면 품절 임박으로 알립니다.
+STOCKOUT_HORIZON_DAYS = int(os.environ.get("STOCKOUT_HORIZON_DAYS", "7"))
+# '1'이면 채널별로 이전 품절 목록과 비교하여 신규 품절/재입고 상품만 알리고,
+# 전체 품절 목록은 고정(pin)된 요약 메시지 하나를 갱신합니다.
+STOCKOUT_DELTA_ALERTS = os.environ.get("STOCKOUT_DELTA_ALERTS") == "1"
+# '1'이면 전체 추천 목록/일일 작업 목록 엑셀 파일을 메모리에서 만들어 함께 업로드합니다.
+SLACK_ATTACH_EXCEL = os.environ.get("SLACK_ATTACH_EXCEL") == "1"
 
 # Google Cloud 자격증명 파일의 경로를 설정합니다.
 # 워크플로우가 스크립트 디렉토리에 'credentials.json' 파일을 생성합니다.
@@ -27,90 +61,460 @@ if not os.path.exists(creds_path):
     )
 
 
-def send_slack_notification(text, file_path=None):
-    """슬랙 채널에 메시지를 보내고 선택적으로 파일을 업로드합니다."""
+def _upload_files(notifier, files, thread_ts=None, channel=None):
+    """메모리에 있는 파일({파일명: bytes})을 업로드합니다."""
+    notifier.upload_files(
+        channel or SLACK_CHANNEL_ID or SLACK_CHANNEL,
+        files,
+        thread_ts=thread_ts,
+        initial_comment="상세 추천 목록을 Excel 파일로 첨부합니다.",
+    )
+
+
+def send_slack_notification(text, files=None, thread_ts=None, channel=None):
+    """
+    슬랙 채널에 메시지를 보내고 선택적으로 파일을 업로드합니다.
+    메시지 전송과 파일 업로드는 동시에 진행합니다.
+
+    :param files: dict (파일명 -> bytes)
+    :param thread_ts: 지정하면 해당 메시지의 스레드 답글로 보냅니다.
+    :param channel: 보낼 채널 (기본값 SLACK_CHANNEL, 파일을 올리려면 채널 ID)
+    :return: 보낸 메시지의 ts (전송하지 못했으면 None)
+    """
     if not SLACK_TOKEN:
         print("경고: SLACK_BOT_TOKEN을 찾을 수 없습니다. 슬랙 알림을 건너뜁니다.")
         print(f"메시지: {text}")
-        return
+        return None
 
-    client = WebClient(token=SLACK_TOKEN)
+    from slack_notifier import SlackApiError, get_notifier
+
+    notifier = get_notifier(SLACK_TOKEN)
     try:
-        # 텍스트 메시지 보내기
-        client.chat_postMessage(channel=SLACK_CHANNEL, text=text)
-
-        # 파일이 존재하면 업로드하기
-        if file_path and os.path.exists(file_path):
-            client.files_upload_v2(
-                channel=SLACK_CHANNEL,
-                file=file_path,
-                title="쿠팡 발송 추천 목록",
-                initial_comment="상세 추천 목록을 Excel 파일로 첨부합니다.",
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # 텍스트 메시지 보내기 (길면 슬랙 제한에 맞게 나누어 전송)
+            post = executor.submit(
+                notifier.post_message, channel or SLACK_CHANNEL, text, thread_ts=thread_ts
+            )
+            # 파일이 있으면 업로드하기
+            upload = (
+                executor.submit(_upload_files, notifier, files, thread_ts, channel)
+                if files
+                else None
             )
+            response = post.result()
+            if upload is not None:
+                upload.result()
         print("슬랙 알림을 성공적으로 보냈습니다.")
+        return response["ts"]
     except SlackApiError as e:
         print(f"슬랙 알림 전송 중 오류 발생: {e.response['error']}")
+        return None
 
 
-def main():
-    """재고 추천 프로세스를 실행하는 메인 함수입니다."""
-    print("재고 추천 분석을 시작합니다...")
+def build_stockout_message(df_reco):
+    """추천 결과에서 즉시 품절(쿠팡재고 = 0) 상품 목록 메시지를 만듭니다."""
+    if df_reco.empty:
+        return "현재 쿠팡으로 배송할 상품이 없습니다 (재고 충분)"
 
-    # 1. 데이터 로드
+    # 쿠팡재고 = 0 (즉시 품절)인 상품 필터링
+    stockout_mask = df_reco["쿠팡재고"] == 0
+    stockout_products = df_reco[stockout_mask]
+    stockout_count = len(stockout_products)
+
+    # 품절 상품 개수와 목록으로 메시지 생성
+    msg = f"🚨 *즉시 품절 상품: {stockout_count}개*\n\n"
+
+    if stockout_count > 0:
+        for _, row in stockout_products.iterrows():
+            product_name = str(row["상품명"])
+            msg += f"• {product_name}\n"
+
+    return msg
+
+
+def stockout_names(df, mask):
+    """품절 상품의 {sku: 상품명}을 만듭니다."""
+    rows = df[mask]
+    return dict(zip(rows["sku"].astype(str), rows["상품명"].astype(str)))
+
+
+def build_stockout_summary(stockouts):
+    """고정 요약 메시지 본문을 만듭니다. (stockouts: sku -> (상품명, 품절 시작 시각))"""
+    updated_at = datetime.datetime.now().strftime("%m/%d %H:%M")
+    msg = f"📌 *쿠팡 즉시 품절 현황: {len(stockouts)}개* ({updated_at} 기준)\n\n"
+    for name, since in sorted(stockouts.values(), key=lambda x: x[1]):
+        msg += f"• {name} ({since[5:10].replace('-', '/')}~)\n"
+    return msg
+
+
+def build_stockout_delta_message(new, recovered):
+    """신규 품절/재입고 상품 알림 메시지를 만듭니다."""
+    msg = ""
+    if new:
+        msg += f"🚨 *신규 품절 상품: {len(new)}개*\n\n"
+        for name in new.values():
+            msg += f"• {name}\n"
+    if recovered:
+        if msg:
+            msg += "\n"
+        msg += f"✅ *재입고 상품: {len(recovered)}개*\n\n"
+        for name in recovered.values():
+            msg += f"• {name}\n"
+    return msg
+
+
+def _update_pinned_summary(notifier, store, text):
+    """고정 요약 메시지를 갱신하고, 없거나 삭제되었으면 새로 보내 고정합니다."""
+    from slack_notifier import SlackApiError
+
+    saved = store.get_summary_message(SLACK_CHANNEL)
+    if saved is not None:
+        channel_id, ts = saved
+        try:
+            notifier.update_message(channel_id, ts, text)
+            return ts
+        except SlackApiError as e:
+            print(f"고정 요약 메시지 갱신 실패, 새로 보냅니다: {e.response['error']}")
+
+    response = notifier.post_message(SLACK_CHANNEL, text)
     try:
-        (
-            df_inventory,
-            df_rocket,
-            df_sales,
-            df_bom,
-            discontinued_skus,
-            coupang_only_skus,
-        ) = load_all_data(creds_path=creds_path)
-    except Exception as e:
-        send_slack_notification(f"데이터 로드 중 오류 발생: {e}")
-        return
+        notifier.pin(response["channel"], response["ts"])
+    except SlackApiError as e:
+        print(f"요약 메시지 고정 실패: {e.response['error']}")
+    store.set_summary_message(SLACK_CHANNEL, response["channel"], response["ts"])
+    return response["ts"]
+
+
+def notify_stockout_changes(stockouts, store, suffix="", extra=""):
+    """
+    이전 실행과 비교하여 신규 품절/재입고 상품만 알리고 고정 요약 메시지를 갱신합니다.
+
+    :param stockouts: 현재 즉시 품절 상품 (sku -> 상품명)
+    :param store: StockoutAlertStore
+    :param extra: 변경분과 관계없이 함께 보낼 내용 (예: 품절 임박 목록)
+    :return: (스레드 답글에 사용할 메시지 ts, 보낸 알림 메시지)
+    """
+    new, recovered = store.diff(SLACK_CHANNEL, stockouts)
+    msg = build_stockout_delta_message(new, recovered)
+    if extra:
+        msg = f"{msg}\n{extra}" if msg else extra
+
+    if not SLACK_TOKEN:
+        print("경고: SLACK_BOT_TOKEN을 찾을 수 없습니다. 슬랙 알림을 건너뜁니다.")
+        print(f"메시지: {msg or '품절 목록 변경 없음'}")
+        return None, msg
+
+    from slack_notifier import SlackApiError, get_notifier
+
+    # 요약은 저장 전의 품절 시작 시각으로 메모리에서 만들고, 목록 저장은 전송이 성공한 뒤에 합니다.
+    # (전송 실패 시 먼저 저장해 버리면 다음 실행의 비교 결과가 비어 신규 품절 알림이 사라짐)
+    previous = store.get_stockouts(SLACK_CHANNEL)
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    current = {
+        sku: (name, previous[sku][1] if sku in previous else now)
+        for sku, name in stockouts.items()
+    }
+
+    notifier = get_notifier(SLACK_TOKEN)
+    try:
+        _update_pinned_summary(notifier, store, build_stockout_summary(current))
+
+        # 변경이 없으면 ts는 None (뒤이은 답글을 고정 요약 메시지 스레드에 달지 않음)
+        ts = None
+        if msg:
+            ts = notifier.post_message(SLACK_CHANNEL, msg + suffix)["ts"]
+            print(f"품절 알림 전송 (신규 {len(new)}개, 재입고 {len(recovered)}개)")
+        else:
+            print("품절 목록에 변경이 없어 알림을 생략합니다. (요약 메시지만 갱신)")
+        store.save_stockouts(SLACK_CHANNEL, stockouts)
+        return ts, msg
+    except SlackApiError as e:
+        print(f"슬랙 알림 전송 중 오류 발생: {e.response['error']}")
+        return None, msg
+
+
+def post_stockout_alert(
+    msg, stockouts, alert_store=None, thread_ts=None, files=None, suffix="", extra=""
+):
+    """
+    품절 알림을 보냅니다. alert_store가 있으면 변경분만 보냅니다.
+
+    :param files: 함께 올릴 파일 (파일명 -> bytes)
+    :param extra: alert_store가 있을 때 변경분 알림에 덧붙일 내용 (msg에는 이미 포함된 것으로 봄)
+    :return: (메시지 ts, 보낸 메시지)
+    """
+    if alert_store is None:
+        msg += suffix
+        return send_slack_notification(msg, files=files, thread_ts=thread_ts), msg
+
+    ts, msg = notify_stockout_changes(stockouts, alert_store, suffix=suffix, extra=extra)
+    if files:
+        from slack_notifier import SlackApiError, get_notifier
+
+        try:
+            _upload_files(get_notifier(SLACK_TOKEN), files, thread_ts=ts)
+        except SlackApiError as e:
+            print(f"파일 업로드 중 오류 발생: {e.response['error']}")
+    return ts, msg
+
+
+def build_near_term_message(df_stockouts, horizon_days=STOCKOUT_HORIZON_DAYS):
+    """find_stockouts() 결과로 품절 임박 상품 메시지를 만듭니다."""
+    from stockout import COL_STOCKOUT_TYPE, STOCKOUT_IMMEDIATE
+
+    near_term = df_stockouts[df_stockouts[COL_STOCKOUT_TYPE] != STOCKOUT_IMMEDIATE]
+
+    msg = f"⚠️ *{horizon_days}일 내 품절 예상: {len(near_term)}개*\n\n"
+    for _, row in near_term.iterrows():
+        msg += f"• {row['상품명']} (약 {row['쿠팡_재고소진_예상일']:.0f}일)\n"
+    return msg
+
+
+def split_stockouts(df_stockouts, include_near_term=False):
+    """
+    find_stockouts() 결과를 품절 변경 알림용으로 나눕니다.
+    캐시 적중/빠른 알림/전체 추천 모두 같은 즉시 품절 기준으로 이전 목록과 비교하기 위해 사용합니다.
+
+    :param include_near_term: True면 품절 임박 목록 메시지도 만듭니다. (없으면 빈 문자열)
+    :return: (즉시 품절 {sku: 상품명}, 품절 임박 메시지)
+    """
+    from stockout import COL_STOCKOUT_TYPE, STOCKOUT_IMMEDIATE
+
+    immediate = df_stockouts[COL_STOCKOUT_TYPE] == STOCKOUT_IMMEDIATE
+    near_term_msg = ""
+    if include_near_term and not immediate.all():
+        near_term_msg = build_near_term_message(df_stockouts)
+    return stockout_names(df_stockouts, immediate), near_term_msg
+
+
+def build_fast_stockout_message(df_stockouts, horizon_days=STOCKOUT_HORIZON_DAYS):
+    """find_stockouts() 결과로 즉시 품절/품절 임박 상품 메시지를 만듭니다."""
+    from stockout import COL_STOCKOUT_TYPE, STOCKOUT_IMMEDIATE
+
+    immediate = df_stockouts[df_stockouts[COL_STOCKOUT_TYPE] == STOCKOUT_IMMEDIATE]
+
+    msg = f"🚨 *즉시 품절 상품: {len(immediate)}개*\n\n"
+    for name in immediate["상품명"]:
+        msg += f"• {name}\n"
+
+    return msg + "\n" + build_near_term_message(df_stockouts, horizon_days)
+
+
+def build_follow_up_message(df_reco):
+    """빠른 알림 뒤에 스레드 답글로 보낼 전체 추천 요약 메시지를 만듭니다."""
+    if df_reco.empty:
+        return "현재 쿠팡으로 배송할 상품이 없습니다 (재고 충분)"
+
+    total_quantity = int(df_reco["입고수량"].sum())
+    msg = f"📦 *쿠팡 입고 추천: {len(df_reco)}개 상품, 총 {total_quantity}개*\n\n"
+    return msg + build_stockout_message(df_reco)
+
+
+def recommend_and_notify(
+    data,
+    bom_parsed=None,
+    cache=None,
+    recommender=None,
+    mode=MODE_FULL,
+    alert_store=None,
+    snapshot_store=None,
+):
+    """
+    불러온 시트 데이터로 추천 목록을 계산하고 결과를 슬랙으로 보냅니다.
+
+    :param data: load_all_data()가 반환하는 6개 객체 튜플
+    :param bom_parsed: 미리 파싱해 둔 BOM (서비스 모드에서 재사용)
+    :param cache: ResultCache. 같은 입력의 결과가 있으면 처리/시뮬레이션을 건너뜁니다.
+    :param recommender: 추천 계산 함수 (기본값 calculate_coupang_transfer_recommendations,
+        서비스 모드에서는 IncrementalRecommender.calculate)
+    :param mode: 실행 모드 (RECOMMENDER_MODES 참고)
+    :param alert_store: StockoutAlertStore. 있으면 품절 목록의 변경분만 알립니다.
+    :param snapshot_store: SnapshotStore. 있으면 로켓그로스 재고 스냅샷을 기록하고,
+        USE_ADJUSTED_DEMAND 설정 시 품절 보정 수요로 추천합니다.
+    :return: 슬랙으로 보낸 (마지막) 메시지
+    """
+    from result_cache import fingerprint_inputs
+    from snapshot_store import USE_ADJUSTED_DEMAND, adjust_demand, record_snapshot
+    from allocation_trace import TRANSFER_TRACE, new_trace
+
+    # 입고 결정 기록(설명 모드)은 엑셀을 첨부할 때만 '입고_근거' 시트로 내보냅니다.
+    trace = new_trace() if SLACK_ATTACH_EXCEL else None
+
+    # process_data가 입력을 수정하므로 스냅샷과 지문은 처리 전에 계산합니다.
+    record_snapshot(snapshot_store, data[1])
+    cache_key = None
+    if cache is not None and mode != MODE_STOCKOUT:
+        params = {
+            "coupang_safety_days": COUPANG_SAFETY_DAYS,
+            "engine": TRANSFER_ENGINE,
+            "optimizer_daily_capacity": OPTIMIZER_DAILY_CAPACITY,
+            "stockout_horizon_days": STOCKOUT_HORIZON_DAYS,
+        }
+        if trace is not None:
+            params["trace"] = TRANSFER_TRACE
+        if USE_ADJUSTED_DEMAND and snapshot_store is not None:
+            params["adjusted_demand"] = snapshot_store.fingerprint()
+        cache_key = fingerprint_inputs(data, params)
+        cached = cache.get(cache_key)
+        # 품절 목록(find_stockouts 결과)이 없는 이전 형식의 항목은 알림 기준이 다르므로 다시 계산
+        if cached is not None and cached["df_stockouts"] is not None:
+            df_reco = cached["df_display"]
+            files = cached["files"] if SLACK_ATTACH_EXCEL else None
+            # 캐시에 없을 때와 같은 순서로 알립니다: 품절/품절 임박 → (빠른 알림이면) 추천 요약 답글
+            stockouts, near_term_msg = split_stockouts(cached["df_stockouts"], include_near_term=True)
+            if mode == MODE_FAST:
+                thread_ts, _ = post_stockout_alert(
+                    build_fast_stockout_message(cached["df_stockouts"]),
+                    stockouts,
+                    alert_store,
+                    extra=near_term_msg,
+                )
+                msg = build_follow_up_message(df_reco)
+                send_slack_notification(msg, files=files, thread_ts=thread_ts)
+                return msg
+            _, msg = post_stockout_alert(
+                build_fast_stockout_message(cached["df_stockouts"]),
+                stockouts,
+                alert_store,
+                files=files,
+                extra=near_term_msg,
+            )
+            return msg
+
+    # 캐시에 없을 때만 처리/추천 모듈(scipy, openpyxl 포함)을 불러옵니다.
+    with stage("import_pipeline"):
+        from data_processor import process_data
+        from recommender import calculate_coupang_transfer_recommendations
+        from stockout import find_stockouts
+        from excel_export import build_export_frames, export_workbooks
+
+    (
+        df_inventory,
+        df_rocket,
+        df_sales,
+        df_bom,
+        discontinued_skus,
+        coupang_only_skus,
+    ) = data
 
     # 2. 데이터 처리
     try:
         df_final, _ = process_data(df_inventory, df_rocket, df_sales, df_bom)
+        df_final = adjust_demand(df_final, snapshot_store)
     except Exception as e:
-        send_slack_notification(f"데이터 처리 중 오류 발생: {e}")
-        return
+        msg = f"데이터 처리 중 오류 발생: {e}"
+        send_slack_notification(msg)
+        return msg
 
     # 3. 추천 목록 생성
     if df_final.empty:
-        send_slack_notification("분석할 데이터가 없습니다.")
-        return
+        msg = "분석할 데이터가 없습니다."
+        send_slack_notification(msg)
+        return msg
 
+    # 품절 변경 알림은 모드/캐시 여부와 관계없이 find_stockouts()의 즉시 품절 목록을 기준으로 합니다.
+    with stage("find_stockouts"):
+        df_stockouts = find_stockouts(
+            df_final,
+            discontinued_skus=discontinued_skus,
+            horizon_days=STOCKOUT_HORIZON_DAYS,
+        )
+
+    # 빠른 알림: 시뮬레이션 없이 품절/품절 임박 상품을 먼저 보냅니다.
+    thread_ts = None
+    if mode in (MODE_FAST, MODE_STOCKOUT):
+        with stage("stockout_fast_path"):
+            msg = build_fast_stockout_message(df_stockouts)
+            # 변경분 알림에서도 품절 임박 목록은 빠지지 않도록 덧붙입니다. (있을 때만)
+            stockouts, near_term_msg = split_stockouts(df_stockouts, include_near_term=True)
+        thread_ts, msg = post_stockout_alert(
+            msg, stockouts, alert_store, extra=near_term_msg
+        )
+        if mode == MODE_STOCKOUT:
+            return msg
+
+    recommender = recommender or calculate_coupang_transfer_recommendations
+    stockouts = None
+    near_term_msg = ""
+    files = None
     try:
-        df_reco = calculate_coupang_transfer_recommendations(
+        df_reco = recommender(
             df_final,
             df_bom=df_bom,
-            coupang_safety_days=30,
+            coupang_safety_days=COUPANG_SAFETY_DAYS,
             coupang_only_skus=coupang_only_skus,
             discontinued_skus=discontinued_skus,
+            bom_parsed=bom_parsed,
+            engine=TRANSFER_ENGINE,
+            trace=trace,
         )
-
-        if df_reco.empty:
-            send_slack_notification("현재 쿠팡으로 배송할 상품이 없습니다 (재고 충분)")
+        if mode == MODE_FAST:
+            msg = build_follow_up_message(df_reco)
         else:
-            # 쿠팡재고 = 0 (즉시 품절)인 상품 필터링
-            stockout_mask = df_reco["쿠팡재고"] == 0
-            stockout_products = df_reco[stockout_mask]
-            stockout_count = len(stockout_products)
+            msg = build_fast_stockout_message(df_stockouts)
+        if SLACK_ATTACH_EXCEL and not df_reco.empty:
+            trace_frame = trace.to_frame() if trace is not None else None
+            files = export_workbooks(build_export_frames(df_reco), trace_frame=trace_frame)
+        if cache_key is not None:
+            cache.put(cache_key, df_reco, files=files, df_stockouts=df_stockouts)
+    except Exception as e:
+        msg = f"추천 분석 중 오류 발생: {e}"
+    else:
+        # 추천/내보내기/캐시 저장이 모두 끝난 뒤에만 품절 목록을 변경 알림 기준으로 넘깁니다.
+        # (중간에 실패하면 오류 메시지를 그대로 보내고 품절 목록은 저장하지 않음)
+        if mode != MODE_FAST:
+            stockouts, near_term_msg = split_stockouts(df_stockouts, include_near_term=True)
+
+    suffix = ""
+    if SLACK_INCLUDE_TIMINGS:
+        suffix = f"\n\n⏱️ *단계별 소요 시간*\n{summarize()}"
 
-            # 품절 상품 개수와 목록으로 메시지 생성
-            msg = f"🚨 *즉시 품절 상품: {stockout_count}개*\n\n"
+    if alert_store is not None and stockouts is not None:
+        _, msg = post_stockout_alert(
+            msg, stockouts, alert_store, files=files, suffix=suffix, extra=near_term_msg
+        )
+        return msg
 
-            if stockout_count > 0:
-                for _, row in stockout_products.iterrows():
-                    product_name = str(row["상품명"])
-                    msg += f"• {product_name}\n"
+    msg += suffix
+    send_slack_notification(msg, files=files, thread_ts=thread_ts)
+    return msg
 
-            send_slack_notification(msg)
 
+def main():
+    """재고 추천 프로세스를 실행하는 메인 함수입니다."""
+    parser = argparse.ArgumentParser(description="쿠팡 재고 추천 슬랙 알림")
+    parser.add_argument(
+        "--mode", default=RECOMMENDER_MODE, choices=RECOMMENDER_MODES
+    )
+    args = parser.parse_args()
+
+    print("재고 추천 분석을 시작합니다...")
+    start_run()
+
+    # 자격증명 파일이 없으면 시트 모듈을 불러오기 전에 바로 종료합니다.
+    if not os.path.exists(creds_path):
+        send_slack_notification(f"데이터 로드 중 오류 발생: 자격증명 파일이 없습니다 ({creds_path})")
+        return
+
+    # 1. 데이터 로드
+    from data_loader import load_all_data
+    from result_cache import get_default_cache
+    from snapshot_store import get_default_store
+
+    try:
+        data = load_all_data(creds_path=creds_path)
     except Exception as e:
-        send_slack_notification(f"추천 분석 중 오류 발생: {e}")
+        send_slack_notification(f"데이터 로드 중 오류 발생: {e}")
+        return
+
+    alert_store = StockoutAlertStore() if STOCKOUT_DELTA_ALERTS else None
+    recommend_and_notify(
+        data,
+        cache=get_default_cache(),
+        mode=args.mode,
+        alert_store=alert_store,
+        snapshot_store=get_default_store(),
+    )
 
 
 if __name__ == "__main__":
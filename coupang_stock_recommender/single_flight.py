@@ -0,0 +1,93 @@
+"""
+같은 작업을 동시에 여러 번 실행하지 않도록 트리거를 합치는 도구입니다.
+
+- 실행 중에 들어온 트리거는 새로 실행하지 않고, 진행 중인 실행의 결과를 함께 받습니다.
+- 짧은 대기 시간(debounce) 안에 연달아 들어온 트리거는 한 번의 실행으로 합쳐집니다.
+
+여러 사람이 슬랙/Make 트리거를 거의 동시에 누르더라도 시트 로딩과 슬랙 전송은 한 번만 일어납니다.
+"""
+
+import time
+import threading
+
+# 첫 트리거 후 실제 실행까지 기다리는 시간 (이 사이에 들어온 트리거는 합쳐짐)
+DEFAULT_DEBOUNCE_SECONDS = 3.0
+
+
+class Flight:
+    """한 번의 실행과, 그 실행에 합류한 트리거들의 결과를 나타냅니다."""
+
+    def __init__(self, kwargs):
+        self.kwargs = dict(kwargs)
+        self.trigger_count = 1
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """실행이 끝날 때까지 기다린 뒤 결과를 반환합니다. (실행 중 예외는 그대로 다시 발생)"""
+        if not self._done.wait(timeout):
+            raise TimeoutError("실행이 제한 시간 안에 끝나지 않았습니다.")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class SingleFlight:
+    """
+    func를 한 번에 하나만 실행하며, 겹치는 트리거를 하나의 실행으로 합칩니다.
+
+    대기 중인 실행에 합류한 트리거의 키워드 인자는 OR로 합쳐집니다.
+    (예: 한 명이라도 refresh=True로 요청하면 새로고침하여 실행)
+    """
+
+    def __init__(self, func, debounce_seconds=DEFAULT_DEBOUNCE_SECONDS):
+        self._func = func
+        self.debounce_seconds = debounce_seconds
+        self._lock = threading.Lock()
+        self._pending = None  # 대기 시간 중인 실행
+        self._running = None  # 진행 중인 실행
+
+    def submit(self, **kwargs):
+        """트리거를 등록하고 결과를 받을 Flight를 즉시 반환합니다."""
+        with self._lock:
+            if self._running is not None:
+                self._running.trigger_count += 1
+                return self._running
+
+            if self._pending is not None:
+                self._pending.trigger_count += 1
+                for key, value in kwargs.items():
+                    self._pending.kwargs[key] = self._pending.kwargs.get(key) or value
+                return self._pending
+
+            flight = Flight(kwargs)
+            self._pending = flight
+
+        threading.Thread(target=self._execute, args=(flight,), daemon=True).start()
+        return flight
+
+    def call(self, timeout=None, **kwargs):
+        """트리거를 등록하고 결과가 나올 때까지 기다립니다."""
+        return self.submit(**kwargs).wait(timeout)
+
+    def _execute(self, flight):
+        if self.debounce_seconds > 0:
+            time.sleep(self.debounce_seconds)
+
+        with self._lock:
+            self._pending = None
+            self._running = flight
+
+        try:
+            flight.result = self._func(**flight.kwargs)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._running = None
+            flight._done.set()
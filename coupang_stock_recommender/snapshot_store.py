@@ -0,0 +1,306 @@
+"""
+쿠팡 로켓그로스 재고 스냅샷 기록 (로컬 parquet)
+
+크롤링/시트 로딩 때마다 옵션별 재고, 입고 예정, 7/30일 판매량만 골라 날짜별 파티션으로 저장합니다.
+
+    <저장 경로>/date=2024-05-01/snapshot.parquet
+
+같은 날 여러 번 기록하면 마지막 스냅샷으로 교체합니다.
+쌓인 기록으로 옵션별 품절 일수를 계산하여, 품절 기간 때문에 낮게 잡힌
+30일 판매량을 실제 수요에 가깝게 보정할 수 있습니다.
+"""
+
+import os
+import datetime
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from data_processor import (
+    COL_COUPANG_OPTION_CODE,
+    COL_DIRECT_SALES_30D_COUPANG,
+    COL_SALES_30D_COUPANG,
+    clean_numeric_column,
+)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SNAPSHOT_DIR = os.environ.get(
+    "INVENTORY_SNAPSHOT_DIR", os.path.join(script_dir, ".snapshots")
+)
+# '0'이면 스냅샷을 기록하지 않습니다.
+SNAPSHOTS_ENABLED = os.environ.get("INVENTORY_SNAPSHOTS", "1") != "0"
+# '1'이면 추천 계산에 원본 30일 판매량 대신 품절 보정 수요를 사용합니다.
+USE_ADJUSTED_DEMAND = os.environ.get("USE_ADJUSTED_DEMAND") == "1"
+
+PARTITION_PREFIX = "date="
+SNAPSHOT_FILE_NAME = "snapshot.parquet"
+
+# 로켓그로스 재고 시트(2줄 헤더를 합친 이름) -> 스냅샷 컬럼
+SNAPSHOT_SOURCE_COLUMNS = {
+    "Orderable quantity (real-time)": "판매가능재고",
+    "Pending inbounds (real-time)": "입고예정",
+    "Recent sales quantity Last 7 days": "판매량_7일",
+    "Recent sales quantity Last 30 days": "판매량_30일",
+}
+SRC_OPTION_ID = "Option ID"
+COL_DATE = "date"
+COL_OPTION_ID = "option_id"
+COL_STOCK = "판매가능재고"
+COL_SALES_30D = "판매량_30일"
+
+# 수요 보정 결과 컬럼
+COL_OBSERVED_DAYS = "관측일수"
+COL_IN_STOCK_DAYS = "재고보유일수"
+COL_IN_STOCK_RATIO = "재고보유비율"
+COL_DEMAND_FACTOR = "수요보정계수"
+COL_ADJUSTED_SALES_30D = "보정_30일_판매량"
+
+# 보정 기간 (쿠팡 30일 판매량과 같은 기간)
+DEMAND_WINDOW_DAYS = 30
+# 관측일이 이보다 적으면 보정하지 않습니다. (기록을 쌓기 시작한 직후 과대 보정 방지)
+MIN_OBSERVED_DAYS = 7
+# 재고 보유 비율의 하한. 거의 내내 품절이었던 옵션의 보정 계수를 최대 4배로 제한합니다.
+MIN_IN_STOCK_RATIO = 0.25
+
+
+def _to_date_str(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def normalize_option_ids(series):
+    """옵션 ID를 문자열로 통일합니다. (엑셀에서 숫자로 읽힌 '123.0' 형태 포함)"""
+    return (
+        series.astype(str)
+        .str.strip()
+        .str.replace(r"\.0$", "", regex=True)
+    )
+
+
+def snapshot_from_rocket(df_rocket):
+    """
+    로켓그로스 재고 DataFrame(data_loader.build_rocket_frame 결과)에서 스냅샷 컬럼만 추립니다.
+    process_data가 입력을 수정하므로 처리 전에 호출해야 합니다.
+    """
+    if df_rocket is None or df_rocket.empty or SRC_OPTION_ID not in df_rocket.columns:
+        return pd.DataFrame()
+
+    snapshot = pd.DataFrame({COL_OPTION_ID: normalize_option_ids(df_rocket[SRC_OPTION_ID])})
+    for src_col, col in SNAPSHOT_SOURCE_COLUMNS.items():
+        if src_col in df_rocket.columns:
+            values = clean_numeric_column(df_rocket[src_col]).clip(lower=0).to_numpy()
+        else:
+            values = np.zeros(len(df_rocket))
+        snapshot[col] = values.astype(np.int32)
+
+    snapshot = snapshot[snapshot[COL_OPTION_ID].ne("") & snapshot[COL_OPTION_ID].ne("nan")]
+    # 같은 옵션이 여러 행이면 (센터별 행 등) 합산
+    return snapshot.groupby(COL_OPTION_ID, as_index=False, sort=True).sum()
+
+
+def snapshot_from_inventory_excel(df_excel):
+    """
+    update_coupang_rocket_inventory.read_inventory_excel 결과(첫 데이터 행 = 두 번째 헤더 행)를
+    시트와 같은 2줄 헤더로 합쳐 스냅샷을 만듭니다.
+    """
+    from data_loader import build_rocket_frame
+
+    if df_excel is None or df_excel.empty:
+        return pd.DataFrame()
+    values = [list(df_excel.columns)] + df_excel.astype(object).where(
+        df_excel.notna(), ""
+    ).values.tolist()
+    return snapshot_from_rocket(build_rocket_frame(values))
+
+
+class SnapshotStore:
+    """날짜별 로켓그로스 재고 스냅샷을 parquet 파일로 보관합니다."""
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_DIR):
+        self.path = path
+
+    def _partition_path(self, date):
+        return os.path.join(
+            self.path, f"{PARTITION_PREFIX}{_to_date_str(date)}", SNAPSHOT_FILE_NAME
+        )
+
+    def _partitions(self, start=None, end=None):
+        """(날짜 문자열, 파일 경로) 목록 (오름차순)"""
+        if not os.path.isdir(self.path):
+            return []
+        start_str = _to_date_str(start) if start else None
+        end_str = _to_date_str(end) if end else None
+        partitions = []
+        for name in sorted(os.listdir(self.path)):
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            date_str = name[len(PARTITION_PREFIX):]
+            if (start_str and date_str < start_str) or (end_str and date_str > end_str):
+                continue
+            path = os.path.join(self.path, name, SNAPSHOT_FILE_NAME)
+            if os.path.exists(path):
+                partitions.append((date_str, path))
+        return partitions
+
+    def append(self, snapshot, date=None):
+        """
+        스냅샷을 날짜 파티션에 저장합니다. (같은 날짜는 교체)
+
+        :param snapshot: snapshot_from_rocket() 결과
+        :param date: 기록 날짜 (기본값: 오늘, UTC)
+        :return: 저장한 옵션 수
+        """
+        if snapshot is None or snapshot.empty:
+            return 0
+        date = date or datetime.datetime.now(datetime.timezone.utc).date()
+        path = self._partition_path(date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        snapshot.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return len(snapshot)
+
+    def record(self, df_rocket, date=None):
+        """로켓그로스 재고 DataFrame에서 스냅샷을 만들어 저장합니다."""
+        return self.append(snapshot_from_rocket(df_rocket), date=date)
+
+    def load(self, start=None, end=None):
+        """기간(포함)에 해당하는 스냅샷을 date 컬럼과 함께 하나의 DataFrame으로 반환합니다."""
+        frames = []
+        for date_str, path in self._partitions(start, end):
+            df = pd.read_parquet(path)
+            df.insert(0, COL_DATE, date_str)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df[COL_DATE] = pd.to_datetime(df[COL_DATE])
+        return df
+
+    def fingerprint(self, as_of=None, window_days=DEMAND_WINDOW_DAYS):
+        """
+        보정 기간 파티션의 날짜/내용 지문 (결과 캐시 키용)
+        매 실행마다 오늘 파티션을 다시 쓰므로 수정 시각이 아닌 파일 내용으로 계산합니다.
+        """
+        end, start = self._window(as_of, window_days)
+        hasher = hashlib.sha256()
+        for date_str, path in self._partitions(start, end):
+            hasher.update(date_str.encode())
+            with open(path, "rb") as f:
+                hasher.update(f.read())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _window(as_of, window_days):
+        end = as_of or datetime.datetime.now(datetime.timezone.utc).date()
+        return end, end - datetime.timedelta(days=window_days - 1)
+
+    def stockout_adjusted_rates(self, as_of=None, window_days=DEMAND_WINDOW_DAYS):
+        """
+        최근 window_days일의 스냅샷으로 옵션별 재고 보유 비율과 수요 보정 계수를 계산합니다.
+
+        판매 가능 재고가 0인 날은 팔 수 없었던 날이므로, 30일 판매량을 재고 보유 비율로 나누어
+        품절이 없었을 때의 수요로 환산합니다. (관측일이 MIN_OBSERVED_DAYS 미만이면 계수 1)
+
+        :return: option_id, 관측일수, 재고보유일수, 재고보유비율, 판매량_30일(최근 값),
+                 수요보정계수, 보정_30일_판매량 컬럼의 DataFrame
+        """
+        end, start = self._window(as_of, window_days)
+        df = self.load(start, end)
+        if df.empty:
+            return pd.DataFrame(
+                columns=[
+                    COL_OPTION_ID,
+                    COL_OBSERVED_DAYS,
+                    COL_IN_STOCK_DAYS,
+                    COL_IN_STOCK_RATIO,
+                    COL_SALES_30D,
+                    COL_DEMAND_FACTOR,
+                    COL_ADJUSTED_SALES_30D,
+                ]
+            )
+
+        df["_in_stock"] = df[COL_STOCK] > 0
+        # load()가 날짜순으로 읽으므로 옵션별 마지막 행이 최신 스냅샷
+        rates = df.groupby(COL_OPTION_ID, sort=True).agg(
+            **{
+                COL_OBSERVED_DAYS: (COL_DATE, "size"),
+                COL_IN_STOCK_DAYS: ("_in_stock", "sum"),
+                COL_SALES_30D: (COL_SALES_30D, "last"),
+            }
+        )
+        observed = rates[COL_OBSERVED_DAYS].to_numpy()
+        ratio = rates[COL_IN_STOCK_DAYS].to_numpy() / observed
+        rates[COL_IN_STOCK_RATIO] = ratio
+        rates[COL_DEMAND_FACTOR] = np.where(
+            observed >= MIN_OBSERVED_DAYS,
+            1.0 / np.clip(ratio, MIN_IN_STOCK_RATIO, 1.0),
+            1.0,
+        )
+        rates[COL_ADJUSTED_SALES_30D] = np.round(
+            rates[COL_SALES_30D].to_numpy() * rates[COL_DEMAND_FACTOR].to_numpy()
+        ).astype(np.int64)
+        return rates.reset_index()
+
+
+def apply_adjusted_demand(df_final, rates):
+    """
+    process_data 결과의 쿠팡 30일 판매량을 품절 보정 수요로 바꾼 복사본을 반환합니다.
+
+    옵션의 순수 판매량(쿠팡_30일_순수판매량)만 보정하고, 늘어난 만큼을 세트 분배가 포함된
+    쿠팡_30일_판매량에도 더합니다. 기록이 없는 옵션은 그대로 둡니다.
+    """
+    df = df_final.copy()
+    if (
+        rates is None
+        or rates.empty
+        or COL_COUPANG_OPTION_CODE not in df.columns
+        or COL_DIRECT_SALES_30D_COUPANG not in df.columns
+    ):
+        return df
+
+    factors = rates.set_index(COL_OPTION_ID)[COL_DEMAND_FACTOR]
+    factor = (
+        normalize_option_ids(df[COL_COUPANG_OPTION_CODE])
+        .map(factors)
+        .fillna(1.0)
+        .to_numpy()
+    )
+    direct = df[COL_DIRECT_SALES_30D_COUPANG].to_numpy(dtype=float)
+    adjusted = np.round(direct * factor)
+    df[COL_DIRECT_SALES_30D_COUPANG] = adjusted
+    df[COL_SALES_30D_COUPANG] = df[COL_SALES_30D_COUPANG].to_numpy(dtype=float) + (
+        adjusted - direct
+    )
+    return df
+
+
+def get_default_store():
+    """환경 변수 설정에 따라 기본 스냅샷 저장소를 반환합니다. (비활성화 시 None)"""
+    return SnapshotStore() if SNAPSHOTS_ENABLED else None
+
+
+def record_snapshot(store, df_rocket):
+    """스냅샷을 기록합니다. 기록 실패는 추천/업로드를 막지 않도록 경고만 출력합니다."""
+    if store is None:
+        return 0
+    try:
+        count = store.record(df_rocket)
+        print(f"쿠팡 재고 스냅샷 기록 완료: {count}개 옵션")
+        return count
+    except Exception as e:
+        print(f"경고: 쿠팡 재고 스냅샷 기록 중 오류 발생: {e}")
+        return 0
+
+
+def adjust_demand(df_final, store):
+    """USE_ADJUSTED_DEMAND가 켜져 있으면 품절 보정 수요를 적용한 결과를 반환합니다."""
+    if not USE_ADJUSTED_DEMAND or store is None:
+        return df_final
+    rates = store.stockout_adjusted_rates()
+    adjusted = int((rates[COL_DEMAND_FACTOR] > 1).sum()) if not rates.empty else 0
+    print(f"품절 보정 수요 적용: {adjusted}개 옵션")
+    return apply_adjusted_demand(df_final, rates)
@@ -0,0 +1,103 @@
+"""
+쿠팡 품절/품절 임박 상품 빠른 조회
+
+60일 입고 시뮬레이션 없이 process_data() 결과만으로 벡터 연산하여
+즉시 품절(쿠팡재고 = 0)과 품절 임박(N일 안에 재고 소진 예상) 상품을 찾습니다.
+슬랙 알림을 먼저 보내고, 전체 입고 추천은 그 뒤에 계산하기 위해 사용합니다.
+
+입고 추천 결과를 기준으로 하는 기존 목록과 달리, 메인 창고 재고와 관계없이
+쿠팡 옵션코드가 등록된 상품을 모두 대상으로 합니다.
+(단, 메인 창고 재고도 없는 품절상품은 보낼 수 있는 재고가 없으므로 제외)
+"""
+
+import numpy as np
+import pandas as pd
+
+from recommender import (
+    COL_AVG_DAILY_SALES_COUPANG,
+    COL_COUPANG_OPTION_CODE,
+    COL_COUPANG_STOCK_DEPLETION_DAYS,
+    COL_DIRECT_SALES_30D_COUPANG,
+    COL_PRODUCT_NAME,
+    COL_SALES_30D_COUPANG,
+    COL_SKU,
+    COL_STOCK_COUPANG,
+    COL_STOCK_MAIN,
+)
+
+# 품절 임박 기준 (재고 소진 예상일)
+DEFAULT_HORIZON_DAYS = 7
+
+COL_STOCKOUT_TYPE = "품절구분"
+STOCKOUT_IMMEDIATE = "즉시"
+STOCKOUT_NEAR_TERM = "임박"
+
+RESULT_COLUMNS = [
+    COL_SKU,
+    COL_PRODUCT_NAME,
+    COL_STOCKOUT_TYPE,
+    COL_STOCK_COUPANG,
+    COL_AVG_DAILY_SALES_COUPANG,
+    COL_COUPANG_STOCK_DEPLETION_DAYS,
+]
+
+
+def _numeric(df, col):
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def find_stockouts(df_final, discontinued_skus=None, horizon_days=DEFAULT_HORIZON_DAYS):
+    """
+    즉시 품절 및 품절 임박 상품을 찾습니다.
+
+    :param df_final: process_data()가 반환한 DataFrame
+    :param horizon_days: 재고 소진 예상일이 이 값보다 작으면 품절 임박으로 분류
+    :return: RESULT_COLUMNS를 가진 DataFrame (즉시 품절 -> 소진 예상일 오름차순)
+    """
+    if df_final.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    coupang_stock = _numeric(df_final, COL_STOCK_COUPANG)
+    main_stock = _numeric(df_final, COL_STOCK_MAIN)
+    sales_col = (
+        COL_DIRECT_SALES_30D_COUPANG
+        if COL_DIRECT_SALES_30D_COUPANG in df_final.columns
+        else COL_SALES_30D_COUPANG
+    )
+    daily_sales = _numeric(df_final, sales_col) / 30
+
+    # 쿠팡 옵션코드(11자리)가 등록된 상품만 쿠팡 재고 대상
+    if COL_COUPANG_OPTION_CODE in df_final.columns:
+        code_str = df_final[COL_COUPANG_OPTION_CODE].astype(str).str.strip()
+        has_code = code_str.str.match(r"^\d{11}$").to_numpy(dtype=bool)
+    else:
+        has_code = np.ones(len(df_final), dtype=bool)
+
+    is_discontinued = df_final[COL_SKU].isin(discontinued_skus or []).to_numpy()
+    eligible = has_code & ~(is_discontinued & (main_stock <= 0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depletion_days = np.where(daily_sales > 0, coupang_stock / daily_sales, np.inf)
+
+    immediate = eligible & (coupang_stock <= 0)
+    near_term = eligible & ~immediate & (depletion_days < horizon_days)
+    selected = immediate | near_term
+
+    df_result = df_final.loc[selected, [COL_SKU, COL_PRODUCT_NAME]].copy()
+    df_result[COL_STOCKOUT_TYPE] = np.where(
+        immediate[selected], STOCKOUT_IMMEDIATE, STOCKOUT_NEAR_TERM
+    )
+    df_result[COL_STOCK_COUPANG] = coupang_stock[selected].astype(int)
+    df_result[COL_AVG_DAILY_SALES_COUPANG] = daily_sales[selected].round(1)
+    df_result[COL_COUPANG_STOCK_DEPLETION_DAYS] = np.where(
+        immediate[selected], 0, depletion_days[selected]
+    ).round(1)
+
+    df_result["_order"] = immediate[selected].astype(int)
+    df_result = df_result.sort_values(
+        by=["_order", COL_COUPANG_STOCK_DEPLETION_DAYS, COL_AVG_DAILY_SALES_COUPANG],
+        ascending=[False, True, False],
+    )
+    return df_result[RESULT_COLUMNS].reset_index(drop=True)
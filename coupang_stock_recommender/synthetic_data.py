@@ -0,0 +1,269 @@
+"""
+벤치마크/검증용 가상 데이터 생성기
+
+load_all_data()가 반환하는 것과 같은 형태의 입력을 시드 기반으로 만들어 냅니다.
+- '재고 시트': get_all_records() 형태 (옵션ID_이이엘, 구분값, 한국창고재고, 쿠팡로켓_옵션코드 ...)
+- '로켓그로스재고': 2줄 헤더를 가진 get_all_values() 형태
+- '매출시트': 3번째 행이 헤더이며, 날짜 형식이 섞여 있는 get_all_values() 형태
+- '세트구성품': 조합N_옵션 / 조합N_개수 컬럼이 옆으로 늘어선 get_all_records() 형태
+
+시트 원본 값을 data_loader의 build_* 함수에 그대로 통과시키므로, 실제 로딩 결과와 형태가 같습니다.
+"""
+
+import io
+import datetime
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from data_loader import build_bom_frame, build_rocket_frame, build_sales_frame
+
+# 생성 규칙 기본값
+DEFAULT_SET_RATIO = 0.1  # 전체 SKU 중 세트 상품 비율
+DEFAULT_MAX_COMPONENTS = 5  # 세트 하나의 최대 구성품 수 (조합1 ~ 조합5)
+DEFAULT_SALES_DAYS = 30  # 매출시트에 담기는 기간
+
+# 매출시트 날짜 형식 (실제 시트처럼 여러 형식이 섞여 있음)
+SALES_DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%Y.%m.%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S+09:00",
+]
+
+PRODUCT_WORDS = ["cup", "plate", "bowl", "tray", "mat", "towel", "pouch", "case"]
+COLOR_WORDS = ["red", "blue", "ivory", "black", "green", "pink", "gray", "beige"]
+
+
+def _format_qty(value, rng):
+    """시트처럼 가끔 천 단위 쉼표가 들어간 문자열로 만듭니다."""
+    if value >= 1000 and rng.random() < 0.5:
+        return f"{value:,}"
+    return str(value)
+
+
+def generate_sheet_values(n_skus, seed=0, set_ratio=DEFAULT_SET_RATIO, max_components=DEFAULT_MAX_COMPONENTS, today=None):
+    """
+    시트 원본 값(get_all_records / get_all_values 결과)을 생성합니다.
+
+    :return: dict (inventory_records, rocket_values, sales_values, bom_records, discontinued_skus, coupang_only_skus)
+    """
+    rng = np.random.default_rng(seed)
+    today = today or datetime.datetime.now()
+
+    n_sets = int(n_skus * set_ratio)
+    n_base = n_skus - n_sets
+
+    # --- SKU 및 속성 ---
+    groups = rng.integers(1, max(2, n_base // 8), size=n_base)
+    base_skus = [
+        f"{g}_{PRODUCT_WORDS[g % len(PRODUCT_WORDS)]}{g}_{COLOR_WORDS[i % len(COLOR_WORDS)]}{i}"
+        for i, g in enumerate(groups)
+    ]
+    # 제외 접두사(set_fhb_)가 붙은 세트도 일부 섞어 로딩 단계의 필터를 거치게 함
+    n_excluded_sets = n_sets // 50
+    set_skus = [
+        f"set_fhb_{i}" if i < n_excluded_sets else f"set_gift_{i}" for i in range(n_sets)
+    ]
+    all_skus = base_skus + set_skus
+
+    # 판매 속도는 롱테일 분포 (대부분 적게, 일부 많이 팔림)
+    daily_rate = rng.gamma(shape=0.6, scale=1.5, size=n_skus)
+    main_stock = rng.poisson(daily_rate * rng.uniform(5, 90, size=n_skus)).astype(int)
+    main_stock[n_base:] = 0  # 세트 상품은 구성품으로만 재고를 가짐
+    coupang_stock = rng.poisson(daily_rate * rng.uniform(0, 40, size=n_skus)).astype(int)
+    pending_inbound = np.where(rng.random(n_skus) < 0.1, rng.integers(1, 50, size=n_skus), 0)
+
+    option_codes = 10_000_000_000 + rng.choice(89_999_999_999, size=n_skus, replace=False)
+    has_code = rng.random(n_skus) > 0.05  # 5%는 쿠팡 옵션코드 미등록
+
+    # --- '재고 시트' ---
+    inventory_records = []
+    for i, sku in enumerate(all_skus):
+        inventory_records.append({
+            "옵션ID_이이엘": sku,
+            "구분값": f"상품 {sku}",
+            "상품명": f"(구) 상품 {sku}",
+            "한국창고재고": _format_qty(int(main_stock[i]), rng),
+            "최근발주 완료수량": int(rng.integers(0, 200)),
+            "배송중": int(rng.integers(0, 20)),
+            "쿠팡로켓_옵션코드": int(option_codes[i]) if has_code[i] else "",
+        })
+
+    # --- '로켓그로스재고(매번입력)' (2줄 헤더) ---
+    rocket_values = [
+        ["Option ID", "Option name", "Orderable quantity", "Pending inbounds", "Recent sales quantity", ""],
+        ["", "", "(real-time)", "(real-time)", "Last 7 days", "Last 30 days"],
+    ]
+    sales_30d_coupang = rng.poisson(daily_rate * 30)
+    sales_7d_coupang = rng.binomial(sales_30d_coupang, 7 / 30)
+    for i in range(n_skus):
+        if not has_code[i] or rng.random() < 0.1:
+            continue  # 쿠팡에 등록되지 않은 상품
+        rocket_values.append([
+            str(option_codes[i]),
+            f"option {all_skus[i]}",
+            str(int(coupang_stock[i])),
+            str(int(pending_inbound[i])),
+            str(int(sales_7d_coupang[i])),
+            str(int(sales_30d_coupang[i])),
+        ])
+    # 매핑되지 않는 Option ID도 일부 포함
+    for _ in range(max(1, n_skus // 100)):
+        rocket_values.append([str(int(rng.integers(10**10, 10**11))), "unknown", "3", "0", "1", "2"])
+
+    # --- '매출시트' (3번째 행이 헤더, 주문 1건 = 1행) ---
+    sales_values = [
+        ["자사몰/스토어 매출"],
+        [""],
+        ["주문번호", "옵션관리코드", "수량", "날짜", "판매처"],
+    ]
+    own_rate = daily_rate * rng.uniform(0.2, 1.5, size=n_skus)
+    order_counts = rng.poisson(own_rate * DEFAULT_SALES_DAYS / 1.3)
+    order_no = 0
+    for i, n_orders in enumerate(order_counts):
+        if n_orders == 0:
+            continue
+        days_ago = rng.uniform(0, DEFAULT_SALES_DAYS, size=n_orders)
+        quantities = 1 + rng.poisson(0.3, size=n_orders)
+        formats = rng.integers(0, len(SALES_DATE_FORMATS), size=n_orders)
+        for d, q, f in zip(days_ago, quantities, formats):
+            order_no += 1
+            ordered_at = today - datetime.timedelta(days=float(d))
+            sales_values.append([
+                f"ORD{order_no:09d}",
+                all_skus[i],
+                str(int(q)),
+                ordered_at.strftime(SALES_DATE_FORMATS[f]),
+                "스토어" if f % 2 else "자사몰",
+            ])
+
+    # --- '세트구성품' (조합N_옵션 / 조합N_개수) ---
+    bom_records = []
+    for set_sku in set_skus:
+        n_components = int(rng.integers(2, max_components + 1))
+        components = rng.choice(n_base, size=min(n_components, n_base), replace=False)
+        record = {"세트명": f"세트 {set_sku}", "옵션": "기본", "세트_ID": set_sku}
+        for k in range(1, max_components + 1):
+            if k <= len(components):
+                comp_sku = base_skus[components[k - 1]]
+                record[f"조합{k}_옵션"] = f"{comp_sku}/상품 {comp_sku}"
+                record[f"조합{k}_개수"] = int(rng.integers(1, 4))
+            else:
+                record[f"조합{k}_옵션"] = ""
+                record[f"조합{k}_개수"] = ""
+        bom_records.append(record)
+
+    # --- '품절상품', '쿠팡전용상품' ---
+    picks = rng.permutation(n_base)
+    discontinued_skus = [base_skus[i] for i in picks[: n_base // 40]]
+    coupang_only_skus = [base_skus[i] for i in picks[n_base // 40 : n_base // 40 + n_base // 30]]
+
+    return {
+        "inventory_records": inventory_records,
+        "rocket_values": rocket_values,
+        "sales_values": sales_values,
+        "bom_records": bom_records,
+        "discontinued_skus": discontinued_skus,
+        "coupang_only_skus": coupang_only_skus,
+    }
+
+
+def build_inputs(sheet_values, quiet=True):
+    """
+    generate_sheet_values() 결과를 load_all_data()와 같은 6개 객체 튜플로 변환합니다.
+    process_data가 입력을 직접 수정하므로 실행할 때마다 새로 만들어 사용합니다.
+    """
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        df_inventory = pd.DataFrame(sheet_values["inventory_records"])
+        df_rocket = build_rocket_frame(sheet_values["rocket_values"])
+        df_sales = build_sales_frame(sheet_values["sales_values"])
+        df_bom = build_bom_frame(sheet_values["bom_records"]) if sheet_values["bom_records"] else None
+
+    return (
+        df_inventory,
+        df_rocket,
+        df_sales,
+        df_bom,
+        list(sheet_values["discontinued_skus"]),
+        list(sheet_values["coupang_only_skus"]),
+    )
+
+
+def generate_inputs(n_skus, seed=0, **kwargs):
+    """load_all_data()와 같은 형태의 가상 입력을 바로 생성합니다."""
+    return build_inputs(generate_sheet_values(n_skus, seed=seed, **kwargs))
+
+
+def generate_history(n_skus, days=365, seed=0, set_ratio=DEFAULT_SET_RATIO, max_components=DEFAULT_MAX_COMPONENTS, start=None):
+    """
+    백테스트용 일별 판매/입고 기록을 생성합니다. (backtest.load_history()와 같은 형태)
+
+    :return: (df_history, bom_parsed, discontinued_skus, coupang_only_skus)
+        df_history: 날짜 x SKU 한 행, 첫 날짜에만 재고 컬럼(메인창고_재고, 쿠팡재고)이 채워짐
+        bom_parsed: parse_bom() 결과와 같은 형태 (세트_ID, 구성품_sku, 구성품_개수)
+    """
+    rng = np.random.default_rng(seed)
+    start = start or (datetime.date.today() - datetime.timedelta(days=days))
+    dates = pd.date_range(start, periods=days, freq="D")
+
+    n_sets = int(n_skus * set_ratio)
+    n_base = n_skus - n_sets
+    base_skus = [
+        f"{i // 8 + 1}_{PRODUCT_WORDS[i % len(PRODUCT_WORDS)]}_{COLOR_WORDS[i % len(COLOR_WORDS)]}{i}"
+        for i in range(n_base)
+    ]
+    set_skus = [f"set_gift_{i}" for i in range(n_sets)]
+    skus = base_skus + set_skus
+
+    # 판매 속도(롱테일) x 계절성(연 주기) x 요일 효과
+    daily_rate = rng.gamma(shape=0.6, scale=1.5, size=n_skus)
+    own_ratio = rng.uniform(0.2, 1.5, size=n_skus)
+    day_index = np.arange(days)
+    season = 1 + 0.3 * np.sin(2 * np.pi * (day_index / 365 + rng.uniform(0, 1, size=(n_skus, 1))))
+    weekday = np.where(dates.dayofweek >= 5, 1.2, 0.95)
+    expected = daily_rate[:, None] * season * weekday
+    coupang_sales = rng.poisson(expected)
+    own_sales = rng.poisson(expected * own_ratio[:, None])
+
+    # 메인 창고 입고: 단품만 약 30일마다 60일치 입고
+    receipts = np.zeros((n_skus, days), dtype=int)
+    cycle = rng.integers(20, 40, size=n_base)
+    offset = rng.integers(0, 40, size=n_base)
+    restock = (day_index[None, :] >= offset[:, None]) & ((day_index[None, :] - offset[:, None]) % cycle[:, None] == 0)
+    receipts[:n_base] = np.where(restock, rng.poisson(daily_rate[:n_base, None] * (1 + own_ratio[:n_base, None]) * 60), 0)
+
+    main_stock = rng.poisson(daily_rate * rng.uniform(10, 90, size=n_skus)).astype(int)
+    main_stock[n_base:] = 0  # 세트 상품은 구성품으로만 재고를 가짐
+    coupang_stock = rng.poisson(daily_rate * rng.uniform(0, 40, size=n_skus)).astype(int)
+    has_code = rng.random(n_skus) > 0.05
+
+    df_history = pd.DataFrame({
+        "날짜": np.tile(dates, n_skus),
+        "sku": pd.Categorical(np.repeat(skus, days), categories=skus),
+        "쿠팡_판매량": coupang_sales.ravel(),
+        "자사몰_판매량": own_sales.ravel(),
+        "메인창고_입고량": receipts.ravel(),
+    })
+    first_day = df_history["날짜"] == dates[0]
+    df_history["메인창고_재고"] = np.nan
+    df_history["쿠팡재고"] = np.nan
+    df_history.loc[first_day, "메인창고_재고"] = main_stock
+    df_history.loc[first_day, "쿠팡재고"] = coupang_stock
+    option_codes = np.where(has_code, (10_000_000_000 + np.arange(n_skus)).astype(str), "")
+    df_history["쿠팡로켓_옵션코드"] = np.repeat(option_codes, days)
+
+    bom_rows = []
+    for set_sku in set_skus:
+        n_components = int(rng.integers(2, max_components + 1))
+        for comp in rng.choice(n_base, size=min(n_components, n_base), replace=False):
+            bom_rows.append((set_sku, base_skus[comp], int(rng.integers(1, 4))))
+    bom_parsed = pd.DataFrame(bom_rows, columns=["세트_ID", "구성품_sku", "구성품_개수"])
+
+    picks = rng.permutation(n_base)
+    discontinued_skus = [base_skus[i] for i in picks[: n_base // 40]]
+    coupang_only_skus = [base_skus[i] for i in picks[n_base // 40 : n_base // 40 + n_base // 30]]
+    return df_history, bom_parsed, discontinued_skus, coupang_only_skus
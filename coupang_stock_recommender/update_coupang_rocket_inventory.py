@@ -2,9 +2,10 @@
 
 import os
 import time
+import numpy as np
 import pandas as pd
-import gspread
 from gspread_dataframe import set_with_dataframe
+from openpyxl import load_workbook
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
@@ -15,6 +16,14 @@ from webdriver_manager.chrome import ChromeDriverManager
 import subprocess
 import re
 import glob
+import sys
+
+# 로컬 모듈을 찾을 수 있도록 스크립트 디렉토리를 Python 경로에 추가합니다.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import build_rocket_headers
+from google_client import open_spreadsheet
+from snapshot_store import get_default_store, snapshot_from_inventory_excel
 
 # --- 설정 ---
 COUPANG_LOGIN_URL = "https://wing.coupang.com/"
@@ -31,6 +40,17 @@ DOWNLOAD_DIR = os.path.join(
     "coupang_stock_recommender", "downloads"  # 특정 다운로드 폴더 사용
 )
 
+# 재고 현황 엑셀에서 업로드할 컬럼 (data_processor에서 실제로 사용하는 컬럼만 유지)
+# 엑셀은 2줄 헤더이며, 두 줄을 합친 이름 기준입니다.
+INVENTORY_HEADER_ROWS = 2
+INVENTORY_COLUMNS_TO_KEEP = [
+    "Option ID",
+    "Orderable quantity (real-time)",
+    "Pending inbounds (real-time)",
+    "Recent sales quantity Last 7 days",
+    "Recent sales quantity Last 30 days",
+]
+
 
 def get_coupang_credentials():
     """쿠팡 접속 정보를 반환합니다."""
@@ -210,18 +230,95 @@ def download_latest_inventory_file(driver, username, password):
     return downloaded_file_path
 
 
+def read_inventory_excel(file_path, columns_to_keep=INVENTORY_COLUMNS_TO_KEEP):
+    """
+    재고 현황 엑셀을 read-only 모드로 한 줄씩 읽어 필요한 컬럼만 DataFrame으로 반환합니다.
+    워크북 전체를 메모리에 올리지 않고, 미리 할당한 컬럼 배열에 값을 채워 넣습니다.
+
+    반환되는 DataFrame은 기존 pd.read_excel 결과와 같은 배치를 유지합니다.
+    (컬럼명 = 엑셀 첫 번째 헤더 행, 첫 번째 데이터 행 = 두 번째 헤더 행)
+    따라서 시트에 업로드한 뒤 data_loader의 2줄 헤더 처리를 그대로 사용할 수 있습니다.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+
+        header_rows = [
+            ["" if v is None else str(v).strip() for v in next(rows, ())]
+            for _ in range(INVENTORY_HEADER_ROWS)
+        ]
+        width = max(len(h) for h in header_rows)
+        header_rows = [h + [""] * (width - len(h)) for h in header_rows]
+        merged_headers = build_rocket_headers(header_rows[0], header_rows[1])
+
+        # 유지할 컬럼의 위치 찾기
+        keep_indices = []
+        for col_name in columns_to_keep:
+            if col_name in merged_headers:
+                keep_indices.append(merged_headers.index(col_name))
+            else:
+                print(f"경고: 재고 현황 파일에 '{col_name}' 컬럼이 없습니다.")
+        if not keep_indices:
+            raise ValueError("재고 현황 파일에서 필요한 컬럼을 찾을 수 없습니다.")
+
+        # 행 수만큼 컬럼 배열을 미리 할당 (read-only 모드에서 행 수를 모르면 늘려가며 사용)
+        capacity = max((worksheet.max_row or 0) - INVENTORY_HEADER_ROWS, 0) + 1
+        columns = [np.empty(capacity, dtype=object) for _ in keep_indices]
+        columns_width = len(keep_indices)
+
+        # 두 번째 헤더 행을 첫 데이터 행으로 넣어 기존 시트 배치를 유지
+        for j, idx in enumerate(keep_indices):
+            columns[j][0] = header_rows[1][idx]
+        n_rows = 1
+
+        for row in rows:
+            values = [row[idx] if idx < len(row) else None for idx in keep_indices]
+            if all(v is None or v == "" for v in values):
+                continue  # 서식만 남은 빈 행은 건너뜀
+            if n_rows == capacity:
+                capacity *= 2
+                columns = [np.resize(col, capacity) for col in columns]
+            for j in range(columns_width):
+                columns[j][n_rows] = values[j]
+            n_rows += 1
+    finally:
+        workbook.close()
+
+    # 병합 셀로 비어 있는 첫 줄 헤더는 왼쪽 값으로 채워, 일부 컬럼만 남겨도 이름이 유지되게 함
+    level1_filled = []
+    for h1 in header_rows[0]:
+        level1_filled.append(h1 or (level1_filled[-1] if level1_filled else ""))
+
+    df = pd.DataFrame({j: columns[j][:n_rows] for j in range(columns_width)})
+    df.columns = [level1_filled[idx] for idx in keep_indices]
+    return df
+
+
+def record_inventory_snapshot(df_excel):
+    """다운로드한 재고 현황을 날짜별 스냅샷 기록에 추가합니다. (실패해도 업로드는 계속)"""
+    store = get_default_store()
+    if store is None:
+        return
+    try:
+        count = store.append(snapshot_from_inventory_excel(df_excel))
+        print(f"📊 재고 스냅샷 기록 완료: {count}개 옵션")
+    except Exception as e:
+        print(f"⚠️ 재고 스냅샷 기록 중 오류 발생: {e}")
+
+
 def upload_to_google_sheet(file_path):
     """
     Excel 파일을 읽어 특정 Google Sheet 워크시트에 내용을 업로드합니다.
     """
     print(f"\n📁 '{os.path.basename(file_path)}' 파일을 Google Sheet에 업로드 중...")
     try:
-        gc = gspread.service_account(filename=GSPREAD_CREDS_PATH)
-        spreadsheet = gc.open(GOOGLE_SHEET_NAME)
+        spreadsheet = open_spreadsheet(GOOGLE_SHEET_NAME, GSPREAD_CREDS_PATH)
         worksheet = spreadsheet.worksheet(TARGET_WORKSHEET_NAME)
 
-        # 1. 엑셀 파일 읽기
-        df_excel = pd.read_excel(file_path)
+        # 1. 엑셀 파일 읽기 (필요한 컬럼만 스트리밍으로 읽음)
+        df_excel = read_inventory_excel(file_path)
+        record_inventory_snapshot(df_excel)
 
         # 2. 기존 시트 내용 삭제 (첫 행 헤더는 남겨두기)
         # worksheet.clear() # clear()는 모든 내용을 삭제하므로 사용하지 않습니다.
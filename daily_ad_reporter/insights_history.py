@@ -0,0 +1,146 @@
+"""
+광고 성과 기록 저장소 (로컬 parquet)
+
+매일 조회한 성과(action_type별 actions / action_values 포함)를 날짜/계정 단위 파티션으로 저장합니다.
+
+    <저장 경로>/date=2024-05-01/<계정 ID>.parquet
+
+같은 날짜/계정을 다시 저장하면 파일을 통째로 교체하므로 여러 번 실행해도 중복되지 않습니다.
+조회했지만 성과가 없던 날짜는 빈 표시 파일(<계정 ID>.empty)로 남겨 다시 조회하지 않습니다.
+추세/이동평균/이상치 계산은 이 기록만으로 하고, API는 매일 하루치만 조회합니다.
+"""
+
+import os
+import datetime
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_HISTORY_DIR = os.environ.get(
+    "INSIGHTS_HISTORY_DIR", os.path.join(script_dir, ".history")
+)
+
+PARTITION_PREFIX = "date="
+# 조회했지만 성과가 없던 날짜/계정 표시 파일
+EMPTY_MARKER_SUFFIX = ".empty"
+ACTION_PREFIXES = ("actions.", "action_values.")
+
+
+def _to_date_str(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+class InsightsHistory:
+    """날짜/계정별 광고 성과를 parquet 파일로 보관합니다."""
+
+    def __init__(self, path=DEFAULT_HISTORY_DIR):
+        self.path = path
+
+    def _partition_dir(self, date):
+        return os.path.join(self.path, f"{PARTITION_PREFIX}{_to_date_str(date)}")
+
+    def append(self, df):
+        """
+        성과 데이터를 날짜/계정별로 나누어 저장합니다. (기존 파티션은 교체)
+
+        :param df: date, account_id 컬럼을 가진 DataFrame
+        :return: 저장한 파티션 수
+        """
+        if df.empty:
+            return 0
+
+        written = 0
+        for (date, account_id), group in df.groupby(["date", "account_id"], sort=False):
+            directory = self._partition_dir(date)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{account_id}.parquet")
+            tmp_path = f"{path}.tmp"
+            # 기록되지 않은 action_type 컬럼은 저장하지 않음
+            group = group.dropna(axis=1, how="all")
+            group.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            marker = os.path.join(directory, f"{account_id}{EMPTY_MARKER_SUFFIX}")
+            if os.path.exists(marker):
+                os.remove(marker)
+            written += 1
+        return written
+
+    def mark_empty(self, account_id, dates):
+        """
+        조회했지만 성과가 없던 날짜를 기록된 것으로 표시합니다. (load에는 포함되지 않음)
+
+        :param dates: datetime.date 목록
+        :return: 표시한 날짜 수
+        """
+        marked = 0
+        for date in dates:
+            directory = self._partition_dir(date)
+            if os.path.exists(os.path.join(directory, f"{account_id}.parquet")):
+                continue
+            os.makedirs(directory, exist_ok=True)
+            open(os.path.join(directory, f"{account_id}{EMPTY_MARKER_SUFFIX}"), "w").close()
+            marked += 1
+        return marked
+
+    def stored_dates(self, account_id):
+        """해당 계정의 기록이 있는 (성과가 없던 날 포함) 날짜 목록 (YYYY-MM-DD, 오름차순)"""
+        if not os.path.isdir(self.path):
+            return []
+        dates = []
+        for name in os.listdir(self.path):
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            directory = os.path.join(self.path, name)
+            if os.path.exists(os.path.join(directory, f"{account_id}.parquet")) or os.path.exists(
+                os.path.join(directory, f"{account_id}{EMPTY_MARKER_SUFFIX}")
+            ):
+                dates.append(name[len(PARTITION_PREFIX):])
+        return sorted(dates)
+
+    def missing_dates(self, account_id, start, end):
+        """start ~ end(포함) 중 기록이 없는 날짜 목록"""
+        stored = set(self.stored_dates(account_id))
+        days = (end - start).days + 1
+        return [
+            start + datetime.timedelta(days=i)
+            for i in range(days)
+            if _to_date_str(start + datetime.timedelta(days=i)) not in stored
+        ]
+
+    def load(self, start=None, end=None, account_ids=None):
+        """
+        기간/계정에 해당하는 파티션만 읽어 하나의 DataFrame으로 반환합니다.
+
+        :param start, end: datetime.date (포함), None이면 제한 없음
+        :param account_ids: 읽을 계정 ID 목록, None이면 전체
+        """
+        if not os.path.isdir(self.path):
+            return pd.DataFrame()
+
+        start_str = _to_date_str(start) if start else None
+        end_str = _to_date_str(end) if end else None
+        frames = []
+        for name in sorted(os.listdir(self.path)):
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            date_str = name[len(PARTITION_PREFIX):]
+            if (start_str and date_str < start_str) or (end_str and date_str > end_str):
+                continue
+            directory = os.path.join(self.path, name)
+            for file_name in sorted(os.listdir(directory)):
+                if not file_name.endswith(".parquet"):
+                    continue
+                if account_ids is not None and file_name[: -len(".parquet")] not in account_ids:
+                    continue
+                frames.append(pd.read_parquet(os.path.join(directory, file_name)))
+
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        # 날짜마다 기록된 action_type이 다르므로 빠진 값은 0으로 채움
+        action_cols = [c for c in df.columns if c.startswith(ACTION_PREFIXES)]
+        df[action_cols] = df[action_cols].fillna(0.0)
+        return df
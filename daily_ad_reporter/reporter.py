@@ -1,74 +1,548 @@
 import os
-import json
-import requests
+import sys
+import time
+import argparse
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
+
+# 재고 추천 봇과 함께 쓰는 공용 모듈 (슬랙 알림)
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common")
+)
+
+# pandas/numpy, facebook_business, 슬랙 모듈은 시작 시간을 줄이기 위해 사용하는 함수에서 불러옵니다.
+# (토큰/계정 설정이 없으면 무거운 모듈을 불러오지 않고 바로 끝납니다)
+# 시작 시간 확인: python common/import_report.py daily_ad_reporter/reporter.py
 
 load_dotenv()
 
 # 환경 변수 로드
 ACCESS_TOKEN = os.getenv("FB_ACCESS_TOKEN")
-AD_ACCOUNT_ID = f"act_{os.getenv('FB_AD_ACCOUNT_ID')}"
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_AD")
 
+# 광고 계정 목록 (쉼표로 구분, 없으면 FB_AD_ACCOUNT_ID 하나만 사용)
+AD_ACCOUNT_IDS = [
+    account_id.strip()
+    for account_id in (os.getenv("FB_AD_ACCOUNT_IDS") or os.getenv("FB_AD_ACCOUNT_ID") or "").split(",")
+    if account_id.strip()
+]
+# 동시에 조회할 최대 계정 수
+MAX_WORKERS = int(os.getenv("FB_MAX_WORKERS", "4"))
+
+# 조회 단위 (account / campaign / adset / ad)와 기간
+REPORT_LEVEL = os.getenv("FB_REPORT_LEVEL", "campaign")
+DATE_PRESET = os.getenv("FB_DATE_PRESET", "yesterday")
+# 상위/하위 성과 항목 수
+TOP_N = int(os.getenv("FB_TOP_N", "3"))
+
+# 비동기 리포트 작업 대기 설정
+POLL_INITIAL_SECONDS = 1.0
+POLL_MAX_SECONDS = 10.0
+JOB_TIMEOUT_SECONDS = int(os.getenv("FB_REPORT_TIMEOUT", "600"))
+PAGE_SIZE = 500
+
+LEVEL_NAME_FIELDS = {
+    "account": "account_name",
+    "campaign": "campaign_name",
+    "adset": "adset_name",
+    "ad": "ad_name",
+}
+# 항목 구분은 ID로 하고, 이름은 표시용으로만 사용 (이름이 바뀌거나 겹쳐도 따로 집계)
+LEVEL_ID_FIELDS = {
+    "account": "account_id",
+    "campaign": "campaign_id",
+    "adset": "adset_id",
+    "ad": "ad_id",
+}
+LEVEL_LABELS = {"account": "계정", "campaign": "캠페인", "adset": "광고 세트", "ad": "광고"}
+
+METRIC_COLUMNS = ["spend", "clicks", "purchases", "purchase_value"]
+
+# 성과 기록 저장 (추세/이상치 계산용, INSIGHTS_HISTORY=0이면 사용 안 함)
+HISTORY_ENABLED = os.getenv("INSIGHTS_HISTORY", "1") == "1"
+# 추세/이상치 계산에 사용할 과거 기록 기간
+TREND_WINDOW_DAYS = 28
+MOVING_AVERAGE_DAYS = 7
+# 과거 평균에서 표준편차의 몇 배 이상 벗어나면 이상치로 표시
+ANOMALY_Z_SCORE = 2.0
+# 이상치 판단에 필요한 최소 기록 일수
+MIN_ANOMALY_HISTORY_DAYS = 7
+
+
+def _to_account_id(account_id):
+    return account_id if account_id.startswith("act_") else f"act_{account_id}"
+
+
+def _actions_by_type(items, prefix):
+    """[{action_type, value}, ...] -> {"<prefix>.<action_type>": value}"""
+    return {f"{prefix}.{item['action_type']}": float(item["value"]) for item in items or []}
+
+
+def wait_for_job(job, timeout=JOB_TIMEOUT_SECONDS):
+    """비동기 리포트 작업이 끝날 때까지 점점 간격을 늘려가며 상태를 확인합니다."""
+    from facebook_business.adobjects.adreportrun import AdReportRun
+
+    started = time.monotonic()
+    interval = POLL_INITIAL_SECONDS
+    while True:
+        job = job.api_get(
+            fields=[AdReportRun.Field.async_status, AdReportRun.Field.async_percent_completion]
+        )
+        status = job[AdReportRun.Field.async_status]
+        if status == "Job Completed":
+            return job
+        if status in ("Job Failed", "Job Skipped"):
+            raise RuntimeError(f"리포트 작업 실패 ({status})")
+        if time.monotonic() - started > timeout:
+            raise TimeoutError(
+                f"리포트 작업 대기 시간 초과 ({job[AdReportRun.Field.async_percent_completion]}%)"
+            )
+        time.sleep(interval)
+        interval = min(POLL_MAX_SECONDS, interval * 1.5)
+
+
+def stream_rows_to_frame(rows, level=REPORT_LEVEL):
+    """
+    페이지 단위로 넘어오는 인사이트 행을 컬럼별 리스트에 쌓아 DataFrame으로 만듭니다.
+    (rows는 다음 페이지를 필요할 때 불러오는 Cursor)
+    """
+    import pandas as pd
+
+    name_field = LEVEL_NAME_FIELDS[level]
+    id_field = LEVEL_ID_FIELDS[level]
+    columns = {"date": [], "account_name": [], "id": [], "name": [], "spend": [], "clicks": []}
+    actions = []
+    for row in rows:
+        columns["date"].append(row.get("date_start"))
+        columns["account_name"].append(row.get("account_name"))
+        columns["id"].append(row.get(id_field))
+        columns["name"].append(row.get(name_field))
+        columns["spend"].append(row.get("spend", 0))
+        columns["clicks"].append(row.get("clicks", 0))
+        # action_type별 전환 수 / 전환 가치 (기록 저장용으로 모두 보관)
+        actions.append({
+            **_actions_by_type(row.get("actions"), "actions"),
+            **_actions_by_type(row.get("action_values"), "action_values"),
+        })
+
+    df = pd.DataFrame(columns)
+    for col in ["spend", "clicks"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+    df_actions = pd.DataFrame(actions, index=df.index).fillna(0.0)
+
+    # 구매 데이터 추출
+    df["purchases"] = df_actions.get("actions.purchase", 0.0)
+    df["purchase_value"] = df_actions.get("action_values.purchase", 0.0)
+    return pd.concat([df, df_actions], axis=1)
+
+
+def add_metrics(df):
+    """CPC, CPP(구매당 비용), ROAS를 행 단위로 계산합니다."""
+    import numpy as np
+
+    df = df.copy()
+    spend = df["spend"].to_numpy(dtype=float)
+    clicks = df["clicks"].to_numpy(dtype=float)
+    purchases = df["purchases"].to_numpy(dtype=float)
+    value = df["purchase_value"].to_numpy(dtype=float)
+    df["cpc"] = np.divide(spend, clicks, out=np.zeros_like(spend), where=clicks > 0)
+    df["cpp"] = np.divide(spend, purchases, out=np.zeros_like(spend), where=purchases > 0)
+    df["roas"] = np.divide(value * 100, spend, out=np.zeros_like(spend), where=spend > 0)
+    return df
+
+
+def fetch_account_insights(account_id, level=REPORT_LEVEL, date_preset=DATE_PRESET, time_range=None):
+    """
+    광고 계정 하나의 성과를 비동기 리포트 작업으로 조회합니다. (하루 단위 행)
+
+    :param time_range: {"since": "YYYY-MM-DD", "until": "YYYY-MM-DD"}, 지정하면 date_preset 대신 사용
+    """
+    from facebook_business.adobjects.adaccount import AdAccount
+
+    account = AdAccount(_to_account_id(account_id))
+    fields = ["account_name", "spend", "clicks", "actions", "action_values", LEVEL_ID_FIELDS[level]]
+    if level != "account":
+        fields.append(LEVEL_NAME_FIELDS[level])
+
+    params = {"level": level, "time_increment": 1}
+    if time_range:
+        params["time_range"] = time_range
+    else:
+        params["date_preset"] = date_preset
+    job = account.get_insights(
+        params=params,
+        fields=fields,
+        is_async=True,
+    )
+    job = wait_for_job(job)
+    df = stream_rows_to_frame(job.get_result(params={"limit": PAGE_SIZE}), level)
+    df["account_id"] = account_id
+    return df
+
+
+def collect_insights(account_ids, max_workers=MAX_WORKERS, time_ranges=None):
+    """
+    여러 광고 계정의 성과를 동시에 조회합니다.
+
+    :param time_ranges: dict (계정 ID -> time_range), 없는 계정은 DATE_PRESET 기간으로 조회
+    :return: dict (계정 ID -> DataFrame / Exception(조회 실패)), 입력 순서 유지
+    """
+    time_ranges = time_ranges or {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(account_ids)))) as executor:
+        futures = {
+            account_id: executor.submit(
+                fetch_account_insights, account_id, time_range=time_ranges.get(account_id)
+            )
+            for account_id in account_ids
+        }
+        for account_id, future in futures.items():
+            try:
+                results[account_id] = future.result()
+            except Exception as e:
+                print(f"[{account_id}] 광고 데이터 조회 실패: {e}")
+                results[account_id] = e
+    return results
+
+
+def format_metrics(row):
+    return (
+        f"💰 *총 지출:* {int(row['spend']):,}원\n"
+        f"🛒 *총 구매:* {int(row['purchases'])}건\n"
+        f"🎯 *구매당 비용 (CPP):* {int(row['cpp']):,}원\n"
+        f"🖱️ *평균 CPC:* {int(row['cpc']):,}원\n"
+        f"📈 *구매 ROAS:* {int(row['roas']):,}%"
+    )
+
+
+def format_performers(df, level=REPORT_LEVEL, top_n=TOP_N):
+    """지출이 있는 항목 중 ROAS 상위/하위 항목을 정리합니다."""
+    ranked = df[df["spend"] > 0].sort_values(["roas", "spend"], ascending=[False, False])
+    if ranked.empty or top_n <= 0:
+        return ""
+
+    label = LEVEL_LABELS[level]
+    multi_account = df["account_id"].nunique() > 1
+
+    def line(row):
+        owner = f" ({row['account_name']})" if multi_account else ""
+        return (
+            f"• {row['name']}{owner} — ROAS {int(row['roas']):,}% / "
+            f"지출 {int(row['spend']):,}원 / 구매 {int(row['purchases'])}건"
+        )
+
+    text = f"\n\n🏆 *{label} 성과 상위 {min(top_n, len(ranked))}개 (ROAS)*\n"
+    text += "\n".join(line(row) for _, row in ranked.head(top_n).iterrows())
+    bottom = ranked.iloc[top_n:].tail(top_n).iloc[::-1]
+    if not bottom.empty:
+        text += f"\n\n🔻 *{label} 성과 하위 {len(bottom)}개 (ROAS)*\n"
+        text += "\n".join(line(row) for _, row in bottom.iterrows())
+    return text
+
+
+# 추세 섹션에 표시할 지표 (컬럼, 이름, 단위)
+TREND_METRICS = [
+    ("spend", "지출", "원"),
+    ("purchases", "구매", "건"),
+    ("cpp", "CPP", "원"),
+    ("roas", "ROAS", "%"),
+]
+
+
+def daily_totals(history_df):
+    """기록을 날짜별 합계로 묶습니다. (기록이 없는 날짜는 NaN)"""
+    import pandas as pd
+
+    totals = history_df.groupby("date")[METRIC_COLUMNS].sum()
+    totals.index = pd.to_datetime(totals.index)
+    return totals.asfreq("D")
+
+
+def _window_metrics(totals, start, end):
+    """기간 합계로 계산한 지표 (지출/구매는 일평균). 기록이 빠진 날이 있으면 None"""
+    window = totals.loc[start:end]
+    if len(window) < (end - start).days + 1 or window["spend"].isna().any():
+        return None
+    row = add_metrics(window.sum().to_frame().T).iloc[0]
+    row[["spend", "purchases"]] /= len(window)
+    return row
+
+
+def _pct_change(current, previous):
+    if not previous:
+        return "-"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def format_trends(history_df, report_date):
+    """
+    저장된 기록으로 전주 대비, 7일 평균, 이상치 섹션을 만듭니다.
+
+    :param history_df: report_date를 포함한 최근 기록 (InsightsHistory.load 결과)
+    :param report_date: datetime.date
+    """
+    import numpy as np
+    import pandas as pd
+
+    if history_df.empty:
+        return ""
+    totals = daily_totals(history_df)
+    day = pd.Timestamp(report_date)
+    if day not in totals.index:
+        return ""
+
+    recorded = totals["spend"].notna()
+    daily = add_metrics(totals.fillna(0.0))
+    daily.loc[~recorded, :] = np.nan
+    today = daily.loc[day]
+
+    week_ago = day - pd.Timedelta(days=7)
+    last_week = daily.loc[week_ago] if week_ago in daily.index and recorded[week_ago] else None
+    span = pd.Timedelta(days=MOVING_AVERAGE_DAYS - 1)
+    current_ma = _window_metrics(totals, day - span, day)
+    previous_end = day - pd.Timedelta(days=MOVING_AVERAGE_DAYS)
+    previous_ma = _window_metrics(totals, previous_end - span, previous_end)
+
+    lines = []
+    for col, label, unit in TREND_METRICS:
+        parts = []
+        if last_week is not None:
+            parts.append(f"전주 같은 요일 대비 {_pct_change(today[col], last_week[col])}")
+        if current_ma is not None:
+            ma_text = f"{MOVING_AVERAGE_DAYS}일 평균 {int(current_ma[col]):,}{unit}"
+            if previous_ma is not None:
+                ma_text += f" (직전 {MOVING_AVERAGE_DAYS}일 대비 {_pct_change(current_ma[col], previous_ma[col])})"
+            parts.append(ma_text)
+        if parts:
+            lines.append(f"• {label} {int(today[col]):,}{unit}: " + " / ".join(parts))
+
+    text = ""
+    if lines:
+        text += "\n\n📊 *추세*\n" + "\n".join(lines)
+
+    # 이상치: 최근 기록의 평균에서 크게 벗어난 지표
+    cols = [col for col, _, _ in TREND_METRICS]
+    baseline_start = day - pd.Timedelta(days=TREND_WINDOW_DAYS)
+    baseline = daily.loc[baseline_start : day - pd.Timedelta(days=1), cols].dropna()
+    if len(baseline) >= MIN_ANOMALY_HISTORY_DAYS:
+        mean = baseline.mean()
+        std = baseline.std().replace(0, np.nan)
+        z_scores = ((today[cols] - mean) / std).dropna()
+        anomalies = z_scores[z_scores.abs() >= ANOMALY_Z_SCORE]
+        if not anomalies.empty:
+            labels = {col: (label, unit) for col, label, unit in TREND_METRICS}
+            anomaly_lines = []
+            for col, z in anomalies.items():
+                label, unit = labels[col]
+                direction = "높음" if z > 0 else "낮음"
+                anomaly_lines.append(
+                    f"• {label} {int(today[col]):,}{unit}: 최근 {len(baseline)}일 평균 "
+                    f"{int(mean[col]):,}{unit}보다 {direction} (z={z:+.1f})"
+                )
+            text += "\n\n⚠️ *이상치*\n" + "\n".join(anomaly_lines)
+    return text
+
+
+def save_history(history, df):
+    """조회한 성과를 기록 저장소에 추가합니다. (실패해도 리포트는 계속 진행)"""
+    try:
+        saved = history.append(df)
+        print(f"[기록] {saved}개 날짜/계정 기록을 저장했습니다.")
+    except Exception as e:
+        print(f"[기록] 성과 기록 저장 실패: {e}")
+
+
+def init_api():
+    """페이스북 API를 초기화합니다. (facebook_business는 조회할 때 불러옵니다)"""
+    from facebook_business.api import FacebookAdsApi
 
-def get_report():
     FacebookAdsApi.init(access_token=ACCESS_TOKEN)
-    account = AdAccount(AD_ACCOUNT_ID)
 
-    # 어제 데이터 조회
-    fields = ["spend", "clicks", "actions", "action_values"]
-    insights = account.get_insights(params={"date_preset": "yesterday"}, fields=fields)
 
-    if not insights:
+def missing_settings():
+    """광고 조회에 필요한 설정 중 빠진 것을 알리는 메시지를 반환합니다. (모두 있으면 None)"""
+    if not ACCESS_TOKEN:
+        return "⚠️ 페이스북 액세스 토큰(FB_ACCESS_TOKEN)이 설정되지 않았습니다."
+    if not AD_ACCOUNT_IDS:
+        return "⚠️ 광고 계정(FB_AD_ACCOUNT_IDS)이 설정되지 않았습니다."
+    return None
+
+
+def _date_runs(dates):
+    """오름차순 날짜 목록을 연속된 구간 [(시작, 끝), ...]으로 나눕니다."""
+    runs = []
+    for date in dates:
+        if runs and date - runs[-1][1] == datetime.timedelta(1):
+            runs[-1][1] = date
+        else:
+            runs.append([date, date])
+    return [tuple(run) for run in runs]
+
+
+def backfill_history(days, history=None):
+    """
+    최근 N일 중 기록이 없는 날짜를 계정/연속 구간별 리포트 작업으로 채웁니다.
+
+    어제는 이어서 실행하는 리포트(get_report)가 조회하여 저장하므로 그제까지만 채우고,
+    조회했지만 성과가 없던 날짜는 표시해 두어 다음 실행에서 다시 조회하지 않습니다.
+    """
+    missing = missing_settings()
+    if missing:
+        print(f"[기록] 기록 채우기를 건너뜁니다: {missing}")
+        return
+
+    import pandas as pd
+    from insights_history import InsightsHistory
+
+    history = history or InsightsHistory()
+    end = datetime.date.today() - datetime.timedelta(2)
+    start = end - datetime.timedelta(days - 1)
+
+    jobs = [
+        (account_id, run_start, run_end)
+        for account_id in AD_ACCOUNT_IDS
+        for run_start, run_end in _date_runs(history.missing_dates(account_id, start, end))
+    ]
+    if not jobs:
+        print("[기록] 채울 기록이 없습니다.")
+        return
+
+    init_api()
+    frames = []
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(jobs)))) as executor:
+        futures = {
+            job: executor.submit(
+                fetch_account_insights,
+                job[0],
+                time_range={"since": str(job[1]), "until": str(job[2])},
+            )
+            for job in jobs
+        }
+        for (account_id, run_start, run_end), future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"[{account_id}] {run_start} ~ {run_end} 광고 데이터 조회 실패: {e}")
+                continue
+            frames.append(df)
+            # 조회에 성공했지만 행이 없는 날짜는 성과 없음으로 표시
+            fetched = set(df["date"].astype(str).str[:10])
+            empty_days = [
+                run_start + datetime.timedelta(i)
+                for i in range((run_end - run_start).days + 1)
+                if str(run_start + datetime.timedelta(i)) not in fetched
+            ]
+            if empty_days:
+                history.mark_empty(account_id, empty_days)
+
+    frames = [df for df in frames if not df.empty]
+    if frames:
+        save_history(history, pd.concat(frames, ignore_index=True))
+
+
+def get_report():
+    missing = missing_settings()
+    if missing:
+        return missing
+
+    import pandas as pd
+    from insights_history import InsightsHistory
+
+    init_api()
+    results = collect_insights(AD_ACCOUNT_IDS)
+
+    frames = [r for r in results.values() if isinstance(r, pd.DataFrame) and not r.empty]
+    errors = [r for r in results.values() if isinstance(r, Exception)]
+    if not frames:
+        if errors:
+            return f"⚠️ 광고 데이터 조회 중 오류 발생: {errors[0]}"
         return "⚠️ 어제 집계된 광고 데이터가 없습니다."
 
-    data = insights[0]
-    spend = float(data.get("spend", 0))
-    clicks = int(data.get("clicks", 0))
+    df_raw = pd.concat(frames, ignore_index=True)
+    history = InsightsHistory() if HISTORY_ENABLED else None
+    if history is not None:
+        save_history(history, df_raw)
 
-    # 구매 데이터 추출
-    purchases = 0
-    purchase_value = 0
-    if "actions" in data:
-        for action in data["actions"]:
-            if action["action_type"] == "purchase":
-                purchases = float(action["value"])
-    if "action_values" in data:
-        for val in data["action_values"]:
-            if val["action_type"] == "purchase":
-                purchase_value = float(val["value"])
-
-    # 지표 계산
-    cpc = spend / clicks if clicks > 0 else 0
-    cpp = spend / purchases if purchases > 0 else 0  # 구매당 비용
-    roas = (purchase_value / spend * 100) if spend > 0 else 0
+    # 하루 단위 행을 항목 ID별로 합산 (이름은 기간 중 마지막 이름으로 표시)
+    df = add_metrics(
+        df_raw.groupby(["account_id", "id"], sort=False, dropna=False)
+        .agg(
+            account_name=("account_name", "last"),
+            name=("name", "last"),
+            **{c: (c, "sum") for c in METRIC_COLUMNS},
+        )
+        .reset_index()
+    )
 
-    # 슬랙 메시지 구성
-    report_text = (
-        f"📅 *어제 광고 성과 요약 ({datetime.date.today() - datetime.timedelta(1)})*\n\n"
-        f"💰 *총 지출:* {int(spend):,}원\n"
-        f"🛒 *총 구매:* {int(purchases)}건\n"
-        f"🎯 *구매당 비용 (CPP):* {int(cpp):,}원\n"
-        f"🖱️ *평균 CPC:* {int(cpc):,}원\n"
-        f"📈 *구매 ROAS:* {int(roas):,}%"
+    # 전체 합계 및 계정별 합계
+    by_account = add_metrics(
+        df.groupby("account_id", sort=False)
+        .agg(account_name=("account_name", "first"), **{c: (c, "sum") for c in METRIC_COLUMNS})
     )
+    total = add_metrics(by_account[METRIC_COLUMNS].sum().to_frame().T).iloc[0]
+
+    # 슬랙 메시지 구성
+    if DATE_PRESET == "yesterday":
+        title = f"어제 광고 성과 요약 ({datetime.date.today() - datetime.timedelta(1)})"
+    else:
+        title = f"광고 성과 요약 ({DATE_PRESET})"
+    report_text = f"📅 *{title}*\n\n{format_metrics(total)}"
+
+    # 계정이 여러 개면 계정별 성과를 덧붙임
+    if len(results) > 1:
+        for account_id, result in results.items():
+            if isinstance(result, Exception):
+                report_text += f"\n\n*[{account_id}]*\n⚠️ 조회 실패: {result}"
+            elif account_id not in by_account.index:
+                report_text += f"\n\n*[{account_id}]*\n집계된 데이터가 없습니다."
+            else:
+                row = by_account.loc[account_id]
+                report_text += f"\n\n*[{row['account_name']}]*\n{format_metrics(row)}"
+
+    # 하루치 리포트면 저장된 기록으로 추세/이상치를 덧붙임 (조회에 성공한 계정 기준)
+    if history is not None and df_raw["date"].nunique() == 1:
+        report_date = datetime.date.fromisoformat(str(df_raw["date"].iloc[0])[:10])
+        history_df = history.load(
+            start=report_date - datetime.timedelta(TREND_WINDOW_DAYS),
+            end=report_date,
+            account_ids=list(by_account.index),
+        )
+        report_text += format_trends(history_df, report_date)
+
+    if REPORT_LEVEL != "account":
+        report_text += format_performers(df)
+
     return report_text
 
 
 def send_slack(text):
-    url = "https://slack.com/api/chat.postMessage"
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {"channel": SLACK_CHANNEL_ID, "text": text}
-    requests.post(url, data=json.dumps(payload), headers=headers)
+    if not SLACK_BOT_TOKEN:
+        print("경고: SLACK_BOT_TOKEN을 찾을 수 없습니다. 슬랙 알림을 건너뜁니다.")
+        print(f"메시지: {text}")
+        return
+
+    from slack_notifier import SlackApiError, get_notifier
+
+    try:
+        get_notifier(SLACK_BOT_TOKEN).post_message(SLACK_CHANNEL_ID, text)
+        print("슬랙 알림을 성공적으로 보냈습니다.")
+    except SlackApiError as e:
+        print(f"슬랙 알림 전송 중 오류 발생: {e.response['error']}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="페이스북 광고 일일 리포트")
+    parser.add_argument(
+        "--backfill",
+        type=int,
+        metavar="DAYS",
+        help="리포트 전에 최근 DAYS일 중 기록이 없는 날짜를 조회하여 저장",
+    )
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill_history(args.backfill)
     report = get_report()
     send_slack(report)